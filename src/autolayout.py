@@ -0,0 +1,69 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PyQt5.QtCore import QObject, pyqtSignal
+from .layout import run_layout, snapshot_graph
+from .node import NodeItem
+
+
+class AutoLayouter(QObject):
+    # Calcula o layout num processo separado (ver layout.py) sobre uma cópia
+    # do grafo; a view continua respondendo enquanto isso. O resultado é
+    # aplicado de uma vez, como uma única entrada no histórico. Um novo pedido
+    # torna o anterior obsoleto (seu resultado é descartado).
+    _done = pyqtSignal(int, object)
+
+    def __init__(self, window):
+        super().__init__(window)
+        self._window = window
+        self._executor = None
+        self._generation = 0
+        self._snapshot = None
+        self.running = False
+        self._done.connect(self._on_done)
+
+    def start(self, algorithm, node_ids=None):
+        window = self._window
+        window.flush_text_edits()
+        # Hierárquico só olha as arestas de herança (saída "herda")
+        kind = "herda" if algorithm == "layered" else None
+        job = snapshot_graph(window.model, node_ids, kind)
+        job.update(algorithm=algorithm, size=(NodeItem.WIDTH, NodeItem.HEIGHT))
+        if self._executor is None:
+            # spawn: o processo filho não herda o estado do Qt
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self._generation += 1
+        generation = self._generation
+        self._snapshot = dict(zip(job["ids"], job["positions"]))
+        self.running = True
+        future = self._executor.submit(run_layout, job)
+        # O callback roda numa thread do executor; o sinal leva o resultado
+        # para a thread da interface
+        future.add_done_callback(lambda f: self._done.emit(generation, f))
+        window.statusBar().showMessage(f"Calculando layout de {len(node_ids) if node_ids else len(job['ids'])} nodes...")
+
+    def _on_done(self, generation, future):
+        if generation != self._generation:
+            return  # pedido substituído por um mais novo
+        self.running = False
+        window = self._window
+        try:
+            positions = future.result()
+        except Exception as e:
+            window.statusBar().showMessage(f"Erro no layout: {e}")
+            return
+        # Nodes apagados ou movidos pelo usuário durante o cálculo ficam como estão
+        model = window.model
+        snapshot = self._snapshot
+        moves = {}
+        for node_id, (x, y) in positions.items():
+            node = model.nodes.get(node_id)
+            if node is not None and snapshot.get(node_id) == (node.x, node.y) and (node.x, node.y) != (x, y):
+                moves[node_id] = (x, y)
+        window.apply_layout(moves)
+        window.statusBar().showMessage(f"Layout aplicado ({len(moves)} nodes)", 5000)
+
+    def shutdown(self):
+        self._generation += 1
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
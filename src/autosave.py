@@ -0,0 +1,180 @@
+import copy
+import os
+import shutil
+import threading
+import time
+from PyQt5.QtCore import QLockFile, QObject, QTimer
+from .journal import Journal, apply_op
+
+SESSION_PREFIX = "session-"
+
+
+def default_directory():
+    return os.path.join(os.path.expanduser("~"), ".logic-link", "autosave")
+
+
+def _lock_file(session_directory):
+    # Trava de uma sessão. Só o processo dono morto a torna obsoleta: sem
+    # limite de idade, uma janela aberta há horas continua dona do journal
+    lock = QLockFile(session_directory + ".lock")
+    lock.setStaleLockTime(0)
+    return lock
+
+
+class AutoSaver(QObject):
+    # Autosave incremental: cada edição vira uma linha no journal (gravado a
+    # cada flush_ms), e de tempos em tempos o journal é compactado num snapshot
+    # completo gravado em outra thread.
+    #
+    # Cada janela grava na sua própria sessão (subdiretório de directory,
+    # protegido por QLockFile); recuperação só é oferecida para sessões cuja
+    # trava ficou obsoleta (processo encerrado sem fechar a janela).
+    #
+    # O snapshot sai de uma cópia sombra do modelo, mantida em dia na thread
+    # de gravação reaplicando as operações registradas desde a compactação
+    # anterior: a thread da interface só copia cada operação ao registrá-la.
+    def __init__(self, window, directory=None, flush_ms=2000, compact_ms=5 * 60 * 1000, compact_ops=20000):
+        super().__init__(window)
+        self._window = window
+        self.directory = directory or default_directory()
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = None
+        self.journal = Journal(self._new_session())
+        self.compact_ops = compact_ops
+        self._writer = None
+        self._shadow = window.model.snapshot()
+        self._shadow_ops = []  # operações ainda não aplicadas à sombra
+        self._orphan = None    # (diretório, trava) de uma sessão abandonada
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start(flush_ms)
+        self._compact_timer = QTimer(self)
+        self._compact_timer.timeout.connect(self.compact)
+        self._compact_timer.start(compact_ms)
+
+    def _new_session(self):
+        name = f"{SESSION_PREFIX}{os.getpid()}-{time.time_ns()}"
+        path = os.path.join(self.directory, name)
+        self._lock = _lock_file(path)
+        if not self._lock.tryLock(0):
+            raise OSError(f"Não foi possível travar a sessão de autosave {path}")
+        return path
+
+    def record(self, op):
+        self.journal.record(op)
+        # Cópia: ops podem compartilhar listas com o modelo da janela
+        self._shadow_ops.append(copy.deepcopy(op))
+        if self.journal.ops_since_compact >= self.compact_ops:
+            self.compact()
+
+    def flush(self):
+        try:
+            self.journal.flush()
+        except OSError as e:
+            self._window.statusBar().showMessage(f"Falha no autosave: {e}")
+
+    def compact(self):
+        if self.journal.ops_since_compact == 0 or self._writer_busy():
+            return
+        if self._shadow is None:
+            # Sombra perdida numa falha anterior: volta a partir do modelo
+            self._shadow = self._window.model.snapshot()
+            self._shadow_ops = []
+        ops = self._shadow_ops
+        self._shadow_ops = []
+        self._start_writer(ops, self.journal.rotate())
+
+    def _start_writer(self, ops, generation):
+        self._writer = threading.Thread(target=self._write_snapshot, args=(ops, generation), daemon=True)
+        self._writer.start()
+
+    def _write_snapshot(self, ops, generation):
+        # Thread de gravação: só ela mexe na sombra enquanto está viva
+        try:
+            for op in ops:
+                apply_op(self._shadow, op)
+        except Exception:
+            # Sombra inconsistente: a próxima compactação a refaz do modelo
+            self._shadow = None
+            return
+        try:
+            self.journal.write_snapshot(self._shadow, generation)
+        except OSError:
+            # O journal anterior continua válido; a próxima compactação tenta de novo
+            pass
+
+    def _writer_busy(self):
+        return self._writer is not None and self._writer.is_alive()
+
+    def _wait_writer(self):
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+    def reset(self):
+        # O modelo foi substituído (projeto carregado/recuperado): o novo estado
+        # vira a sombra e o snapshot base, e os arquivos anteriores são apagados
+        self._wait_writer()
+        self._shadow = self._window.model.snapshot()
+        self._shadow_ops = []
+        try:
+            self._start_writer([], self.journal.rotate())
+        except OSError as e:
+            self._window.statusBar().showMessage(f"Falha no autosave: {e}")
+
+    def _claim_orphan(self):
+        # Trava a sessão abandonada mais recente que tenha algo a recuperar;
+        # sessões abandonadas vazias são apagadas no caminho
+        if self._orphan is not None:
+            return self._orphan
+        candidates = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(SESSION_PREFIX) and os.path.isdir(path) and path != self.journal.directory:
+                candidates.append((os.path.getmtime(path), path))
+        for _, path in sorted(candidates, reverse=True):
+            lock = _lock_file(path)
+            if not lock.tryLock(0):
+                continue  # outra janela ainda está usando
+            if Journal(path).has_recovery():
+                self._orphan = (path, lock)
+                return self._orphan
+            shutil.rmtree(path, ignore_errors=True)
+            lock.unlock()
+        return None
+
+    def _drop_orphan(self):
+        path, lock = self._orphan
+        self._orphan = None
+        shutil.rmtree(path, ignore_errors=True)
+        lock.unlock()
+
+    def has_recovery(self):
+        return self._claim_orphan() is not None
+
+    def recover(self):
+        # O estado recuperado é gravado nesta sessão antes de a sessão
+        # abandonada ser apagada: uma nova falha aqui não perde nada
+        path, _ = self._claim_orphan()
+        model = Journal(path).recover()
+        self._wait_writer()
+        self.journal.write_snapshot(model, self.journal.rotate())
+        self._drop_orphan()
+        return model
+
+    def discard_recovery(self):
+        # Recuperação recusada: apaga só a sessão abandonada oferecida
+        if self._claim_orphan() is not None:
+            self._drop_orphan()
+
+    def discard(self):
+        # Encerramento normal: apaga o autosave desta sessão
+        self._wait_writer()
+        self.journal.clear()
+        shutil.rmtree(self.journal.directory, ignore_errors=True)
+        self._lock.unlock()
+
+    def stop(self):
+        self._flush_timer.stop()
+        self._compact_timer.stop()
@@ -0,0 +1,247 @@
+# Benchmarks de renderização e interação, sem janela visível.
+#
+#   python -m src.bench --nodes 5000 --degree 1.5 --out bench.json
+#
+# Gera um diagrama sintético, mede carga/gravação (JSON e .llb), NodeItem.paint,
+# render da viewport em vários zooms, atualização de conexões durante arrastes
+# (via NodeItem.itemChange) e pico de memória, e imprime/grava JSON para
+# comparar commits.
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QPointF, QT_VERSION_STR
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication, QStyleOptionGraphicsItem
+
+from .connection import ConnectionItem, path_updates
+from .model import GraphModel
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def make_model(nodes, degree, pins=3, seed=0, columns=100):
+    # Diagrama em grade com ~degree conexões saindo de cada node, ligando
+    # nodes próximos (como num diagrama real) e alguns distantes
+    rng = random.Random(seed)
+    model = GraphModel()
+    for i in range(nodes):
+        model.add_node(
+            title=f"Classe{i}",
+            inputs=[f"in{k}" for k in range(pins)],
+            outputs=[f"out{k}" for k in range(pins)],
+            description="Bloco gerado pelo benchmark",
+            properties=[f"prop{k}" for k in range(2)],
+            methods=[f"metodo{k}" for k in range(2)],
+            x=(i % columns) * 260.0,
+            y=(i // columns) * 160.0
+        )
+    for _ in range(int(nodes * degree)):
+        source = rng.randrange(nodes)
+        if rng.random() < 0.9:
+            target = min(nodes - 1, max(0, source + rng.choice((-columns, -1, 1, columns))))
+        else:
+            target = rng.randrange(nodes)
+        if target != source:
+            model.add_edge(source, rng.randrange(pins), target, rng.randrange(pins))
+    return model
+
+
+def _stats(samples):
+    return {"min": min(samples), "median": statistics.median(samples), "runs": len(samples)}
+
+
+def _timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return _stats(samples)
+
+
+def _wait(app, done):
+    while not done():
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def bench_io(app, window, model, directory, repeat):
+    results = {}
+    for ext in (".json", ".llb"):
+        path = os.path.join(directory, "projeto" + ext)
+
+        def save():
+            window.model = model
+            window.start_saving(path)
+            _wait(app, lambda: window._saver is None)
+
+        def load():
+            window.start_loading(path)
+            _wait(app, lambda: window._loader is None)
+
+        results["save" + ext] = _timed(save, repeat)
+        results["load" + ext] = _timed(load, repeat)
+        results["size" + ext] = os.path.getsize(path)
+    return results
+
+
+def bench_paint(window, count, repeat):
+    # Custo de NodeItem.paint isolado: com layout em cache (após uma passada
+    # de aquecimento) e com invalidate() antes de cada pintura
+    image = QImage(400, 300, QImage.Format_ARGB32_Premultiplied)
+    option = QStyleOptionGraphicsItem()
+    option.exposedRect = window.view.sceneRect()
+    nodes = list(window.node_items.values())[:count]
+    results = {}
+    for label, invalidate in (("cached", False), ("cold", True)):
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        def paint_all():
+            for node in nodes:
+                if invalidate:
+                    node.invalidate()
+                node.paint(painter, option, None)
+
+        if not invalidate:
+            # Passada de aquecimento: o layout (QStaticText) de cada node fica em
+            # cache antes da medição; sem ela "cached" seria outra medição fria
+            for node in nodes:
+                node.invalidate()
+                node.paint(painter, option, None)
+        stats = _timed(paint_all, repeat)
+        painter.end()
+        results[label + "_us_per_node"] = {key: value * 1000 / max(len(nodes), 1) if key != "runs" else value
+                                           for key, value in stats.items()}
+    return results
+
+
+def bench_render(app, window, zooms, repeat):
+    view = window.view
+    results = {}
+    center = window.scene.itemsBoundingRect().center()
+    for zoom in zooms:
+        view.set_zoom(zoom)
+        view.centerOn(center)
+        app.processEvents()
+        results[str(zoom)] = _timed(lambda: view.viewport().grab(), repeat)
+    view.set_zoom(1.0)
+    return results
+
+
+def bench_drag(app, window, dragged, steps):
+    # Arraste simulado: setPos passa por itemChange, que marca as conexões;
+    # o flush em lote roda uma vez por "frame"
+    window.view.set_zoom(1.0)
+    app.processEvents()  # cena virtualizada materializa os nodes visíveis
+    nodes = list(window.node_items.values())[:dragged]
+    rebuilds_before = ConnectionItem.path_rebuilds
+    frames = []
+    for step in range(steps):
+        start = time.perf_counter()
+        for node in nodes:
+            node.setPos(node.pos() + QPointF(3, 2))
+        path_updates.flush()
+        frames.append((time.perf_counter() - start) * 1000)
+        app.processEvents()
+    connections = sum(len(node.output_connections) + len(node.input_connections) for node in nodes)
+    return {
+        "dragged_nodes": len(nodes),
+        "attached_connections": connections,
+        "frame_ms": _stats(frames),
+        "path_rebuilds_per_frame": (ConnectionItem.path_rebuilds - rebuilds_before) / max(steps, 1)
+    }
+
+
+def peak_memory_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB, macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _commit():
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=root, stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    from .main import MainWindow
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    directory = tempfile.mkdtemp(prefix="logic-link-bench-")
+    try:
+        window = MainWindow(autosave_dir=os.path.join(directory, "autosave"))
+        window.resize(1280, 800)
+        window.show()
+        app.processEvents()
+        if args.virtual:
+            window.virtualizer.set_enabled(True)
+
+        start = time.perf_counter()
+        model = make_model(args.nodes, args.degree, args.pins, args.seed)
+        generate_ms = (time.perf_counter() - start) * 1000
+
+        results = {"generate_ms": generate_ms}
+        results["io"] = bench_io(app, window, model, directory, args.repeat)
+        # A carga deixa o modelo lido do .llb na janela
+        results["paint"] = bench_paint(window, args.paint_nodes, args.repeat)
+        results["render"] = bench_render(app, window, args.zooms, args.repeat)
+        results["drag"] = bench_drag(app, window, args.drag_nodes, args.drag_steps)
+        results["peak_memory_mb"] = peak_memory_mb()
+        window.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "platform": platform.platform(),
+            "params": vars(args) | {"out": None},
+        },
+        "results": results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do editor (plataforma Qt offscreen)")
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--degree", type=float, default=1.5, help="conexões por node (média)")
+    parser.add_argument("--pins", type=int, default=3, help="entradas e saídas por node")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--zooms", type=float, nargs="+", default=[1.0, 0.4, 0.1])
+    parser.add_argument("--paint-nodes", type=int, default=500)
+    parser.add_argument("--drag-nodes", type=int, default=50)
+    parser.add_argument("--drag-steps", type=int, default=60)
+    parser.add_argument("--virtual", action="store_true", help="usa a cena virtualizada")
+    parser.add_argument("--out", help="grava o JSON neste arquivo (padrão: stdout)")
+    args = parser.parse_args(argv)
+    report = json.dumps(run(args), indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+# Formato binário compacto de projeto (.llb), sem Qt.
+#
+# Cabeçalho: magic "LLNK", versão (u16), flags (u16), tamanho do corpo (u32).
+# Corpo (little-endian, cada bloco alinhado em 8 bytes), opcionalmente zlib:
+#   tabela de strings: n, tamanho do blob, offsets u32[n+1], blob UTF-8
+#   n_nodes, n_edges
+#   ids dos nodes u32[n]
+#   posições f64[2n] (x, y intercalados)
+#   título u32[n], descrição u32[n]   (índices na tabela de strings)
+#   para inputs/outputs/properties/methods: contagens u32[n], total, itens u32[total]
+#   conexões i32[4e] (from_node, from_idx, to_node, to_idx; nodes por posição)
+#   ids das conexões u32[e]
+#   próximo id livre de node e de conexão u32[2] (versão 3+)
+#
+# A conversão de/para o esquema JSON de save_project é sem perdas para todos os
+# campos desse esquema. A leitura é um único read() do arquivo: as tabelas
+# viram listas Python de qualquer forma, então mmap não economizaria nada.
+import array
+import itertools
+import os
+import struct
+import sys
+import zlib
+
+from .model import LIST_FIELDS, without_gc, write_file_atomic
+
+EXTENSION = ".llb"
+MAGIC = b"LLNK"
+VERSION = 3
+FLAG_ZLIB = 1
+
+_HEADER = struct.Struct("<4sHHI")
+_SWAP = sys.byteorder != "little"
+
+
+class _Writer:
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def raw(self, data):
+        self.parts.append(data)
+        self.size += len(data)
+        pad = -self.size % 8
+        if pad:
+            self.parts.append(b"\0" * pad)
+            self.size += pad
+
+    def u32(self, *values):
+        self.raw(struct.pack(f"<{len(values)}I", *values))
+
+    def array(self, typecode, values):
+        arr = array.array(typecode, values)
+        if _SWAP:
+            arr.byteswap()
+        self.raw(arr.tobytes())
+
+
+class _Reader:
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+
+    def _advance(self, size):
+        start = self.pos
+        if start + size > len(self.buf):
+            raise ValueError("Arquivo binário truncado")
+        self.pos += size + (-size % 8)
+        return self.buf[start:start + size]
+
+    def u32(self, count=1):
+        return struct.unpack(f"<{count}I", self._advance(4 * count))
+
+    def raw(self, size):
+        return self._advance(size)
+
+    def array(self, typecode, count):
+        view = self._advance(array.array(typecode).itemsize * count)
+        if _SWAP:
+            arr = array.array(typecode, view.tobytes())
+            arr.byteswap()
+            return arr.tolist()
+        with view.cast(typecode) as typed:
+            return typed.tolist()
+
+
+def _encode(nodes, edges, next_ids, compress):
+    # nodes: objetos com os atributos de NodeData;
+    # edges: (edge_id, from, from_idx, to, to_idx) com nodes por posição;
+    # next_ids: {"node": n, "edge": e} (ver GraphModel.next_ids)
+    strings = {}
+    intern = strings.setdefault
+    n = len(nodes)
+    positions = array.array("d")
+    titles = array.array("I")
+    descriptions = array.array("I")
+    lists = {field: (array.array("I"), array.array("I")) for field in LIST_FIELDS}
+    for node in nodes:
+        positions.append(node.x)
+        positions.append(node.y)
+        titles.append(intern(node.title, len(strings)))
+        descriptions.append(intern(node.description, len(strings)))
+        for field in LIST_FIELDS:
+            counts, items = lists[field]
+            values = getattr(node, field)
+            counts.append(len(values))
+            items.extend([intern(v, len(strings)) for v in values])
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array.array("I", [0])
+    total = 0
+    for data in encoded:
+        total += len(data)
+        offsets.append(total)
+
+    body = _Writer()
+    body.u32(len(encoded), total)
+    body.array("I", offsets)
+    body.raw(b"".join(encoded))
+    body.u32(n, len(edges))
+    body.array("I", [node.id for node in nodes])
+    body.array("d", positions)
+    body.array("I", titles)
+    body.array("I", descriptions)
+    for field in LIST_FIELDS:
+        counts, items = lists[field]
+        body.array("I", counts)
+        body.u32(len(items))
+        body.array("I", items)
+    flat_edges = array.array("i")
+    for edge in edges:
+        flat_edges.extend(edge[1:])
+    body.array("i", flat_edges)
+    body.array("I", [edge[0] for edge in edges])
+    # Nunca abaixo de max(id) + 1, mesmo que o dict venha incompleto
+    next_ids = next_ids or {}
+    body.u32(max(next_ids.get("node", 0), max((node.id for node in nodes), default=-1) + 1),
+             max(next_ids.get("edge", 0), max((edge[0] for edge in edges), default=-1) + 1))
+
+    payload = b"".join(body.parts)
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 6)
+        flags |= FLAG_ZLIB
+    return _HEADER.pack(MAGIC, VERSION, flags, body.size) + payload
+
+
+class _Decoded:
+    __slots__ = ("n_nodes", "node_ids", "positions", "titles", "descriptions", "lists", "edges", "edge_ids", "next_ids")
+
+
+def _decode(buf):
+    if len(buf) < _HEADER.size:
+        raise ValueError("Arquivo binário inválido")
+    magic, version, flags, body_size = _HEADER.unpack(buf[:_HEADER.size])
+    if magic != MAGIC:
+        raise ValueError("Arquivo não é um projeto binário (.llb)")
+    if not 2 <= version <= VERSION:
+        raise ValueError(f"Versão {version} do formato binário não suportada")
+    body = buf[_HEADER.size:]
+    if flags & FLAG_ZLIB:
+        body = memoryview(zlib.decompress(body))
+    reader = _Reader(body)
+
+    n_strings, blob_size = reader.u32(2)
+    offsets = reader.array("I", n_strings + 1)
+    blob = reader.raw(blob_size).tobytes()
+    text = blob.decode("utf-8")
+    if len(text) == blob_size:
+        # Só ASCII: offsets em bytes valem como índices no texto
+        strings = list(map(text.__getitem__, map(slice, offsets[:-1], offsets[1:])))
+    else:
+        strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n_strings)]
+    lookup = strings.__getitem__
+
+    result = _Decoded()
+    n, n_edges = reader.u32(2)
+    result.n_nodes = n
+    result.node_ids = reader.array("I", n)
+    result.positions = reader.array("d", 2 * n)
+    result.titles = list(map(lookup, reader.array("I", n)))
+    result.descriptions = list(map(lookup, reader.array("I", n)))
+    result.lists = {}
+    for field in LIST_FIELDS:
+        counts = reader.array("I", n)
+        (total,) = reader.u32()
+        items = list(map(lookup, reader.array("I", total)))
+        result.lists[field] = _split(items, counts)
+    flat = reader.array("i", 4 * n_edges)
+    result.edges = list(zip(flat[0::4], flat[1::4], flat[2::4], flat[3::4]))
+    result.edge_ids = reader.array("I", n_edges)
+    # Versão 2 não guardava os contadores: GraphModel usa max(id) + 1
+    result.next_ids = None
+    if version >= 3:
+        next_node, next_edge = reader.u32(2)
+        result.next_ids = {"node": next_node, "edge": next_edge}
+    return result
+
+
+def _split(items, counts):
+    # Uma lista por node. O caso comum (mesma contagem em todos os nodes,
+    # ex.: diagramas gerados) dispensa os offsets
+    n = len(counts)
+    if n and len(items) == n * counts[0] and counts.count(counts[0]) == n:
+        if not counts[0]:
+            return [[] for _ in range(n)]
+        it = iter(items)
+        return list(map(list, zip(*[it] * counts[0])))
+    ends = list(itertools.accumulate(counts))
+    return [items[start:end] for start, end in zip([0] + ends, ends)]
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return _decode(memoryview(f.read()))
+
+
+def save_model(model, path, compress=False):
+    nodes = list(model.nodes.values())
+    index_map = {node.id: idx for idx, node in enumerate(nodes)}
+    edges = [(e.id, index_map[e.from_node], e.from_idx, index_map[e.to_node], e.to_idx) for e in model.edges.values()]
+    write_file_atomic(path, _encode(nodes, edges, model.next_ids(), compress))
+
+
+@without_gc
+def load_model(path):
+    from .model import GraphModel, NodeData
+    decoded = _read(path)
+    lists = decoded.lists
+    ids = decoded.node_ids
+    nodes = list(map(
+        NodeData, ids, decoded.titles, lists["inputs"], lists["outputs"],
+        decoded.descriptions, lists["properties"], lists["methods"],
+        decoded.positions[0::2], decoded.positions[1::2]
+    ))
+    edges = [(edge_id, ids[f], fi, ids[t], ti) for edge_id, (f, fi, t, ti) in zip(decoded.edge_ids, decoded.edges)]
+    model = GraphModel.from_tables(nodes, edges)
+    model.reserve_ids(decoded.next_ids)
+    return model
+
+
+def iter_project(path):
+    # Mesmo contrato de jsonstream.iter_project: (seção, item, bytes_lidos);
+    # o arquivo é decodificado de uma vez, então o progresso é proporcional
+    size = os.path.getsize(path)
+    decoded = _read(path)
+    total = max(decoded.n_nodes + len(decoded.edges), 1)
+    for section, item, i in _iter_dicts(decoded):
+        yield section, item, (i + 1) * size // total
+
+
+def _iter_dicts(decoded):
+    n = decoded.n_nodes
+    pos = decoded.positions
+    for i in range(n):
+        node = {
+            "id": decoded.node_ids[i],
+            "title": decoded.titles[i],
+            "inputs": decoded.lists["inputs"][i],
+            "outputs": decoded.lists["outputs"][i],
+            "description": decoded.descriptions[i],
+            "properties": decoded.lists["properties"][i],
+            "methods": decoded.lists["methods"][i],
+            "pos": [pos[2 * i], pos[2 * i + 1]]
+        }
+        yield "nodes", node, i
+    for i, (from_node, from_idx, to_node, to_idx) in enumerate(decoded.edges):
+        conn = {"id": decoded.edge_ids[i], "from_node": from_node, "from_idx": from_idx, "to_node": to_node, "to_idx": to_idx}
+        yield "connections", conn, n + i
+    if decoded.next_ids is not None:
+        yield "next_ids", decoded.next_ids, n + len(decoded.edges) - 1
+
+
+# Conversão sem perdas com o esquema JSON
+def dump(data, path, compress=False):
+    from .model import NodeData
+    nodes = []
+    for idx, node_data in enumerate(data.get("nodes", [])):
+        pos = node_data.get("pos", [0, 0])
+        nodes.append(NodeData(
+            node_data.get("id", idx), node_data.get("title", "Node"), node_data.get("inputs", []), node_data.get("outputs", []),
+            node_data.get("description", ""), node_data.get("properties", []), node_data.get("methods", []),
+            pos[0], pos[1]
+        ))
+    edges = [(c.get("id", idx), c["from_node"], c["from_idx"], c["to_node"], c["to_idx"])
+             for idx, c in enumerate(data.get("connections", []))]
+    write_file_atomic(path, _encode(nodes, edges, data.get("next_ids"), compress))
+
+
+def load(path):
+    data = {"nodes": [], "connections": []}
+    for section, item, _ in _iter_dicts(_read(path)):
+        if section == "next_ids":
+            data["next_ids"] = item
+        else:
+            data[section].append(item)
+    return data
@@ -0,0 +1,273 @@
+# Linha de comando sem interface gráfica (não importa PyQt5).
+#
+#   python -m src.cli validate projetos/*.json
+#   python -m src.cli stats --json projeto.llb
+#   python -m src.cli convert --to llb --out-dir convertidos projetos/*.json
+#
+# Vários arquivos são processados em paralelo (--jobs, padrão: um processo
+# por CPU) e cada resultado é impresso assim que fica pronto.
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from . import binformat, jsonstream
+from .model import GraphModel, LIST_FIELDS
+
+MAX_ERRORS = 20
+
+
+def _iter_items(path):
+    if path.endswith(binformat.EXTENSION):
+        return binformat.iter_project(path)
+    return jsonstream.iter_project(path)
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_id(value):
+    # Ids vão para u32 no .llb
+    return _is_int(value) and 0 <= value < 1 << 32
+
+
+def scan(path):
+    # Lê o arquivo em streaming, validando cada item, e devolve
+    # (erros, contagem de pinos por node, conexões válidas como índices)
+    errors = []
+    node_ids = set()
+    pin_counts = []  # (entradas, saídas) por posição na lista de nodes
+    connections = []
+    edge_ids = set()
+
+    def error(message):
+        errors.append(message)
+
+    for section, item, _ in _iter_items(path):
+        if section == "nodes":
+            idx = len(pin_counts)
+            if not isinstance(item, dict):
+                error(f"node {idx}: não é um objeto")
+                pin_counts.append((0, 0))
+                continue
+            # Sem "id" o editor gera um novo; só ids explícitos podem colidir
+            node_id = item.get("id")
+            if node_id is not None:
+                if not _is_id(node_id):
+                    error(f"node {idx}: 'id' deve ser um inteiro não negativo")
+                elif node_id in node_ids:
+                    error(f"node {idx}: id {node_id} repetido")
+                else:
+                    node_ids.add(node_id)
+            for field in ("title", "description"):
+                if not isinstance(item.get(field, ""), str):
+                    error(f"node {idx}: '{field}' deve ser um texto")
+            for field in LIST_FIELDS:
+                values = item.get(field, [])
+                if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+                    error(f"node {idx}: '{field}' deve ser uma lista de textos")
+            pos = item.get("pos", [0, 0])
+            if not (isinstance(pos, list) and len(pos) == 2 and all(isinstance(v, (int, float)) for v in pos)):
+                error(f"node {idx}: 'pos' deve ser [x, y]")
+            inputs, outputs = item.get("inputs", []), item.get("outputs", [])
+            pin_counts.append((len(inputs) if isinstance(inputs, list) else 0,
+                               len(outputs) if isinstance(outputs, list) else 0))
+        elif section == "next_ids":
+            if not isinstance(item, dict) or not all(_is_id(item.get(k, 0)) for k in ("node", "edge")):
+                error("'next_ids' deve ser {\"node\": n, \"edge\": e} com inteiros não negativos")
+        else:
+            idx = len(connections)
+            fields = ("from_node", "from_idx", "to_node", "to_idx")
+            if not isinstance(item, dict) or not all(_is_int(item.get(f)) for f in fields):
+                error(f"conexão {idx}: campos {', '.join(fields)} devem ser inteiros")
+                connections.append(None)
+                continue
+            edge_id = item.get("id")
+            if edge_id is not None:
+                if not _is_id(edge_id):
+                    error(f"conexão {idx}: 'id' deve ser um inteiro não negativo")
+                elif edge_id in edge_ids:
+                    error(f"conexão {idx}: id {edge_id} repetido")
+                else:
+                    edge_ids.add(edge_id)
+            connections.append(tuple(item[f] for f in fields))
+
+    # Conexões no fim: o arquivo pode trazê-las antes dos nodes
+    count = len(pin_counts)
+    valid = []
+    for idx, connection in enumerate(connections):
+        if connection is None:
+            continue
+        from_node, from_idx, to_node, to_idx = connection
+        ok = True
+        for label, node in (("from_node", from_node), ("to_node", to_node)):
+            if not 0 <= node < count:
+                error(f"conexão {idx}: {label} {node} não existe ({count} nodes)")
+                ok = False
+        if not ok:
+            continue
+        if not 0 <= from_idx < pin_counts[from_node][1]:
+            error(f"conexão {idx}: from_idx {from_idx} fora das {pin_counts[from_node][1]} saídas do node {from_node}")
+            ok = False
+        if not 0 <= to_idx < pin_counts[to_node][0]:
+            error(f"conexão {idx}: to_idx {to_idx} fora das {pin_counts[to_node][0]} entradas do node {to_node}")
+            ok = False
+        if ok:
+            valid.append(connection)
+    return errors, pin_counts, valid
+
+
+def validate(path):
+    errors, pin_counts, connections = scan(path)
+    return {
+        "file": path,
+        "valid": not errors,
+        "nodes": len(pin_counts),
+        "connections": len(connections),
+        "errors": errors[:MAX_ERRORS],
+        "error_count": len(errors),
+    }
+
+
+def stats(path):
+    errors, pin_counts, connections = scan(path)
+    count = len(pin_counts)
+    out_degree = [0] * count
+    in_degree = [0] * count
+    # Componentes conexas (union-find com compressão de caminho)
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    self_loops = 0
+    for from_node, _, to_node, _ in connections:
+        out_degree[from_node] += 1
+        in_degree[to_node] += 1
+        if from_node == to_node:
+            self_loops += 1
+        a, b = find(from_node), find(to_node)
+        if a != b:
+            parent[a] = b
+    components = sum(1 for i in range(count) if find(i) == i)
+    isolated = sum(1 for i in range(count) if not in_degree[i] and not out_degree[i])
+    pins = sum(inputs + outputs for inputs, outputs in pin_counts)
+    used_pins = len({(f, fi) for f, fi, _, _ in connections}) + len({(t, ti) for _, _, t, ti in connections})
+    return {
+        "file": path,
+        "valid": not errors,
+        "error_count": len(errors),
+        "bytes": os.path.getsize(path),
+        "nodes": count,
+        "connections": len(connections),
+        "pins": pins,
+        "connected_pins": used_pins,
+        "isolated_nodes": isolated,
+        "components": components,
+        "self_loops": self_loops,
+        "max_out_degree": max(out_degree, default=0),
+        "max_in_degree": max(in_degree, default=0),
+        "mean_degree": 2 * len(connections) / count if count else 0.0,
+    }
+
+
+def convert(path, to, out_dir=None, compress=False):
+    extension = binformat.EXTENSION if to == "llb" else ".json"
+    root, _ = os.path.splitext(path)
+    target = root + extension
+    if out_dir is not None:
+        target = os.path.join(out_dir, os.path.basename(target))
+    if os.path.abspath(target) == os.path.abspath(path):
+        return {"file": path, "ok": False, "error": "origem e destino são o mesmo arquivo"}
+    # A carga do modelo não confere pinos; arquivo inválido não é convertido
+    errors = scan(path)[0]
+    if errors:
+        return {"file": path, "ok": False, "error": f"{len(errors)} erro(s) de validação; primeiro: {errors[0]}"}
+    try:
+        model = GraphModel.load(path)
+        model.save(target, compress)
+    except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+        return {"file": path, "ok": False, "error": str(e) or type(e).__name__}
+    return {"file": path, "ok": True, "output": target, "nodes": len(model.nodes), "connections": len(model.edges)}
+
+
+def _run_one(command, path, options):
+    try:
+        if command == "validate":
+            return validate(path)
+        if command == "stats":
+            return stats(path)
+        return convert(path, **options)
+    except Exception as e:
+        # Arquivo ilegível, JSON malformado ou erro inesperado: só este
+        # arquivo falha, sem traceback nem derrubar os demais
+        message = str(e) or type(e).__name__
+        return {"file": path, "valid": False, "ok": False, "error_count": 1, "errors": [message], "error": message}
+
+
+def _format(command, result):
+    path = result["file"]
+    if command == "convert":
+        if result["ok"]:
+            return f"{path} -> {result['output']} ({result['nodes']} nodes, {result['connections']} conexões)"
+        return f"{path}: ERRO: {result['error']}"
+    if "errors" in result:
+        if result["valid"]:
+            return f"{path}: OK ({result['nodes']} nodes, {result['connections']} conexões)"
+        lines = [f"{path}: {result['error_count']} erro(s)"]
+        lines += [f"  {message}" for message in result["errors"]]
+        if result["error_count"] > len(result["errors"]):
+            lines.append(f"  ... e mais {result['error_count'] - len(result['errors'])}")
+        return "\n".join(lines)
+    return f"{path}:\n" + "\n".join(f"  {key}: {value}" for key, value in result.items() if key != "file")
+
+
+def _failed(command, result):
+    return not result.get("ok", True) if command == "convert" else not result.get("valid", True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Projetos do editor sem interface gráfica")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("validate", "verifica índices de nodes e pinos"),
+                            ("stats", "estatísticas do grafo"),
+                            ("convert", "converte entre JSON e .llb")):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("files", nargs="+")
+        sub.add_argument("--jobs", type=int, default=None, help="processos em paralelo (padrão: CPUs)")
+        sub.add_argument("--json", action="store_true", help="uma linha JSON por arquivo")
+        if name == "convert":
+            sub.add_argument("--to", choices=("json", "llb"), required=True)
+            sub.add_argument("--out-dir", help="pasta de destino (padrão: ao lado da origem)")
+            sub.add_argument("--compress", action="store_true", help="compacta o .llb com zlib")
+    args = parser.parse_args(argv)
+
+    options = {}
+    if args.command == "convert":
+        options = {"to": args.to, "out_dir": args.out_dir, "compress": args.compress}
+        if args.out_dir:
+            os.makedirs(args.out_dir, exist_ok=True)
+
+    def emit(result):
+        print(json.dumps(result, ensure_ascii=False) if args.json else _format(args.command, result), flush=True)
+        return _failed(args.command, result)
+
+    failures = 0
+    jobs = args.jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(args.files) == 1:
+        for path in args.files:
+            failures += emit(_run_one(args.command, path, options))
+    else:
+        with ProcessPoolExecutor(min(jobs, len(args.files))) as pool:
+            futures = [pool.submit(_run_one, args.command, path, options) for path in args.files]
+            for future in as_completed(futures):
+                failures += emit(future.result())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
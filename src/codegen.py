@@ -0,0 +1,269 @@
+# Geração de código Python a partir de diagramas de classe (sem Qt).
+#
+# Cada node com pinos "herda"/"agrega" vira um módulo com uma classe:
+#   - saída "herda" de A na entrada de B: A herda de B (classe base)
+#   - saída "agrega" de A na entrada de B: A tem um atributo do tipo B
+#   - properties viram atributos em __init__, methods viram métodos vazios
+# Um manifesto (.codegen.json) guarda o hash dos dados de cada classe; numa
+# nova geração só são reescritos os arquivos cujo hash mudou, e arquivos de
+# classes apagadas são removidos. Dentro do editor o mesmo CodeGenerator é
+# reaproveitado, e nem o hash de classes inalteradas é recalculado.
+#
+#   python -m src.codegen projeto.json saida/
+import argparse
+import hashlib
+import json
+import keyword
+import multiprocessing
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from .model import GraphModel
+
+CLASS_PINS = ("herda", "agrega")
+MANIFEST = ".codegen.json"
+
+
+def _fold(text):
+    # "Usuário" -> "Usuario": acentos viram a letra base em vez de quebrar a palavra
+    folded = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in folded if not unicodedata.combining(ch))
+
+
+def _identifier(text, fallback):
+    name = re.sub(r"\W+", "_", _fold(text.split("(")[0].strip())).strip("_")
+    if not name:
+        name = fallback
+    if name[0].isdigit():
+        name = "_" + name
+    if keyword.iskeyword(name):
+        name += "_"
+    return name
+
+
+def _class_name(title, fallback):
+    parts = re.split(r"[\W_]+", _fold(title))
+    return _identifier("".join(part[:1].upper() + part[1:] for part in parts), fallback)
+
+
+def _module_name(class_name):
+    snake = re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", class_name).lower().lstrip("_")
+    return _identifier(snake, "classe")
+
+
+def is_class_node(node):
+    return any(pin in CLASS_PINS for pin in node.outputs) or any(pin in CLASS_PINS for pin in node.inputs)
+
+
+def _spec(node, class_name, module, links):
+    bases = []
+    aggregates = []
+    for kind, target in links:
+        if kind == "herda" and target not in bases and target[1] != module:
+            bases.append(target)
+        elif kind == "agrega" and target not in aggregates:
+            aggregates.append(target)
+    return {
+        "class": class_name,
+        "module": module,
+        "description": node.description,
+        "properties": [_identifier(p, f"prop{i}") for i, p in enumerate(node.properties)],
+        "methods": [_identifier(m, f"metodo{i}") for i, m in enumerate(node.methods)],
+        "bases": bases,
+        "aggregates": aggregates,
+    }
+
+
+def spec_hash(spec):
+    return hashlib.sha1(json.dumps(spec, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def render_class(spec):
+    lines = ["# Gerado a partir do diagrama de classes; edições serão sobrescritas."]
+    for class_name, module in spec["bases"]:
+        lines.append(f"from .{module} import {class_name}")
+    lines += ["", ""]
+    bases = ", ".join(class_name for class_name, _ in spec["bases"])
+    lines.append(f"class {spec['class']}({bases}):" if bases else f"class {spec['class']}:")
+    if spec["description"]:
+        # Barras e aspas escapadas: a descrição pode terminar em '"' ou conter "\N"
+        lines.append('    """' + spec["description"].replace("\\", "\\\\").replace('"', '\\"') + '"""')
+        lines.append("")
+    body = [f"        self.{name} = None" for name in spec["properties"]]
+    body += [f"        self.{_module_name(class_name)} = None  # agrega {class_name}"
+             for class_name, _ in spec["aggregates"]]
+    lines.append("    def __init__(self):")
+    if spec["bases"]:
+        lines.append("        super().__init__()")
+    lines += body or (["        pass"] if not spec["bases"] else [])
+    for method in spec["methods"]:
+        lines += ["", f"    def {method}(self):", "        raise NotImplementedError"]
+    return "\n".join(lines) + "\n"
+
+
+def render_package(specs):
+    lines = ["# Gerado a partir do diagrama de classes; edições serão sobrescritas."]
+    for spec in sorted(specs, key=lambda s: s["module"]):
+        lines.append(f"from .{spec['module']} import {spec['class']}")
+    return "\n".join(lines) + "\n"
+
+
+def _write(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _write_chunk(out_dir, specs):
+    # Roda na pool de processos
+    for spec in specs:
+        path = os.path.join(out_dir, spec["module"] + ".py")
+        text = render_class(spec)
+        # Um título ou descrição que gere código inválido falha aqui, não no import do pacote
+        compile(text, path, "exec")
+        _write(path, text)
+    return len(specs)
+
+
+class GenerationReport:
+    def __init__(self):
+        self.written = []    # arquivos reescritos
+        self.removed = []    # arquivos de classes que não existem mais
+        self.unchanged = 0
+        self.seconds = 0.0
+
+
+class CodeGenerator:
+    # Mantém entre gerações os nomes resolvidos e o hash de cada classe; uma
+    # classe só é re-hasheada (e o arquivo reescrito) se os dados dela ou os
+    # nomes das classes ligadas a ela mudaram. workers: processos da pool
+    # (None = os.cpu_count()), usada só com parallel_above arquivos ou mais.
+    def __init__(self, out_dir, workers=None, parallel_above=2000):
+        self.out_dir = out_dir
+        self.workers = workers
+        self.parallel_above = parallel_above
+        self._manifest = None  # arquivo -> hash, como está no disco
+        self._names = {}       # título -> (classe, módulo)
+        self._classes = {}     # node_id -> (dados brutos, spec, hash)
+
+    def _load_manifest(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        try:
+            with open(os.path.join(self.out_dir, MANIFEST), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Arquivo apagado à mão: sai do manifesto para ser gerado de novo
+        return {name: digest for name, digest in manifest.items() if os.path.exists(os.path.join(self.out_dir, name))}
+
+    def _name(self, title):
+        names = self._names.get(title)
+        if names is None:
+            class_name = _class_name(title, "Classe")
+            names = self._names[title] = (class_name, _module_name(class_name))
+        return names
+
+    def class_specs(self, model):
+        # {node_id: (spec, hash)}; nomes únicos (títulos repetidos ganham o id)
+        nodes = [node for node in model.nodes.values() if is_class_node(node)]
+        names = {}
+        taken = set()
+        for node in sorted(nodes, key=lambda n: n.id):
+            class_name, module = self._name(node.title)
+            if module in taken or module == "__init__":
+                class_name, module = f"{class_name}{node.id}", f"{module}_{node.id}"
+            taken.add(module)
+            names[node.id] = (class_name, module)
+
+        previous = self._classes
+        current = {}
+        for node in nodes:
+            outputs = node.outputs
+            links = tuple(
+                (outputs[edge.from_idx], names[edge.to_node])
+                for edge in sorted(model.out_edges(node.id), key=lambda e: e.id)
+                if edge.to_node in names and edge.from_idx < len(outputs)
+            )
+            class_name, module = names[node.id]
+            raw = (class_name, module, node.description, tuple(node.properties), tuple(node.methods), links)
+            known = previous.get(node.id)
+            if known is not None and known[0] == raw:
+                current[node.id] = known
+            else:
+                spec = _spec(node, class_name, module, links)
+                current[node.id] = (raw, spec, spec_hash(spec))
+        self._classes = current
+        return {node_id: (spec, digest) for node_id, (_, spec, digest) in current.items()}
+
+    def generate(self, model):
+        start = time.perf_counter()
+        report = GenerationReport()
+        out_dir = self.out_dir
+        old = self._manifest if self._manifest is not None else self._load_manifest()
+
+        classes = self.class_specs(model).values()
+        hashes = {}
+        changed = []
+        for spec, digest in classes:
+            filename = spec["module"] + ".py"
+            hashes[filename] = digest
+            if old.get(filename) != digest:
+                changed.append(spec)
+        package_digest = spec_hash(sorted((spec["module"], spec["class"]) for spec, _ in classes))
+        hashes["__init__.py"] = package_digest
+
+        count = self.workers or os.cpu_count() or 1
+        if len(changed) >= self.parallel_above and count > 1:
+            size = (len(changed) + count - 1) // count
+            chunks = [changed[i:i + size] for i in range(0, len(changed), size)]
+            # spawn: seguro também quando chamado de dentro do editor (Qt)
+            with ProcessPoolExecutor(count, mp_context=multiprocessing.get_context("spawn")) as pool:
+                list(pool.map(_write_chunk, [out_dir] * len(chunks), chunks))
+        else:
+            _write_chunk(out_dir, changed)
+        report.written = [spec["module"] + ".py" for spec in changed]
+        if old.get("__init__.py") != package_digest:
+            _write(os.path.join(out_dir, "__init__.py"), render_package([spec for spec, _ in classes]))
+            report.written.append("__init__.py")
+
+        for filename in old:
+            if filename not in hashes:
+                try:
+                    os.remove(os.path.join(out_dir, filename))
+                except FileNotFoundError:
+                    pass
+                report.removed.append(filename)
+        report.unchanged = len(hashes) - len(report.written)
+        if report.written or report.removed:
+            _write(os.path.join(out_dir, MANIFEST), json.dumps(hashes, indent=0, sort_keys=True))
+        self._manifest = hashes
+        report.seconds = time.perf_counter() - start
+        return report
+
+
+def generate(model, out_dir, workers=None):
+    return CodeGenerator(out_dir, workers).generate(model)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera classes Python a partir de um diagrama de classes")
+    parser.add_argument("project", help="arquivo .json ou .llb")
+    parser.add_argument("out_dir", help="pacote de saída")
+    parser.add_argument("--workers", type=int, default=None, help="processos para gerações grandes")
+    args = parser.parse_args(argv)
+    try:
+        report = generate(GraphModel.load(args.project), args.out_dir, args.workers)
+    except (OSError, SyntaxError, ValueError) as e:
+        print(f"Erro ao gerar código: {e}", file=sys.stderr)
+        return 1
+    print(f"{len(report.written)} arquivos gerados, {len(report.removed)} removidos, "
+          f"{report.unchanged} inalterados em {report.seconds * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,46 @@
 from PyQt5.QtWidgets import QGraphicsPathItem
 from PyQt5.QtGui import QPainterPath, QPen, QColor
-from PyQt5.QtCore import QPointF
+from PyQt5.QtCore import QPointF, QTimer
 from PyQt5.QtCore import Qt
+from .lod import LOD, FULL
+from .profiler import profiler
+
+
+class PathUpdateBatch:
+    # Acumula conexões cujo caminho ficou desatualizado (ex.: node arrastado)
+    # e recalcula cada uma uma única vez no próximo ciclo do event loop,
+    # mesmo que as duas pontas tenham se movido.
+    def __init__(self):
+        self._dirty = {}
+        self._scheduled = False
+        self.last_flush_rebuilds = 0  # caminhos refeitos no último flush (≈ por frame)
+
+    def mark_dirty(self, connections):
+        for conn in connections:
+            self._dirty[conn] = None
+        if self._dirty and not self._scheduled:
+            self._scheduled = True
+            QTimer.singleShot(0, self.flush)
+
+    def discard(self, conn):
+        self._dirty.pop(conn, None)
+
+    def flush(self):
+        dirty = self._dirty
+        self._dirty = {}
+        self._scheduled = False
+        for conn in dirty:
+            conn.update_path()
+        self.last_flush_rebuilds = len(dirty)
+
+
+path_updates = PathUpdateBatch()
+
 
 class ConnectionItem(QGraphicsPathItem):
+    # Total de caminhos recalculados desde o início (instrumentação)
+    path_rebuilds = 0
+
     def __init__(self, node_from, idx_from, node_to=None, idx_to=None):
         super().__init__()
         self.node_from = node_from
@@ -11,10 +48,22 @@ class ConnectionItem(QGraphicsPathItem):
         self.node_to = node_to
         self.idx_to = idx_to
         self.temp_end_pos = None  # Para arraste dinâmico
+        self.edge = None  # EdgeData no GraphModel, definido quando a conexão é registrada
+        self.start_pos = QPointF(0, 0)
+        self.end_pos = QPointF(0, 0)
         self.setZValue(-1)
         self.setPen(QPen(QColor(50, 50, 200), 3, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
         self.update_path()
 
+    def bind(self, node_from, idx_from, node_to, idx_to):
+        # Reaproveita o item (fora da cena) para outra conexão
+        self.node_from = node_from
+        self.idx_from = idx_from
+        self.node_to = node_to
+        self.idx_to = idx_to
+        self.temp_end_pos = None
+        self.update_path()
+
     def set_end_pos(self, pos):
         self.temp_end_pos = pos
         self.update_path()
@@ -25,6 +74,7 @@ class ConnectionItem(QGraphicsPathItem):
         self.update_path()
 
     def update_path(self):
+        ConnectionItem.path_rebuilds += 1
         if self.node_from and self.idx_from is not None:
             start_pos = self.node_from.get_output_pin_scene_pos(self.idx_from)
         else:
@@ -35,9 +85,21 @@ class ConnectionItem(QGraphicsPathItem):
             end_pos = self.temp_end_pos
         else:
             end_pos = start_pos
+        self.start_pos = start_pos
+        self.end_pos = end_pos
         path = QPainterPath(start_pos)
         dx = (end_pos.x() - start_pos.x()) * 0.5
         c1 = start_pos + QPointF(dx, 0)
         c2 = end_pos - QPointF(dx, 0)
         path.cubicTo(c1, c2, end_pos)
-        self.setPath(path)
\ No newline at end of file
+        self.setPath(path)
+        if profiler.enabled:
+            profiler.path_rebuilt(self)
+
+    def paint(self, painter, option, widget=None):
+        # Com zoom baixo desenha uma reta no lugar da Bézier
+        if LOD.level(option.levelOfDetailFromTransform(painter.worldTransform())) != FULL:
+            painter.setPen(self.pen())
+            painter.drawLine(self.start_pos, self.end_pos)
+            return
+        super().paint(painter, option, widget)
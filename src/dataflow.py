@@ -0,0 +1,290 @@
+# Execução de fluxogramas (sem Qt).
+#
+# O grafo do GraphModel vira um plano em ordem topológica; cada node chama uma
+# função Python (procurada pelo id do node ou pelo título) com um valor por
+# pino de entrada e devolve um valor por pino de saída. Saídas ficam em cache
+# por node, indexadas pelos valores de entrada: num novo run, ramos cujas
+# entradas não mudaram não são recalculados. Nodes independentes rodam em
+# paralelo numa pool de threads ou de processos.
+#
+#   python -m src.dataflow projeto.json --blocks meus_blocos --workers 4
+#
+# onde meus_blocos define BLOCKS = {"Título": função, node_id: função, ...}.
+import argparse
+import importlib
+import json
+import pickle
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from .model import GraphModel
+
+
+class CycleError(ValueError):
+    def __init__(self, nodes):
+        super().__init__(f"Ciclo no fluxograma: {' -> '.join(str(n) for n in nodes)}")
+        self.nodes = nodes
+
+
+class NodeExecutionError(RuntimeError):
+    def __init__(self, node_id, title, error):
+        super().__init__(f"Node {node_id} ({title}): {error}")
+        self.node_id = node_id
+        self.error = error
+
+
+class Plan:
+    # order: ids em ordem topológica
+    # inputs: node_id -> por pino de entrada, [(node de origem, pino de saída)]
+    # upstream/downstream: nodes vizinhos (sem repetição)
+    def __init__(self, model, order, inputs, upstream, downstream):
+        self.model = model
+        self.order = order
+        self.inputs = inputs
+        self.upstream = upstream
+        self.downstream = downstream
+
+
+def compile_plan(model):
+    inputs = {}
+    upstream = {}
+    downstream = {node_id: set() for node_id in model.nodes}
+    for node_id, node in model.nodes.items():
+        pins = [[] for _ in node.inputs]
+        sources = set()
+        for edge in sorted(model.in_edges(node_id), key=lambda e: e.id):
+            # Pino inexistente falha aqui, com o node, e não como IndexError no run
+            if not 0 <= edge.to_idx < len(pins):
+                message = f"conexão {edge.id} chega na entrada {edge.to_idx} de {len(pins)}"
+                raise NodeExecutionError(node_id, node.title, message)
+            source = model.nodes[edge.from_node]
+            if not 0 <= edge.from_idx < len(source.outputs):
+                message = f"conexão {edge.id} sai da saída {edge.from_idx} de {len(source.outputs)}"
+                raise NodeExecutionError(edge.from_node, source.title, message)
+            pins[edge.to_idx].append((edge.from_node, edge.from_idx))
+            sources.add(edge.from_node)
+            downstream[edge.from_node].add(node_id)
+        inputs[node_id] = pins
+        upstream[node_id] = sources
+
+    pending = {node_id: len(sources) for node_id, sources in upstream.items()}
+    order = [node_id for node_id in model.nodes if not pending[node_id]]
+    for node_id in order:
+        for target in downstream[node_id]:
+            pending[target] -= 1
+            if not pending[target]:
+                order.append(target)
+    if len(order) < len(model.nodes):
+        raise CycleError(_find_cycle(model, {n for n, count in pending.items() if count}))
+    return Plan(model, order, inputs, upstream, downstream)
+
+
+def _find_cycle(model, remaining):
+    # Os nodes que sobraram do Kahn contêm ao menos um ciclo; anda pelos
+    # predecessores (que também sobraram) até repetir um node
+    node_id = next(iter(remaining))
+    seen = {}
+    path = []
+    while node_id not in seen:
+        seen[node_id] = len(path)
+        path.append(node_id)
+        node_id = next(p for p in model.predecessors(node_id) if p in remaining)
+    cycle = path[seen[node_id]:]
+    cycle.reverse()
+    return cycle + [cycle[0]]
+
+
+def _cache_key(values):
+    try:
+        hash(values)
+        return values
+    except TypeError:
+        # Listas/dicts: compara pelo conteúdo serializado
+        return pickle.dumps(values)
+
+
+def _call(function, args):
+    # Roda na pool (precisa ser uma função de módulo para processos)
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def _passthrough(*values):
+    return values[0] if len(values) == 1 else values
+
+
+class RunReport:
+    def __init__(self):
+        self.outputs = {}   # node_id -> tupla com um valor por pino de saída
+        self.timings = {}   # node_id -> segundos na função (0 se veio do cache)
+        self.cached = []    # nodes não recalculados
+        self.total = 0.0
+
+    def slowest(self, count=10):
+        return sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "timings": {str(node_id): seconds for node_id, seconds in self.timings.items()},
+            "cached": self.cached,
+            "outputs": {str(node_id): [repr(value) for value in values] for node_id, values in self.outputs.items()},
+        }
+
+
+class DataflowEngine:
+    # functions: {node_id ou título: função}; nodes sem função repassam as
+    # entradas para as saídas. workers=0 roda tudo na thread atual.
+    def __init__(self, functions=None, workers=0, processes=False, cache_size=16):
+        self.functions = functions or {}
+        self.workers = workers
+        self.processes = processes
+        self.cache_size = cache_size
+        self._cache = {}  # node_id -> {chave das entradas: saídas}
+
+    def clear_cache(self, node_ids=None):
+        if node_ids is None:
+            self._cache.clear()
+        else:
+            for node_id in node_ids:
+                self._cache.pop(node_id, None)
+
+    def resolve(self, node):
+        function = self.functions.get(node.id)
+        if function is None:
+            function = self.functions.get(node.title, _passthrough)
+        return function
+
+    def run(self, model, inputs=None):
+        # inputs: {node_id: [valor por pino de entrada]} para pinos sem conexão
+        plan = model if isinstance(model, Plan) else compile_plan(model)
+        inputs = inputs or {}
+        report = RunReport()
+        start = time.perf_counter()
+        if self.workers:
+            pool_class = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+            with pool_class(max_workers=self.workers) as pool:
+                self._run_parallel(plan, inputs, report, pool)
+        else:
+            for node_id in plan.order:
+                args, key, function = self._prepare(plan, node_id, inputs, report)
+                if key is not None:
+                    try:
+                        result, seconds = _call(function, args)
+                    except Exception as e:
+                        raise NodeExecutionError(node_id, plan.model.nodes[node_id].title, e) from e
+                    self._finish(plan, node_id, key, result, seconds, report)
+        report.total = time.perf_counter() - start
+        return report
+
+    def _run_parallel(self, plan, inputs, report, pool):
+        pending = {node_id: len(sources) for node_id, sources in plan.upstream.items()}
+        ready = [node_id for node_id in plan.order if not pending[node_id]]
+        running = {}
+        while ready or running:
+            while ready:
+                node_id = ready.pop()
+                args, key, function = self._prepare(plan, node_id, inputs, report)
+                if key is None:
+                    ready.extend(self._release(plan, node_id, pending))
+                else:
+                    running[pool.submit(_call, function, args)] = (node_id, key)
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node_id, key = running.pop(future)
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    for other in running:
+                        other.cancel()
+                    raise NodeExecutionError(node_id, plan.model.nodes[node_id].title, e) from e
+                self._finish(plan, node_id, key, result, seconds, report)
+                ready.extend(self._release(plan, node_id, pending))
+
+    def _release(self, plan, node_id, pending):
+        released = []
+        for target in plan.downstream[node_id]:
+            pending[target] -= 1
+            if not pending[target]:
+                released.append(target)
+        return released
+
+    def _prepare(self, plan, node_id, inputs, report):
+        # Monta os argumentos; se as entradas já foram vistas, usa o cache e
+        # devolve key=None (nada a executar)
+        outputs = report.outputs
+        external = inputs.get(node_id, ())
+        args = []
+        for pin, sources in enumerate(plan.inputs[node_id]):
+            if not sources:
+                args.append(external[pin] if pin < len(external) else None)
+            elif len(sources) == 1:
+                source, idx = sources[0]
+                args.append(outputs[source][idx])
+            else:
+                # Várias conexões no mesmo pino: tupla na ordem das arestas
+                args.append(tuple(outputs[source][idx] for source, idx in sources))
+        args = tuple(args)
+        node = plan.model.nodes[node_id]
+        function = self.resolve(node)
+        key = (function, _cache_key(args))
+        cached = self._cache.get(node_id)
+        if cached is not None and key in cached:
+            outputs[node_id] = cached[key]
+            report.timings[node_id] = 0.0
+            report.cached.append(node_id)
+            return args, None, function
+        return args, key, function
+
+    def _finish(self, plan, node_id, key, result, seconds, report):
+        node = plan.model.nodes[node_id]
+        count = len(node.outputs)
+        if count == 1:
+            values = (result,)
+        elif count == 0:
+            values = ()
+        else:
+            try:
+                values = tuple(result)
+            except TypeError:
+                values = None
+            if values is None or len(values) != count:
+                raise NodeExecutionError(node_id, node.title, f"esperava {count} saídas, recebeu {result!r}")
+        cached = self._cache.setdefault(node_id, {})
+        if len(cached) >= self.cache_size:
+            del cached[next(iter(cached))]  # descarta a entrada mais antiga
+        cached[key] = values
+        report.outputs[node_id] = values
+        report.timings[node_id] = seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa um fluxograma salvo")
+    parser.add_argument("project", help="arquivo .json ou .llb")
+    parser.add_argument("--blocks", help="módulo com BLOCKS = {título ou id: função}")
+    parser.add_argument("--workers", type=int, default=0, help="nodes em paralelo (0 = sequencial)")
+    parser.add_argument("--processes", action="store_true", help="pool de processos em vez de threads")
+    parser.add_argument("--json", action="store_true", help="relatório em JSON")
+    args = parser.parse_args(argv)
+    functions = importlib.import_module(args.blocks).BLOCKS if args.blocks else {}
+    model = GraphModel.load(args.project)
+    engine = DataflowEngine(functions, args.workers, args.processes)
+    try:
+        report = engine.run(model)
+    except (CycleError, NodeExecutionError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2, ensure_ascii=False))
+        return 0
+    print(f"{len(report.timings)} nodes em {report.total * 1000:.1f} ms ({len(report.cached)} do cache)")
+    for node_id, seconds in report.slowest():
+        print(f"  {node_id:>6}  {model.nodes[node_id].title:<30} {seconds * 1000:9.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
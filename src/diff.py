@@ -0,0 +1,595 @@
+# Diff estrutural e merge de três vias de projetos (sem Qt).
+#
+# Nodes são pareados pelo "id" salvo no projeto; os que sobram (arquivos
+# antigos sem id, nodes recriados) são pareados pelo conteúdo (hash da tupla
+# de campos, com e depois sem a posição) e por fim pelo título, se ele for
+# único nos dois lados. Tudo em dicts: o custo é linear no tamanho do projeto
+# e nodes inalterados custam só uma comparação de tuplas. Pinos renomeados
+# continuam sendo o mesmo pino (alinhamento com difflib), e conexões são
+# comparadas pelas pontas (node, pino), não pela posição na lista.
+#
+#   python -m src.diff diff antigo.json novo.json [--json]
+#   python -m src.diff merge base.json nosso.json deles.json -o saida.json
+#
+# Como driver do git (com PYTHONPATH apontando para este repositório):
+#   git config merge.logiclink.driver "python -m src.diff merge %O %A %B -o %A"
+#   git config diff.logiclink.command "python -m src.diff git-diff"
+#   .gitattributes:  *.json merge=logiclink diff=logiclink
+import argparse
+import difflib
+import json
+import sys
+from collections import Counter
+from . import binformat
+from .model import without_gc
+
+TEXT_FIELDS = ("title", "description")
+ITEM_FIELDS = ("inputs", "outputs", "properties", "methods")
+PIN_LABELS = {"inputs": "entrada", "outputs": "saída", "properties": "propriedade", "methods": "método"}
+_MISSING = object()
+
+
+def read_project(path):
+    # (dados no esquema de save_project, True se o arquivo é binário). O
+    # formato é detectado pelo conteúdo: o git passa arquivos temporários
+    # sem extensão para o driver; arquivo vazio é um projeto vazio
+    with open(path, "rb") as f:
+        head = f.read(len(binformat.MAGIC))
+        if head == binformat.MAGIC:
+            return binformat.load(path), True
+        text = head + f.read()
+    if not text.strip():
+        return {"nodes": [], "connections": []}, False
+    return json.loads(text.decode("utf-8")), False
+
+
+def write_project(data, path, binary=False):
+    if binary:
+        binformat.dump(data, path)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+class Snapshot:
+    # Uma versão do projeto pronta para comparação. A chave de cada node é o
+    # "id" salvo; sem id (ou id repetido) vira "#<posição na lista>"
+    def __init__(self, data):
+        self.nodes = {}    # chave -> dict do node
+        self.content = {}  # chave -> tupla com os campos (sem a posição)
+        self.pos = {}      # chave -> (x, y)
+        self.next_ids = data.get("next_ids") or {}  # contadores salvos (ver GraphModel.next_ids)
+        keys = []
+        for idx, node in enumerate(data.get("nodes", [])):
+            key = node.get("id")
+            if key is None or key in self.nodes:
+                key = f"#{idx}"
+            keys.append(key)
+            self.nodes[key] = node
+            self.content[key] = (
+                node.get("title", "Node"), tuple(node.get("inputs", [])), tuple(node.get("outputs", [])),
+                node.get("description", ""), tuple(node.get("properties", [])), tuple(node.get("methods", []))
+            )
+            x, y = node.get("pos", [0, 0])
+            self.pos[key] = (float(x), float(y))
+        try:
+            self.edges = [(keys[c["from_node"]], c["from_idx"], keys[c["to_node"]], c["to_idx"], c.get("id"))
+                          for c in data.get("connections", [])]
+        except (IndexError, KeyError, TypeError):
+            raise ValueError("Conexão inválida no projeto (verifique com python -m src.cli validate)")
+
+    def field(self, key, field):
+        return list(self.nodes[key].get(field, [])) if field in ITEM_FIELDS else self.nodes[key].get(field, "")
+
+
+def match_nodes(old, new):
+    # {chave antiga: chave nova}
+    matches = {}
+    for key in old.nodes:
+        if isinstance(key, int) and key in new.nodes:
+            matches[key] = key
+    if len(matches) == len(old.nodes) or len(matches) == len(new.nodes):
+        return matches
+    matched = set(matches.values())
+    rest_old = [key for key in old.nodes if key not in matches]
+    rest_new = [key for key in new.nodes if key not in matched]
+    signatures = (
+        (lambda s, k: (s.content[k], s.pos[k]), False),
+        (lambda s, k: s.content[k], False),
+        # Daqui em diante só pares únicos: mesmos pinos no mesmo lugar, mesmo título
+        (lambda s, k: (s.content[k][1], s.content[k][2], s.pos[k]), True),
+        (lambda s, k: s.content[k][0], True),
+    )
+    for signature, unique in signatures:
+        if not rest_old or not rest_new:
+            break
+        buckets = {}
+        for key in rest_new:
+            buckets.setdefault(signature(new, key), []).append(key)
+        if unique:
+            counts = Counter(signature(old, key) for key in rest_old)
+        paired = set()
+        for key in rest_old:
+            sig = signature(old, key)
+            bucket = buckets.get(sig)
+            if not bucket or unique and (len(bucket) > 1 or counts[sig] > 1):
+                continue
+            target = bucket.pop(0)
+            matches[key] = target
+            paired.add(target)
+        rest_old = [key for key in rest_old if key not in matches]
+        rest_new = [key for key in rest_new if key not in paired]
+    return matches
+
+
+def align_items(old, new):
+    # ({índice antigo: índice novo}, operações) transformando old em new:
+    # remoções em ordem decrescente, inserções em ordem crescente e por fim
+    # renomeações (itens trocados um a um contam como o mesmo item)
+    mapping = {}
+    removed, inserted, renamed = [], [], []
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        paired = (i2 - i1) if tag == "equal" else min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for k in range(paired):
+            mapping[i1 + k] = j1 + k
+            if tag == "replace":
+                renamed.append((j1 + k, old[i1 + k], new[j1 + k]))
+        removed.extend((i, old[i]) for i in range(i1 + paired, i2))
+        inserted.extend((j, new[j]) for j in range(j1 + paired, j2))
+    ops = [("remove_item", i, value, None) for i, value in reversed(removed)]
+    ops += [("insert_item", j, None, value) for j, value in inserted]
+    ops += [("set_item", j, old_value, value) for j, old_value, value in renamed]
+    return mapping, ops
+
+
+class ProjectDiff:
+    def __init__(self):
+        self.changes = []   # operações no vocabulário do journal (ver journal.py)
+        self.matches = {}   # chave antiga -> chave nova
+
+    def node_marks(self):
+        # {chave nova: "added" | "changed" | "moved"} para destacar na view
+        marks = {}
+        for change in self.changes:
+            kind = change["op"]
+            if kind == "add_node":
+                marks[change["node"]["id"]] = "added"
+            elif kind == "move":
+                marks.setdefault(change["id"], "moved")
+            elif kind == "add_edge" or kind == "remove_edge":
+                edge = change["edge"]
+                for end in ("from_node", "to_node"):
+                    key = edge[end] if kind == "add_edge" else self.matches.get(edge[end])
+                    if key is not None and marks.get(key) != "added":
+                        marks[key] = "changed"
+            elif kind != "remove_node" and marks.get(change["id"]) != "added":
+                marks[change["id"]] = "changed"
+        return marks
+
+    def summary(self):
+        return dict(Counter(change["op"] for change in self.changes))
+
+    def to_dict(self):
+        return {"summary": self.summary(), "changes": self.changes}
+
+
+def _diff_node(diff, old, new, old_key, new_key):
+    changes = diff.changes
+    if old.pos[old_key] != new.pos[new_key]:
+        changes.append({"op": "move", "id": new_key, "pos": list(new.pos[new_key]), "old": list(old.pos[old_key])})
+    if old.content[old_key] == new.content[new_key]:
+        return None
+    pin_maps = {}
+    for field in TEXT_FIELDS:
+        before, after = old.field(old_key, field), new.field(new_key, field)
+        if before != after:
+            changes.append({"op": "set", "id": new_key, "field": field, "value": after, "old": before})
+    for field in ITEM_FIELDS:
+        before, after = old.field(old_key, field), new.field(new_key, field)
+        if before == after:
+            continue
+        mapping, ops = align_items(before, after)
+        if field == "inputs" or field == "outputs":
+            pin_maps[field] = mapping
+        for kind, index, old_value, value in ops:
+            change = {"op": kind, "id": new_key, "field": field, "index": index}
+            if value is not None:
+                change["value"] = value
+            if old_value is not None:
+                change["old"] = old_value
+            changes.append(change)
+    return pin_maps or None
+
+
+@without_gc
+def diff_projects(old_data, new_data):
+    old, new = Snapshot(old_data), Snapshot(new_data)
+    diff = ProjectDiff()
+    matches = diff.matches = match_nodes(old, new)
+    matched = set(matches.values())
+    for key in old.nodes:
+        if key not in matches:
+            diff.changes.append({"op": "remove_node", "id": key, "node": old.nodes[key]})
+    pin_maps = {}
+    for old_key, new_key in matches.items():
+        # Caminho rápido: nodes inalterados custam uma comparação de tuplas
+        if old.content[old_key] != new.content[new_key] or old.pos[old_key] != new.pos[new_key]:
+            maps = _diff_node(diff, old, new, old_key, new_key)
+            if maps is not None:
+                pin_maps[old_key] = maps
+    for key in new.nodes:
+        if key not in matched:
+            node = dict(new.nodes[key])
+            node["id"] = key
+            diff.changes.append({"op": "add_node", "node": node})
+
+    # Conexões antigas traduzidas para as chaves e pinos novos; as que caem
+    # num node ou pino removido não têm tradução
+    def translate(f, fi, t, ti):
+        if f not in matches or t not in matches:
+            return None
+        maps = pin_maps.get(f)
+        if maps is not None and "outputs" in maps:
+            fi = maps["outputs"].get(fi)
+        maps = pin_maps.get(t)
+        if maps is not None and "inputs" in maps:
+            ti = maps["inputs"].get(ti)
+        if fi is None or ti is None:
+            return None
+        return (matches[f], fi, matches[t], ti)
+
+    old_edges = {}
+    for f, fi, t, ti, _ in old.edges:
+        old_edges.setdefault(translate(f, fi, t, ti), []).append((f, fi, t, ti))
+    new_edges = Counter((f, fi, t, ti) for f, fi, t, ti, _ in new.edges)
+    for key, originals in old_edges.items():
+        extra = len(originals) - (new_edges.get(key, 0) if key is not None else 0)
+        for f, fi, t, ti in originals[len(originals) - extra:] if extra > 0 else ():
+            diff.changes.append({"op": "remove_edge", "edge": {"from_node": f, "from_idx": fi, "to_node": t, "to_idx": ti}})
+    for key, count in new_edges.items():
+        extra = count - len(old_edges.get(key, ()))
+        f, fi, t, ti = key
+        for _ in range(extra):
+            diff.changes.append({"op": "add_edge", "edge": {"from_node": f, "from_idx": fi, "to_node": t, "to_idx": ti}})
+    return diff
+
+
+def describe(change):
+    kind = change["op"]
+    if kind == "add_node":
+        return f"+ node {change['node']['id']} \"{change['node'].get('title', 'Node')}\""
+    if kind == "remove_node":
+        return f"- node {change['id']} \"{change['node'].get('title', 'Node')}\""
+    if kind == "move":
+        return f"~ node {change['id']}: movido de ({change['old'][0]:g}, {change['old'][1]:g}) para ({change['pos'][0]:g}, {change['pos'][1]:g})"
+    if kind == "set":
+        return f"~ node {change['id']}: {change['field']} {change['old']!r} -> {change['value']!r}"
+    if kind in ("insert_item", "remove_item", "set_item"):
+        label = f"{PIN_LABELS[change['field']]} {change['index']}"
+        if kind == "insert_item":
+            return f"~ node {change['id']}: + {label} {change['value']!r}"
+        if kind == "remove_item":
+            return f"~ node {change['id']}: - {label} {change['old']!r}"
+        return f"~ node {change['id']}: {label} {change['old']!r} -> {change['value']!r}"
+    edge = change["edge"]
+    sign = "+" if kind == "add_edge" else "-"
+    return f"{sign} conexão {edge['from_node']}.saída[{edge['from_idx']}] -> {edge['to_node']}.entrada[{edge['to_idx']}]"
+
+
+class _Side:
+    # Uma versão (base, nossa ou deles) vista a partir da base: nodes e pinos
+    # que vieram da base ganham a chave da base, o resto a chave do lado
+    def __init__(self, name, snapshot, base, matches):
+        self.name = name
+        self.snapshot = snapshot
+        self.base = base
+        self.to_base = {new: old for old, new in matches.items()}
+        self.alias = {}   # chave deste lado -> chave de um node idêntico de "ours"
+        self._pins = {}   # (chave, campo) -> {índice aqui: índice na base}, só pinos alterados
+
+    def node_key(self, key):
+        base_key = self.to_base.get(key, _MISSING)
+        if base_key is not _MISSING:
+            return ("base", base_key)
+        if key in self.alias:
+            return ("ours", self.alias[key])
+        return (self.name, key)
+
+    def pin_key(self, key, field, idx):
+        base_key = self.to_base.get(key, _MISSING)
+        if base_key is _MISSING:
+            return ("ours" if key in self.alias else self.name, idx)
+        slot = 1 if field == "inputs" else 2  # posição dos pinos em Snapshot.content
+        if self.snapshot.content[key][slot] == self.base.content[base_key][slot]:
+            return ("base", idx)
+        cache_key = (key, field)
+        inverse = self._pins.get(cache_key, _MISSING)
+        if inverse is _MISSING:
+            before, after = self.base.field(base_key, field), self.snapshot.field(key, field)
+            inverse = self._pins[cache_key] = {new: old for old, new in align_items(before, after)[0].items()}
+        base_idx = inverse.get(idx)
+        return ("base", base_idx) if base_idx is not None else (self.name, idx)
+
+    def edge_keys(self):
+        # [((node, lado do pino, pino, node, lado do pino, pino), id)]; a tradução de cada node é feita uma vez:
+        # (chave combinada, prefixo dos pinos de entrada, de saída), com
+        # prefixo None quando os pinos mudaram e cada índice precisa de pin_key
+        ends = {}
+        keys = []
+        for f, fi, t, ti, edge_id in self.snapshot.edges:
+            source = ends.get(f)
+            if source is None:
+                source = ends[f] = self._end(f)
+            target = ends.get(t)
+            if target is None:
+                target = ends[t] = self._end(t)
+            from_tag, to_tag = source[2], target[1]
+            if from_tag is None:
+                from_tag, fi = self.pin_key(f, "outputs", fi)
+            if to_tag is None:
+                to_tag, ti = self.pin_key(t, "inputs", ti)
+            # Tupla plana: milhões de tuplas aninhadas pesariam no tempo total
+            keys.append(((source[0], from_tag, fi, target[0], to_tag, ti), edge_id))
+        return keys
+
+    def _end(self, key):
+        node_key = self.node_key(key)
+        base_key = self.to_base.get(key, _MISSING)
+        if base_key is _MISSING:
+            return node_key, node_key[0], node_key[0]
+        content, base_content = self.snapshot.content[key], self.base.content[base_key]
+        return (node_key, "base" if content[1] == base_content[1] else None,
+                "base" if content[2] == base_content[2] else None)
+
+
+class MergeResult:
+    def __init__(self):
+        self.data = None      # projeto combinado (esquema de save_project)
+        self.conflicts = []   # {"id", "title", "field", "base", "ours", "theirs"} ou {"id", "title", "reason"}
+
+    @property
+    def clean(self):
+        return not self.conflicts
+
+
+@without_gc
+def merge_projects(base_data, ours_data, theirs_data, prefer="ours"):
+    # Merge de três vias campo a campo: o lado que mudou em relação à base
+    # vence; mudanças diferentes no mesmo campo são conflito e ficam com o
+    # lado "prefer". Nodes removidos de um lado e alterados no outro são
+    # mantidos (conflito). Conexões: base + adicionadas - removidas.
+    base, ours, theirs = Snapshot(base_data), Snapshot(ours_data), Snapshot(theirs_data)
+    sides = {
+        "base": _Side("base", base, base, {key: key for key in base.nodes}),
+        "ours": _Side("ours", ours, base, match_nodes(base, ours)),
+        "theirs": _Side("theirs", theirs, base, match_nodes(base, theirs)),
+    }
+    ours_side, theirs_side = sides["ours"], sides["theirs"]
+    from_ours = {base_key: key for key, base_key in ours_side.to_base.items()}
+    from_theirs = {base_key: key for key, base_key in theirs_side.to_base.items()}
+    result = MergeResult()
+
+    # Nodes combinados: chave combinada -> (campos, {campo de pinos: (lado,
+    # chave no lado)}, id preferido, [(lado, chave)] onde o node existe)
+    merged = {}
+
+    def changed(side, key, base_key):
+        return (side.snapshot.content[key] != base.content[base_key]
+                or side.snapshot.pos[key] != base.pos[base_key])
+
+    def take(side, key):
+        title, inputs, outputs, description, properties, methods = side.snapshot.content[key]
+        fields = {"title": title, "inputs": list(inputs), "outputs": list(outputs), "description": description,
+                  "properties": list(properties), "methods": list(methods), "pos": list(side.snapshot.pos[key])}
+        return fields, {"inputs": (side, key), "outputs": (side, key)}
+
+    for base_key in base.nodes:
+        ours_key = from_ours.get(base_key, _MISSING)
+        theirs_key = from_theirs.get(base_key, _MISSING)
+        if ours_key is _MISSING and theirs_key is _MISSING:
+            continue
+        if ours_key is _MISSING or theirs_key is _MISSING:
+            side, key = (theirs_side, theirs_key) if ours_key is _MISSING else (ours_side, ours_key)
+            if changed(side, key, base_key):
+                fields, pins = take(side, key)
+                merged[("base", base_key)] = (fields, pins, key, [(side, key)])
+                other = "ours" if side is theirs_side else "theirs"
+                result.conflicts.append({"id": ("base", base_key), "title": fields["title"],
+                                         "reason": f"removido em {other}, alterado em {side.name}"})
+            continue
+        # Caminho rápido: inalterado de um dos lados (o caso comum)
+        theirs_changed = changed(theirs_side, theirs_key, base_key)
+        if not theirs_changed or not changed(ours_side, ours_key, base_key):
+            side, key = (theirs_side, theirs_key) if theirs_changed else (ours_side, ours_key)
+            fields, pins = take(side, key)
+            merged[("base", base_key)] = (fields, pins, ours_key, [(ours_side, ours_key), (theirs_side, theirs_key)])
+            continue
+        fields, pins = {}, {}
+        for field in TEXT_FIELDS + ITEM_FIELDS + ("pos",):
+            if field == "pos":
+                values = (list(base.pos[base_key]), list(ours.pos[ours_key]), list(theirs.pos[theirs_key]))
+            else:
+                values = (base.field(base_key, field), ours.field(ours_key, field), theirs.field(theirs_key, field))
+            base_value, ours_value, theirs_value = values
+            if ours_value == theirs_value or theirs_value == base_value:
+                winner = "ours"
+            elif ours_value == base_value:
+                winner = "theirs"
+            else:
+                winner = prefer
+                result.conflicts.append({"id": ("base", base_key), "title": ours.field(ours_key, "title"), "field": field,
+                                         "base": base_value, "ours": ours_value, "theirs": theirs_value})
+            fields[field] = ours_value if winner == "ours" else theirs_value
+            if field == "inputs" or field == "outputs":
+                pins[field] = (ours_side, ours_key) if winner == "ours" else (theirs_side, theirs_key)
+        merged[("base", base_key)] = (fields, pins, ours_key, [(ours_side, ours_key), (theirs_side, theirs_key)])
+
+    # Nodes novos; um node idêntico criado dos dois lados entra uma vez só
+    added_ours = {}
+    for key in ours.nodes:
+        if key not in ours_side.to_base:
+            fields, pins = take(ours_side, key)
+            merged[("ours", key)] = (fields, pins, key, [(ours_side, key)])
+            added_ours.setdefault((key, ours.content[key], ours.pos[key]), key)
+    for key in theirs.nodes:
+        if key not in theirs_side.to_base:
+            twin = added_ours.get((key, theirs.content[key], theirs.pos[key]))
+            if twin is not None:
+                theirs_side.alias[key] = twin
+                continue
+            fields, pins = take(theirs_side, key)
+            merged[("theirs", key)] = (fields, pins, key, [(theirs_side, key)])
+
+    # Ids: os de "ours" são mantidos; colisões (dois lados criando o mesmo
+    # id) e nodes sem id ganham ids novos
+    order = [ours_side.node_key(key) for key in ours.nodes]
+    order += [theirs_side.node_key(key) for key in theirs.nodes]
+    order += [("base", key) for key in base.nodes]
+    numeric = [key for snapshot in (base, ours, theirs) for key in snapshot.nodes if isinstance(key, int)]
+    # Acima também dos contadores de cada lado: ids apagados não são reutilizados
+    next_id = max([max(numeric, default=-1) + 1] + [s.next_ids.get("node", 0) for s in (base, ours, theirs)])
+    used = set()
+    nodes = []
+    positions = {}
+    pin_indexes = {}
+    for merged_key in order:
+        if merged_key not in merged or merged_key in positions:
+            continue
+        fields, pins, node_id, present = merged[merged_key]
+        if not isinstance(node_id, int) or node_id in used:
+            node_id, next_id = next_id, next_id + 1
+        used.add(node_id)
+        positions[merged_key] = len(nodes)
+        nodes.append({"id": node_id, "title": fields["title"], "inputs": fields["inputs"], "outputs": fields["outputs"],
+                      "description": fields["description"], "properties": fields["properties"],
+                      "methods": fields["methods"], "pos": fields["pos"]})
+        if merged_key[0] != "base":
+            continue
+        # Pinos iguais aos da base em todos os lados: a chave ("base", i) já é
+        # o índice; só nodes com pinos alterados ganham uma tabela
+        for field, slot in (("inputs", 1), ("outputs", 2)):
+            base_pins = base.content[merged_key[1]][slot]
+            if all(other.snapshot.content[other_key][slot] == base_pins for other, other_key in present):
+                continue
+            side, key = pins[field]
+            indexes = {side.pin_key(key, field, i): i for i in range(len(fields[field]))}
+            # Pinos criados igualmente dos dois lados são o mesmo pino
+            for other, other_key in present:
+                if other is not side and other.snapshot.field(other_key, field) == fields[field]:
+                    for i in range(len(fields[field])):
+                        indexes.setdefault(other.pin_key(other_key, field, i), i)
+            pin_indexes[(merged_key, field)] = indexes
+
+    def pin_index(merged_key, field, tag, idx):
+        indexes = pin_indexes.get((merged_key, field))
+        if indexes is not None:
+            return indexes.get((tag, idx))
+        position = positions.get(merged_key)
+        if position is None or idx >= len(nodes[position][field]):
+            return None
+        return idx
+
+    for conflict in result.conflicts:
+        # Ids no relatório: os do projeto combinado
+        conflict["id"] = nodes[positions[conflict["id"]]]["id"]
+
+    # Conexões: por ponta (node, pino) nas chaves combinadas
+    edge_lists = {}
+    counts = {}
+    for name in ("base", "ours", "theirs"):
+        side = sides[name]
+        listed = edge_lists[name] = side.edge_keys()
+        counts[name] = Counter(key for key, _ in listed)
+    remaining = {}
+    for key in set(counts["ours"]) | set(counts["theirs"]):
+        b, o, t = counts["base"].get(key, 0), counts["ours"].get(key, 0), counts["theirs"].get(key, 0)
+        remaining[key] = o if o == t or t == b else t if o == b else max(o, t)
+    connections = []
+    used_edges = set()
+    next_edge = max((edge_id for listed in edge_lists.values() for _, edge_id in listed if isinstance(edge_id, int)),
+                    default=-1) + 1
+    next_edge = max([next_edge] + [s.next_ids.get("edge", 0) for s in (base, ours, theirs)])
+    for name in ("ours", "theirs"):
+        for key, edge_id in edge_lists[name]:
+            if remaining.get(key, 0) <= 0:
+                continue
+            remaining[key] -= 1
+            from_key, from_tag, from_pin, to_key, to_tag, to_pin = key
+            from_idx = pin_index(from_key, "outputs", from_tag, from_pin)
+            to_idx = pin_index(to_key, "inputs", to_tag, to_pin)
+            if from_idx is None or to_idx is None:
+                # Ponta removida do outro lado (node ou pino)
+                ends = [nodes[positions[k]]["id"] for k in (from_key, to_key) if k in positions]
+                result.conflicts.append({"id": ends[0] if ends else None, "title": "",
+                                         "reason": f"conexão de {name} perdeu a ponta (node ou pino removido)"})
+                continue
+            if not isinstance(edge_id, int) or edge_id in used_edges:
+                edge_id, next_edge = next_edge, next_edge + 1
+            used_edges.add(edge_id)
+            connections.append({"id": edge_id, "from_node": positions[from_key], "from_idx": from_idx,
+                                "to_node": positions[to_key], "to_idx": to_idx})
+    result.data = {"nodes": nodes, "connections": connections, "next_ids": {"node": next_id, "edge": next_edge}}
+    return result
+
+
+def describe_conflict(conflict):
+    if "reason" in conflict:
+        return f"! node {conflict['id']} \"{conflict['title']}\": {conflict['reason']}"
+    return (f"! node {conflict['id']} \"{conflict['title']}\": {conflict['field']} "
+            f"base {conflict['base']!r}, ours {conflict['ours']!r}, theirs {conflict['theirs']!r}")
+
+
+def _print_diff(diff, as_json, out=sys.stdout):
+    if as_json:
+        json.dump(diff.to_dict(), out, ensure_ascii=False)
+        out.write("\n")
+        return
+    for change in diff.changes:
+        out.write(describe(change) + "\n")
+    if diff.changes:
+        out.write(", ".join(f"{count} {kind}" for kind, count in sorted(diff.summary().items())) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.diff", description="Diff e merge estrutural de projetos")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sub = commands.add_parser("diff", help="lista as mudanças de um projeto para outro")
+    sub.add_argument("old")
+    sub.add_argument("new")
+    sub.add_argument("--json", action="store_true")
+    sub = commands.add_parser("merge", help="merge de três vias (saída 1 se houver conflitos)")
+    sub.add_argument("base")
+    sub.add_argument("ours")
+    sub.add_argument("theirs")
+    sub.add_argument("-o", "--output", help="arquivo combinado (padrão: JSON na saída padrão)")
+    sub.add_argument("--prefer", choices=("ours", "theirs"), default="ours", help="lado usado nos conflitos")
+    # git diff externo: path old-file old-hex old-mode new-file new-hex new-mode
+    sub = commands.add_parser("git-diff", help="uso como diff.<driver>.command do git")
+    sub.add_argument("args", nargs=7)
+    args = parser.parse_args(argv)
+
+    if args.command == "diff":
+        diff = diff_projects(read_project(args.old)[0], read_project(args.new)[0])
+        _print_diff(diff, args.json)
+        return 1 if diff.changes else 0
+    if args.command == "git-diff":
+        path, old, _, _, new, _, _ = args.args
+        print(f"diff {path}")
+        _print_diff(diff_projects(read_project(old)[0], read_project(new)[0]), False)
+        return 0
+
+    ours_data, binary = read_project(args.ours)
+    result = merge_projects(read_project(args.base)[0], ours_data, read_project(args.theirs)[0], args.prefer)
+    if args.output:
+        write_project(result.data, args.output, binary)
+    else:
+        json.dump(result.data, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    for conflict in result.conflicts:
+        print(describe_conflict(conflict), file=sys.stderr)
+    return 0 if result.clean else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# Histórico de desfazer/refazer (sem Qt).
+#
+# Cada entrada guarda só o delta da edição: as operações do journal que a
+# refazem e as que a desfazem (ver journal.inverse_ops). O tamanho de cada
+# entrada é estimado pelo JSON das operações, e as mais antigas são
+# descartadas quando o total passa de max_bytes.
+import json
+from collections import deque
+
+
+class Command:
+    __slots__ = ("ops", "undo_ops", "merge_key", "size")
+
+    def __init__(self, ops, undo_ops, merge_key=None):
+        self.ops = ops
+        self.undo_ops = undo_ops
+        self.merge_key = merge_key
+        self.size = _estimate(ops) + _estimate(undo_ops)
+
+
+def _estimate(ops):
+    return len(json.dumps(ops, ensure_ascii=False))
+
+
+class UndoHistory:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._undo = deque()
+        self._redo = []
+        self.size = 0
+        self._sealed = True
+
+    def clear(self):
+        self._undo.clear()
+        self._redo = []
+        self.size = 0
+        self._sealed = True
+
+    def seal(self):
+        # A próxima edição não se junta à anterior (ex.: mudou a seleção)
+        self._sealed = True
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def push(self, ops, undo_ops, merge_key=None):
+        self._redo = []
+        top = self._undo[-1] if self._undo else None
+        if merge_key is not None and not self._sealed and top is not None and top.merge_key == merge_key:
+            # Mesmo campo editado de novo (digitação): o estado final substitui
+            # o anterior e o desfazer continua voltando ao estado original
+            self.size -= top.size
+            top.ops = ops
+            top.size = _estimate(top.ops) + _estimate(top.undo_ops)
+            self.size += top.size
+        else:
+            command = Command(ops, undo_ops, merge_key)
+            self._undo.append(command)
+            self.size += command.size
+        self._sealed = False
+        self._evict()
+
+    def undo(self):
+        # Retorna as operações a aplicar (ou None se não há o que desfazer)
+        if not self._undo:
+            return None
+        command = self._undo.pop()
+        self.size -= command.size
+        self._redo.append(command)
+        self._sealed = True
+        return command.undo_ops
+
+    def redo(self):
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        self._undo.append(command)
+        self.size += command.size
+        self._sealed = True
+        self._evict()
+        return command.ops
+
+    def _evict(self):
+        # Mantém ao menos a última entrada, mesmo que sozinha passe do limite
+        while self.size > self.max_bytes and len(self._undo) > 1:
+            self.size -= self._undo.popleft().size
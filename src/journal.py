@@ -0,0 +1,212 @@
+# Journal de edições para autosave e recuperação após falha (sem Qt).
+#
+# O diretório guarda snapshots completos "snapshot-<g>.llb" e journals
+# "journal-<g>.jsonl" (uma operação JSON por linha). O snapshot g é o estado
+# no início do journal g; recuperar = carregar o maior snapshot e reaplicar os
+# journals de geração >= g em ordem. Sem snapshot, o estado inicial é vazio.
+import json
+import os
+import re
+
+from .model import GraphModel, LIST_FIELDS
+
+_FILE_RE = re.compile(r"^(snapshot|journal)-(\d+)\.(llb|jsonl)$")
+TEXT_FIELDS = ("title", "description")
+PIN_FIELDS = ("inputs", "outputs")
+
+
+def apply_op(model, op):
+    kind = op["op"]
+    if kind == "add_node":
+        model.add_node_from_dict(op["node"])
+    elif kind == "remove_node":
+        model.remove_node(op["id"])
+    elif kind == "move":
+        node = model.nodes[op["id"]]
+        node.x, node.y = op["pos"]
+    elif kind == "set":
+        if op["field"] not in TEXT_FIELDS:
+            raise ValueError(f"Campo inválido no journal: {op['field']}")
+        setattr(model.nodes[op["id"]], op["field"], op["value"])
+    elif kind in ("insert_item", "remove_item", "set_item"):
+        if op["field"] not in LIST_FIELDS:
+            raise ValueError(f"Campo inválido no journal: {op['field']}")
+        values = getattr(model.nodes[op["id"]], op["field"])
+        if kind != "set_item" and op["field"] in PIN_FIELDS:
+            # Pinos: as arestas dos pinos seguintes são renumeradas junto
+            if kind == "insert_item":
+                model.insert_pin(op["id"], op["field"], op["index"], op["value"])
+            else:
+                model.remove_pin(op["id"], op["field"], op["index"])
+        elif kind == "insert_item":
+            values.insert(op["index"], op["value"])
+        elif kind == "remove_item":
+            values.pop(op["index"])
+        else:
+            values[op["index"]] = op["value"]
+    elif kind == "add_edge":
+        edge = op["edge"]
+        model.add_edge(edge["from_node"], edge["from_idx"], edge["to_node"], edge["to_idx"], edge["id"])
+    elif kind == "remove_edge":
+        model.remove_edge(op["id"])
+    elif kind == "delete":
+        # Exclusão em lote: arestas avulsas e nodes (com as suas arestas)
+        for edge_id in op["edges"]:
+            model.remove_edge(edge_id)
+        for node_id in op["nodes"]:
+            model.remove_node(node_id)
+    elif kind == "insert":
+        # Inverso de "delete": nodes completos e depois as arestas
+        for node in op["nodes"]:
+            model.add_node_from_dict(node)
+        for edge in op["edges"]:
+            model.add_edge(edge["from_node"], edge["from_idx"], edge["to_node"], edge["to_idx"], edge["id"])
+    else:
+        raise ValueError(f"Operação desconhecida no journal: {kind}")
+
+
+def inverse_ops(model, op):
+    # Operações que desfazem op; calculadas com o modelo ainda no estado
+    # anterior a op (custo proporcional à edição, não ao diagrama)
+    kind = op["op"]
+    if kind == "add_node":
+        return [{"op": "remove_node", "id": op["node"]["id"]}]
+    if kind == "remove_node":
+        return [_insert_op(model, [op["id"]], [])]
+    if kind == "move":
+        node = model.nodes[op["id"]]
+        return [{"op": "move", "id": op["id"], "pos": [node.x, node.y]}]
+    if kind == "set":
+        return [{"op": "set", "id": op["id"], "field": op["field"], "value": getattr(model.nodes[op["id"]], op["field"])}]
+    if kind == "insert_item":
+        return [{"op": "remove_item", "id": op["id"], "field": op["field"], "index": op["index"]}]
+    if kind == "remove_item":
+        values = getattr(model.nodes[op["id"]], op["field"])
+        undo = [{"op": "insert_item", "id": op["id"], "field": op["field"], "index": op["index"], "value": values[op["index"]]}]
+        if op["field"] in PIN_FIELDS:
+            # O pino volta com as conexões que saíram junto com ele
+            undo.extend({"op": "add_edge", "edge": edge_to_dict(edge)}
+                        for edge in model.pin_edges(op["id"], op["field"], op["index"]))
+        return undo
+    if kind == "set_item":
+        values = getattr(model.nodes[op["id"]], op["field"])
+        return [{"op": "set_item", "id": op["id"], "field": op["field"], "index": op["index"], "value": values[op["index"]]}]
+    if kind == "add_edge":
+        return [{"op": "remove_edge", "id": op["edge"]["id"]}]
+    if kind == "remove_edge":
+        return [{"op": "add_edge", "edge": edge_to_dict(model.edges[op["id"]])}]
+    if kind == "delete":
+        return [_insert_op(model, op["nodes"], op["edges"])]
+    if kind == "insert":
+        node_ids = {node["id"] for node in op["nodes"]}
+        loose = [edge["id"] for edge in op["edges"]
+                 if edge["from_node"] not in node_ids and edge["to_node"] not in node_ids]
+        return [{"op": "delete", "nodes": list(node_ids), "edges": loose}]
+    raise ValueError(f"Operação desconhecida no journal: {kind}")
+
+
+def _insert_op(model, node_ids, edge_ids):
+    # Estado completo de nodes e arestas prestes a serem removidos
+    edges = {edge_id: model.edges[edge_id] for edge_id in edge_ids}
+    for node_id in node_ids:
+        for edge in model.out_edges(node_id) + model.in_edges(node_id):
+            edges[edge.id] = edge
+    return {"op": "insert", "nodes": [model.nodes[node_id].to_dict() for node_id in node_ids],
+            "edges": [edge_to_dict(edge) for edge in edges.values()]}
+
+
+def edge_to_dict(edge):
+    # Conexão por ids de node (no journal não há posições em lista)
+    return {"id": edge.id, "from_node": edge.from_node, "from_idx": edge.from_idx,
+            "to_node": edge.to_node, "to_idx": edge.to_idx}
+
+
+class Journal:
+    def __init__(self, directory):
+        self.directory = directory
+        self._pending = []
+        self.ops_since_compact = 0
+        os.makedirs(directory, exist_ok=True)
+        # Gerações só crescem, para um arquivo antigo nunca passar por novo
+        self.generation = max((gen for _, gen, _ in self._files()), default=0)
+
+    def _path(self, kind, generation):
+        ext = "llb" if kind == "snapshot" else "jsonl"
+        return os.path.join(self.directory, f"{kind}-{generation}.{ext}")
+
+    def _files(self):
+        # [(tipo, geração, caminho)] dos arquivos do diretório
+        found = []
+        for name in os.listdir(self.directory):
+            match = _FILE_RE.match(name)
+            if match:
+                found.append((match.group(1), int(match.group(2)), os.path.join(self.directory, name)))
+        return found
+
+    def record(self, op):
+        # Edições seguidas do mesmo campo de texto (digitação) viram uma só
+        if (op["op"] == "set" and self._pending and self._pending[-1]["op"] == "set"
+                and self._pending[-1]["id"] == op["id"] and self._pending[-1]["field"] == op["field"]):
+            self._pending[-1] = op
+        else:
+            self._pending.append(op)
+        self.ops_since_compact += 1
+
+    def flush(self):
+        # Acrescenta as operações pendentes ao journal: custo proporcional à
+        # mudança, não ao tamanho do diagrama
+        if not self._pending:
+            return
+        lines = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in self._pending)
+        self._pending = []
+        with open(self._path("journal", self.generation), "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+
+    def rotate(self):
+        # Início de uma compactação: fecha o journal atual e devolve a geração
+        # do snapshot que write_snapshot (em outra thread) vai gravar
+        self.flush()
+        self.generation += 1
+        self.ops_since_compact = 0
+        return self.generation
+
+    def write_snapshot(self, snapshot, generation):
+        final_path = self._path("snapshot", generation)
+        tmp_path = self._path("snapshot", f"{generation}.tmp")
+        snapshot.save(tmp_path)
+        os.replace(tmp_path, final_path)
+        # O snapshot novo já contém tudo o que os arquivos anteriores descrevem
+        for kind, gen, path in self._files():
+            if gen < generation:
+                os.remove(path)
+
+    def clear(self):
+        self._pending = []
+        self.ops_since_compact = 0
+        for _, _, path in self._files():
+            os.remove(path)
+
+    def has_recovery(self):
+        return any(kind == "snapshot" or os.path.getsize(path) > 0 for kind, _, path in self._files())
+
+    def recover(self):
+        files = self._files()
+        snapshots = [gen for kind, gen, _ in files if kind == "snapshot"]
+        base = max(snapshots, default=0)
+        model = GraphModel.load(self._path("snapshot", base)) if snapshots else GraphModel()
+        journals = sorted((gen, path) for kind, gen, path in files if kind == "journal" and gen >= base)
+        for gen, path in journals:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().split("\n")
+            for line in lines:
+                if not line:
+                    continue
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break  # última linha cortada por uma falha no meio da escrita
+                apply_op(model, op)
+        # Continua numa geração nova a partir do estado recuperado
+        self.generation = max([gen for gen, _ in journals] + [base])
+        return model
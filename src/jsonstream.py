@@ -0,0 +1,106 @@
+# Leitura incremental do JSON de projeto (sem Qt).
+# Percorre o objeto de topo e devolve os elementos de "nodes" e "connections"
+# um a um, lendo o arquivo em pedaços em vez de carregar o documento inteiro.
+import codecs
+import json
+
+_WHITESPACE = " \t\r\n"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    def __init__(self, f, chunk_size):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decode = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def fill(self, size=None):
+        if self.eof:
+            return False
+        # Descarta o que já foi consumido antes de crescer o buffer
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self._f.read(size or self._chunk_size)
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self.eof = True
+            self.buf += self._decode.decode(b"", final=True)
+            return False
+        self.buf += self._decode.decode(chunk)
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def next_char(self):
+        ch = self.peek()
+        self.pos += 1
+        return ch
+
+    def expect(self, ch):
+        found = self.next_char()
+        if found != ch:
+            raise ValueError(f"JSON inválido: esperado '{ch}', encontrado '{found}' (byte ~{self.bytes_read})")
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Valor incompleto: lê mais (crescendo junto com o valor)
+                if not self.fill(max(self._chunk_size, len(self.buf) - self.pos)):
+                    raise
+                continue
+            # Um número no fim do buffer pode continuar no próximo pedaço
+            if end == len(self.buf) and not self.eof:
+                self.fill()
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_project(path, chunk_size=1 << 16):
+    # Gera (seção, item, bytes_lidos) com seção em "nodes" ou "connections";
+    # os contadores de ids vêm uma vez, como ("next_ids", {"node", "edge"}, ...)
+    with open(path, "rb") as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            if key in ("nodes", "connections"):
+                reader.expect("[")
+                if reader.peek() == "]":
+                    reader.next_char()
+                else:
+                    while True:
+                        item = reader.value()
+                        yield key, item, reader.bytes_read
+                        ch = reader.next_char()
+                        if ch == "]":
+                            break
+                        if ch != ",":
+                            raise ValueError(f"JSON inválido em '{key}' (byte ~{reader.bytes_read})")
+            elif key == "next_ids":
+                yield key, reader.value(), reader.bytes_read
+            else:
+                reader.value()  # chave desconhecida: ignora
+            ch = reader.next_char()
+            if ch == "}":
+                break
+            if ch != ",":
+                raise ValueError(f"JSON inválido no objeto de topo (byte ~{reader.bytes_read})")
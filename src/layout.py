@@ -0,0 +1,337 @@
+# Layout automático (sem Qt; roda num processo separado, ver autolayout.py).
+#
+# O processo recebe só tabelas simples (ids, posições, arestas) e devolve
+# {node_id: (x, y)}. Dois algoritmos:
+#   - "layered": hierárquico (camadas), para arestas "herda" de diagramas de
+#     classe. A aresta A -> B (saída "herda" de A na entrada de B) põe B, a
+#     classe base, uma camada acima de A.
+#   - "force": dirigido por forças (Fruchterman-Reingold), vetorizado com
+#     NumPy quando disponível.
+# Com free_ids só esses nodes se movem; os outros ficam fixos (re-layout de
+# uma região).
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def snapshot_graph(model, free_ids=None, kind=None):
+    # Dados mínimos e serializáveis para o processo de layout. edges leva o
+    # nome do pino de saída para filtrar por tipo (ex.: "herda")
+    ids = list(model.nodes)
+    positions = [(model.nodes[node_id].x, model.nodes[node_id].y) for node_id in ids]
+    edges = []
+    for edge in model.edges.values():
+        outputs = model.nodes[edge.from_node].outputs
+        name = outputs[edge.from_idx] if edge.from_idx < len(outputs) else None
+        if kind is None or name == kind:
+            edges.append((edge.from_node, edge.to_node))
+    return {
+        "ids": ids,
+        "positions": positions,
+        "edges": edges,
+        "free": list(free_ids) if free_ids is not None else None,
+    }
+
+
+def run_layout(job):
+    # Ponto de entrada do processo de layout
+    ids = job["ids"]
+    positions = dict(zip(ids, job["positions"]))
+    free = set(job["free"]) if job.get("free") is not None else set(ids)
+    size = job.get("size", (180, 100))
+    gap = job.get("gap", (60, 80))
+    if job["algorithm"] == "layered":
+        result = layered_layout([i for i in ids if i in free], job["edges"], size, gap)
+        if len(free) < len(ids):
+            _move_to_previous_region(result, positions, free)
+    elif job["algorithm"] == "force":
+        result = force_layout(ids, positions, job["edges"], free, size, job.get("iterations", 100), job.get("seed", 0))
+    else:
+        raise ValueError(f"Algoritmo de layout desconhecido: {job['algorithm']}")
+    fixed = [positions[i] for i in ids if i not in free]
+    return remove_overlaps(result, fixed, size, gap)
+
+
+def layered_layout(ids, edges, size, gap, sweeps=4):
+    id_set = set(ids)
+    parents = {node_id: [] for node_id in ids}
+    children = {node_id: [] for node_id in ids}
+    for source, target in edges:
+        if source in id_set and target in id_set and source != target:
+            parents[source].append(target)
+            children[target].append(source)
+    _break_cycles(ids, parents, children)
+
+    # Camada = maior caminho até uma raiz (Kahn das bases para as derivadas)
+    pending = {node_id: len(parents[node_id]) for node_id in ids}
+    layer = {}
+    queue = [node_id for node_id in ids if not pending[node_id]]
+    for node_id in queue:
+        layer[node_id] = 1 + max((layer[p] for p in parents[node_id]), default=-1)
+        for child in children[node_id]:
+            pending[child] -= 1
+            if not pending[child]:
+                queue.append(child)
+
+    # Nodes sem nenhuma aresta do tipo ficam numa grade abaixo da hierarquia
+    loose = [node_id for node_id in ids if not parents[node_id] and not children[node_id]]
+    loose_set = set(loose)
+    layers = []
+    for node_id in queue:
+        if node_id in loose_set:
+            continue
+        depth = layer[node_id]
+        while len(layers) <= depth:
+            layers.append([])
+        layers[depth].append(node_id)
+
+    # Ordem dentro das camadas: varreduras de baricentro (menos cruzamentos)
+    order = {}
+    for row in layers:
+        for i, node_id in enumerate(row):
+            order[node_id] = i
+    for sweep in range(sweeps):
+        downward = sweep % 2 == 0
+        rows = layers[1:] if downward else layers[-2::-1]
+        for row in rows:
+            def barycenter(node_id):
+                neighbours = parents[node_id] if downward else children[node_id]
+                if not neighbours:
+                    return order[node_id]
+                return sum(order[n] for n in neighbours) / len(neighbours)
+            row.sort(key=barycenter)
+            for i, node_id in enumerate(row):
+                order[node_id] = i
+
+    step_x = size[0] + gap[0]
+    step_y = size[1] + gap[1]
+    result = {}
+    for depth, row in enumerate(layers):
+        offset = -(len(row) - 1) * step_x / 2
+        for i, node_id in enumerate(row):
+            result[node_id] = (offset + i * step_x, depth * step_y)
+    if loose:
+        columns = max(1, int(math.sqrt(len(loose))))
+        top = (len(layers) + 1) * step_y if layers else 0
+        left = -(min(columns, len(loose)) - 1) * step_x / 2
+        for i, node_id in enumerate(loose):
+            result[node_id] = (left + (i % columns) * step_x, top + (i // columns) * step_y)
+    return result
+
+
+def _break_cycles(ids, parents, children):
+    # DFS iterativa; arestas de volta (ciclos de herança) são descartadas
+    state = {}
+    for root in ids:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(list(parents[root])))]
+        while stack:
+            node_id, it = stack[-1]
+            for parent in it:
+                mark = state.get(parent)
+                if mark == 1:
+                    parents[node_id].remove(parent)
+                    children[parent].remove(node_id)
+                elif mark is None:
+                    state[parent] = 1
+                    stack.append((parent, iter(list(parents[parent]))))
+                    break
+            else:
+                state[node_id] = 2
+                stack.pop()
+
+
+def _move_to_previous_region(result, positions, free):
+    # Re-layout parcial: o trecho refeito ocupa o canto onde já estava
+    if not result:
+        return
+    old_x = min(positions[i][0] for i in free)
+    old_y = min(positions[i][1] for i in free)
+    new_x = min(x for x, _ in result.values())
+    new_y = min(y for _, y in result.values())
+    dx, dy = old_x - new_x, old_y - new_y
+    for node_id, (x, y) in result.items():
+        result[node_id] = (x + dx, y + dy)
+
+
+def force_layout(ids, positions, edges, free, size, iterations=100, seed=0):
+    k = max(size) * 1.6  # distância ideal entre nodes ligados
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    pairs = [(index[a], index[b]) for a, b in edges if a in index and b in index and a != b]
+    rng = random.Random(seed)
+    start = []
+    partial = len(free) < len(ids)
+    side = k * math.sqrt(len(ids))
+    for node_id in ids:
+        x, y = positions[node_id]
+        if node_id in free and not partial:
+            # Layout completo: parte do zero (diagramas importados chegam empilhados)
+            x, y = rng.uniform(0, side), rng.uniform(0, side)
+        elif node_id in free:
+            x, y = x + rng.uniform(-k, k), y + rng.uniform(-k, k)
+        start.append((x, y))
+    movable = [node_id in free for node_id in ids]
+    if np is not None:
+        final = _force_numpy(start, pairs, movable, k, iterations)
+    else:
+        # Sem NumPy: mesmo algoritmo em Python puro, com menos iterações
+        final = _force_python(start, pairs, movable, k, min(iterations, max(10, 2000000 // max(len(ids), 1) // 40)))
+    return {node_id: final[i] for i, node_id in enumerate(ids) if node_id in free}
+
+
+def _grid_size(count):
+    # Repulsão aproximada: cada node é repelido pelos centróides de uma grade
+    # G x G (custo O(N·G²) por iteração em vez de O(N²))
+    return max(1, min(12, int(math.sqrt(count) / 2)))
+
+
+def _force_numpy(start, pairs, movable, k, iterations):
+    pos = np.array(start, dtype=float)
+    x, y = pos[:, 0].copy(), pos[:, 1].copy()
+    count = len(pos)
+    frozen = ~np.array(movable, dtype=bool)
+    src = np.array([a for a, _ in pairs], dtype=np.intp)
+    dst = np.array([b for _, b in pairs], dtype=np.intp)
+    k2 = k * k
+    temperature = k * math.sqrt(count) / 4
+    exact = count <= 500
+    for it in range(iterations):
+        if exact:
+            # Repulsão exata (matriz N x N); a diagonal (dx = dy = 0) não contribui
+            dx = x[:, None] - x[None, :]
+            dy = y[:, None] - y[None, :]
+            factor = k2 / np.maximum(dx * dx + dy * dy, 1.0)
+            disp_x = (dx * factor).sum(axis=1)
+            disp_y = (dy * factor).sum(axis=1)
+        else:
+            grid = _grid_size(count)
+            low_x, low_y = x.min(), y.min()
+            col = np.minimum(((x - low_x) / max(x.max() - low_x, 1.0) * grid).astype(np.intp), grid - 1)
+            row = np.minimum(((y - low_y) / max(y.max() - low_y, 1.0) * grid).astype(np.intp), grid - 1)
+            flat = col * grid + row
+            mass = np.bincount(flat, minlength=grid * grid).astype(float)
+            used = mass > 0
+            masses = mass[used]
+            center_x = np.bincount(flat, x, grid * grid)[used] / masses
+            center_y = np.bincount(flat, y, grid * grid)[used] / masses
+            dx = x[:, None] - center_x[None, :]
+            dy = y[:, None] - center_y[None, :]
+            factor = (k2 * masses) / np.maximum(dx * dx + dy * dy, k2 * 0.25)
+            disp_x = (dx * factor).sum(axis=1)
+            disp_y = (dy * factor).sum(axis=1)
+        if len(src):
+            ex = x[src] - x[dst]
+            ey = y[src] - y[dst]
+            dist = np.sqrt(ex * ex + ey * ey) / k
+            disp_x += np.bincount(dst, ex * dist, count) - np.bincount(src, ex * dist, count)
+            disp_y += np.bincount(dst, ey * dist, count) - np.bincount(src, ey * dist, count)
+        length = np.maximum(np.sqrt(disp_x * disp_x + disp_y * disp_y), 1e-6)
+        scale = np.minimum(length, temperature) / length
+        scale[frozen] = 0
+        x += disp_x * scale
+        y += disp_y * scale
+        temperature = max(temperature * 0.95, k * 0.05)
+    return list(zip(x.tolist(), y.tolist()))
+
+
+def _force_python(start, pairs, movable, k, iterations):
+    pos = [list(p) for p in start]
+    count = len(pos)
+    k2 = k * k
+    temperature = k * math.sqrt(count) / 4
+    for it in range(iterations):
+        grid = _grid_size(count)
+        xs = [p[0] for p in pos]
+        ys = [p[1] for p in pos]
+        low_x, low_y = min(xs), min(ys)
+        span_x, span_y = max(max(xs) - low_x, 1.0), max(max(ys) - low_y, 1.0)
+        cells = {}
+        for x, y in pos:
+            key = (min(int((x - low_x) / span_x * grid), grid - 1), min(int((y - low_y) / span_y * grid), grid - 1))
+            cell = cells.setdefault(key, [0.0, 0.0, 0])
+            cell[0] += x
+            cell[1] += y
+            cell[2] += 1
+        centers = [(sx / n, sy / n, n) for sx, sy, n in cells.values()]
+        disp = [[0.0, 0.0] for _ in range(count)]
+        for i, (x, y) in enumerate(pos):
+            if not movable[i]:
+                continue
+            d = disp[i]
+            for cx, cy, mass in centers:
+                dx, dy = x - cx, y - cy
+                factor = k2 * mass / max(dx * dx + dy * dy, k2 * 0.25)
+                d[0] += dx * factor
+                d[1] += dy * factor
+        for a, b in pairs:
+            dx, dy = pos[a][0] - pos[b][0], pos[a][1] - pos[b][1]
+            dist = max(math.hypot(dx, dy), 1e-6) / k
+            disp[a][0] -= dx * dist
+            disp[a][1] -= dy * dist
+            disp[b][0] += dx * dist
+            disp[b][1] += dy * dist
+        for i, (dx, dy) in enumerate(disp):
+            if not movable[i]:
+                continue
+            length = max(math.hypot(dx, dy), 1e-6)
+            step = min(length, temperature) / length
+            pos[i][0] += dx * step
+            pos[i][1] += dy * step
+        temperature = max(temperature * 0.95, k * 0.05)
+    return [tuple(p) for p in pos]
+
+
+def remove_overlaps(result, fixed, size, gap):
+    # Nodes que não encostam em nenhum outro ficam onde estão; os demais vão
+    # para a vaga livre mais próxima de uma grade do tamanho do node (espiral)
+    width, height = size[0] + gap[0] / 2, size[1] + gap[1] / 2
+    buckets = {}
+
+    def cells(x, y):
+        col, row = math.floor(x / width), math.floor(y / height)
+        return [(col + dc, row + dr) for dc in (-1, 0, 1) for dr in (-1, 0, 1)]
+
+    def collides(x, y):
+        for cell in cells(x, y):
+            for ox, oy in buckets.get(cell, ()):
+                if abs(ox - x) < width and abs(oy - y) < height:
+                    return True
+        return False
+
+    def occupy(x, y):
+        buckets.setdefault((math.floor(x / width), math.floor(y / height)), []).append((x, y))
+
+    for x, y in fixed:
+        occupy(x, y)
+    placed = {}
+    if not result:
+        return placed
+    cx = sum(x for x, _ in result.values()) / len(result)
+    cy = sum(y for _, y in result.values()) / len(result)
+    # Do centro para fora: os nodes do meio ficam mais perto de onde estavam
+    for node_id in sorted(result, key=lambda n: (result[n][0] - cx) ** 2 + (result[n][1] - cy) ** 2):
+        x, y = result[node_id]
+        if collides(x, y):
+            col, row = round(x / width), round(y / height)
+            radius = 1
+            spot = None
+            while spot is None:
+                for dc in range(-radius, radius + 1):
+                    for dr in (-radius, radius) if abs(dc) != radius else range(-radius, radius + 1):
+                        candidate = ((col + dc) * width, (row + dr) * height)
+                        if not collides(*candidate):
+                            spot = candidate
+                            break
+                    if spot is not None:
+                        break
+                radius += 1
+            x, y = spot
+        occupy(x, y)
+        placed[node_id] = (x, y)
+    return placed
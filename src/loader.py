@@ -0,0 +1,169 @@
+import os
+from PyQt5.QtCore import QObject, QThread, Qt, pyqtSignal
+from PyQt5.QtWidgets import QGraphicsScene, QProgressDialog
+from . import binformat, jsonstream
+from .model import GraphModel
+
+
+class ProjectLoadWorker(QObject):
+    # Roda numa QThread: lê o arquivo incrementalmente e entrega lotes
+    batch_ready = pyqtSignal(str, list)
+    progress = pyqtSignal(int)
+    failed = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, path, batch_size=2000):
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        size = max(os.path.getsize(self.path), 1)
+        section = None
+        batch = []
+        if self.path.endswith(binformat.EXTENSION):
+            iter_project = binformat.iter_project
+        else:
+            iter_project = jsonstream.iter_project
+        try:
+            for key, item, bytes_read in iter_project(self.path):
+                if self._cancelled:
+                    return
+                if key != section and batch:
+                    self.batch_ready.emit(section, batch)
+                    batch = []
+                section = key
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self.batch_ready.emit(section, batch)
+                    self.progress.emit(bytes_read * 1000 // size)
+                    batch = []
+            if batch:
+                self.batch_ready.emit(section, batch)
+        except (OSError, ValueError, KeyError) as e:
+            self.failed.emit(str(e))
+        finally:
+            self.finished.emit()
+
+
+class ProjectLoader(QObject):
+    # Carga de projeto sem travar a interface: o parsing roda em outra thread
+    # e a thread da GUI insere nodes/conexões lote a lote, com o índice da
+    # cena desligado até o fim.
+    def __init__(self, main_window, path):
+        super().__init__(main_window)
+        self._window = main_window
+        self._path = path
+        self._ids = []       # posição no arquivo -> node_id
+        self._pending = []   # conexões que chegaram antes dos seus nodes
+        self._cancelled = False
+        self._superseded = False
+        self._error = None
+
+        self._progress = QProgressDialog("Carregando projeto...", "Cancelar", 0, 1000, main_window)
+        self._progress.setWindowModality(Qt.WindowModal)
+        self._progress.setMinimumDuration(300)
+        self._progress.setAutoReset(False)
+        self._progress.setAutoClose(False)
+        self._progress.canceled.connect(self.cancel)
+
+        self._thread = QThread(self)
+        self._worker = ProjectLoadWorker(path)
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._worker.batch_ready.connect(self._on_batch)
+        self._worker.progress.connect(self._progress.setValue)
+        self._worker.failed.connect(self._on_failed)
+        self._worker.finished.connect(self._on_finished)
+
+    def start(self):
+        window = self._window
+        window.model = GraphModel()
+        window.rebuild_scene()
+        self._index_method = window.scene.itemIndexMethod()
+        window.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancelled = True
+        self._worker.cancel()
+
+    def supersede(self):
+        # Outra carga vai começar: abandona esta sem mexer mais na janela
+        self.cancel()
+        self._superseded = True
+        self._window.scene.setItemIndexMethod(self._index_method)
+        self._progress.close()
+
+    def _on_batch(self, section, batch):
+        if self._cancelled:
+            return
+        window = self._window
+        viewport = window.view.viewport()
+        viewport.setUpdatesEnabled(False)
+        try:
+            self._apply_batch(section, batch)
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            # Exceção não pode escapar do slot (PyQt5 aborta o app); a carga
+            # para e _on_finished descarta o modelo parcial
+            self._error = f"Projeto inválido: {e}"
+            self.cancel()
+        finally:
+            viewport.setUpdatesEnabled(True)
+
+    def _apply_batch(self, section, batch):
+        window = self._window
+        if section == "nodes":
+            for node_data in batch:
+                node = window.model.add_node_from_dict(node_data)
+                window.add_node_item(node)
+                self._ids.append(node.id)
+        elif section == "next_ids":
+            for next_ids in batch:
+                window.model.reserve_ids(next_ids)
+        else:
+            for conn in batch:
+                if conn["from_node"] < 0 or conn["to_node"] < 0:
+                    raise IndexError(f"node {min(conn['from_node'], conn['to_node'])} na conexão")
+                if conn["from_node"] < len(self._ids) and conn["to_node"] < len(self._ids):
+                    self._add_connection(conn)
+                else:
+                    self._pending.append(conn)
+
+    def _add_connection(self, conn):
+        # Índices negativos já foram recusados em _apply_batch
+        edge = self._window.model.add_edge(
+            self._ids[conn["from_node"]], conn["from_idx"],
+            self._ids[conn["to_node"]], conn["to_idx"], conn.get("id")
+        )
+        self._window.add_connection_item(edge)
+
+    def _on_failed(self, message):
+        self._error = message
+
+    def _on_finished(self):
+        window = self._window
+        self._thread.quit()
+        self._thread.wait()
+        if self._superseded:
+            self.deleteLater()
+            return
+        try:
+            if not self._cancelled and self._error is None:
+                for conn in self._pending:
+                    self._add_connection(conn)
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            self._error = f"Conexão inválida: {e}"
+        if self._cancelled or self._error is not None:
+            # Carga parcial não é mantida, para não ser salva por engano
+            window.model = GraphModel()
+            window.rebuild_scene()
+        window.scene.setItemIndexMethod(self._index_method)
+        self._progress.close()
+        if self._error is not None:
+            window.statusBar().showMessage(f"Erro ao carregar {self._path}: {self._error}")
+        window.on_load_finished(self)
@@ -0,0 +1,23 @@
+# Níveis de detalhe (LOD) usados na pintura da WorkspaceView.
+# O nível é escolhido pela escala de desenho (1.0 = 100%); ajuste os limiares
+# em LOD para mudar quando nodes perdem texto/pinos e quando a view passa a
+# desenhar tudo em lote (visão geral).
+FULL = 0       # nodes completos, conexões em Bézier
+SIMPLE = 1     # nodes como retângulos sem texto, conexões retas
+OVERVIEW = 2   # itens não pintam; a view desenha todos de uma vez
+
+
+class LevelOfDetail:
+    def __init__(self, simple_below=0.45, overview_below=0.15):
+        self.simple_below = simple_below
+        self.overview_below = overview_below
+
+    def level(self, scale):
+        if scale < self.overview_below:
+            return OVERVIEW
+        if scale < self.simple_below:
+            return SIMPLE
+        return FULL
+
+
+LOD = LevelOfDetail()
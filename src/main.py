@@ -1,14 +1,42 @@
 import sys
+import time
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QGraphicsView, QGraphicsScene, QVBoxLayout, QWidget, QMenu,
-    QDockWidget, QLineEdit, QTextEdit, QListWidget, QListWidgetItem, QPushButton, QLabel, QHBoxLayout, QScrollArea
+    QApplication, QMainWindow, QGraphicsView, QGraphicsItem, QVBoxLayout, QWidget, QMenu,
+    QDockWidget, QLineEdit, QTextEdit, QListView, QPushButton, QLabel, QHBoxLayout, QScrollArea,
+    QMessageBox, QGraphicsScene, QActionGroup
 )
-from PyQt5.QtCore import Qt, QPoint
-from PyQt5.QtGui import QWheelEvent, QPainter
+from PyQt5.QtCore import Qt, QPoint, QLineF, QTimer
+from PyQt5.QtGui import QWheelEvent, QPainter, QPen, QBrush, QColor, QKeySequence
 from .node import NodeItem
-from .connection import ConnectionItem
+from .connection import ConnectionItem, path_updates
+from .model import GraphModel
+from .scene import WorkspaceScene
+from .loader import ProjectLoader
+from .saver import ProjectSaver, save_snapshot
+from .autosave import AutoSaver
+from .journal import apply_op, edge_to_dict, inverse_ops, PIN_FIELDS
+from .history import UndoHistory
+from .model import LIST_FIELDS
+from .panel import BatchEditPanel, SearchPanel, StringListModel
+from .virtual import SceneVirtualizer
+from .autolayout import AutoLayouter
+from .codegen import CodeGenerator
+from .search import SearchIndex
+from .diff import diff_projects, read_project
+from .viewsettings import PRESETS, ViewSettings, apply_view_settings
+from .lod import LOD, FULL, OVERVIEW
+from .profiler import profiler
+
+# JSON legível ou binário compacto (.llb, ver binformat)
+PROJECT_FILE_FILTER = "JSON (*.json);;Binário compacto (*.llb)"
 
 class WorkspaceView(QGraphicsView):
+    # Raio de clique em pinos (unidades de cena) e de atração ao arrastar
+    # conexões (pixels de tela)
+    PIN_HIT_RADIUS = 16
+    PIN_SNAP_RADIUS = 24
+    IDLE_MS = 150
+
     def __init__(self, scene, main_window=None):
         super().__init__(scene)
         self._main_window = main_window
@@ -25,6 +53,89 @@ class WorkspaceView(QGraphicsView):
         self._dragging_connection = None
         self._drag_start_node = None
         self._drag_start_idx = None
+        # Posições dos nodes selecionados no início de um arraste
+        self._press_positions = None
+
+        # Nível de detalhe; na visão geral nodes/conexões são desenhados em lote
+        self._lod_level = FULL
+        self._overview_dirty = True
+        self._overview_rects = []
+        self._overview_lines = []
+        scene.changed.connect(self._mark_overview_dirty)
+
+        # Ajustes de desempenho (ver viewsettings.py); antialiasing pode ficar
+        # desligado durante pan/zoom e voltar após IDLE_MS sem interação
+        self.view_settings = ViewSettings()
+        self._antialias_idle_only = False
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(self.IDLE_MS)
+        self._idle_timer.timeout.connect(self._end_interaction)
+
+        # Overlay de métricas (ver profiler.py); criado quando ligado
+        self._overlay = None
+        self._overlay_timer = QTimer(self)
+        self._overlay_timer.setInterval(250)
+        self._overlay_timer.timeout.connect(self._update_overlay)
+
+    def set_profiling(self, enabled):
+        profiler.set_enabled(enabled)
+        if enabled and self._overlay is None:
+            # Filho da view, não da viewport: a rolagem da viewport move os filhos
+            self._overlay = QLabel(self)
+            self._overlay.setAttribute(Qt.WA_TransparentForMouseEvents)
+            self._overlay.setStyleSheet(
+                "background: rgba(0, 0, 0, 170); color: white; font-family: monospace; padding: 4px;"
+            )
+        if self._overlay is None:
+            return
+        if enabled:
+            self._update_overlay()
+            self._overlay.show()
+            self._overlay.raise_()
+            self._overlay_timer.start()
+        else:
+            self._overlay_timer.stop()
+            self._overlay.hide()
+
+    def _update_overlay(self):
+        stats = profiler.summary()
+        if stats is None:
+            text = "Sem frames"
+        else:
+            text = (
+                f"Frames (1 s):       {stats['frames']}\n"
+                f"Pintura da view:    {stats['paint_ms']:.1f} ms (máx {stats['paint_max_ms']:.1f})\n"
+                f"NodeItem.paint:     {stats['node_paints']:.0f}/frame\n"
+                f"Caminhos refeitos:  {stats['path_rebuilds']:.0f}/frame\n"
+                f"Índice da cena:     {stats['index_updates']:.0f}/frame\n"
+                f"Seleção:            {stats['selection']} ({stats['selection_ms']:.1f} ms)"
+            )
+        self._overlay.setText(text)
+        self._overlay.adjustSize()
+        self._overlay.move(self.viewport().geometry().topLeft() + QPoint(8, 8))
+
+    def paintEvent(self, event):
+        if not profiler.enabled:
+            super().paintEvent(event)
+            return
+        start = time.perf_counter()
+        super().paintEvent(event)
+        profiler.end_frame((time.perf_counter() - start) * 1000)
+
+    def set_antialias_idle_only(self, enabled):
+        self._antialias_idle_only = enabled
+        if not enabled:
+            self._idle_timer.stop()
+            self.setRenderHint(QPainter.Antialiasing, True)
+
+    def _begin_interaction(self):
+        if self._antialias_idle_only:
+            self.setRenderHint(QPainter.Antialiasing, False)
+            self._idle_timer.start()
+
+    def _end_interaction(self):
+        self.setRenderHint(QPainter.Antialiasing, True)
 
     def wheelEvent(self, event: QWheelEvent):
         zoom_in_factor = 1.15
@@ -35,19 +146,84 @@ class WorkspaceView(QGraphicsView):
         else:
             zoom_factor = zoom_out_factor
 
+        self._begin_interaction()
         self._zoom *= zoom_factor
         self.scale(zoom_factor, zoom_factor)
+        self.update_level_of_detail()
+        if self._main_window is not None:
+            self._main_window.virtualizer.schedule()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._main_window is not None:
+            self._main_window.virtualizer.schedule()
+
+    def level_of_detail(self):
+        return self._lod_level
+
+    def set_zoom(self, zoom):
+        # Zoom absoluto (o da roda do mouse é relativo)
+        self.resetTransform()
+        self._zoom = zoom
+        self.scale(zoom, zoom)
+        self.update_level_of_detail()
+        if self._main_window is not None:
+            self._main_window.virtualizer.schedule()
+
+    def _mark_overview_dirty(self, *args):
+        self._overview_dirty = True
+
+    def update_level_of_detail(self):
+        level = LOD.level(self._zoom)
+        if level == self._lod_level:
+            return
+        was_overview = self._lod_level == OVERVIEW
+        self._lod_level = level
+        if was_overview != (level == OVERVIEW) and self._main_window is not None:
+            # Na visão geral os itens não pintam nada (Qt nem chama paint);
+            # drawForeground desenha todos com uma chamada por tipo
+            overview = level == OVERVIEW
+            for node in self._main_window.node_items.values():
+                node.setFlag(QGraphicsItem.ItemHasNoContents, overview)
+            for conn in self._main_window.connection_items.values():
+                conn.setFlag(QGraphicsItem.ItemHasNoContents, overview)
+            self._overview_dirty = True
+        self.viewport().update()
+
+    def apply_level_of_detail(self, item):
+        # Para itens criados enquanto a view já está na visão geral
+        if self._lod_level == OVERVIEW:
+            item.setFlag(QGraphicsItem.ItemHasNoContents, True)
+
+    def drawForeground(self, painter, rect):
+        super().drawForeground(painter, rect)
+        if self._lod_level != OVERVIEW or self._main_window is None:
+            return
+        virtualizer = self._main_window.virtualizer
+        if virtualizer.enabled:
+            # Cena virtualizada: a geometria vem direto do modelo
+            self._overview_rects = virtualizer.overview_rects
+            self._overview_lines = virtualizer.overview_lines
+        elif self._overview_dirty:
+            self._overview_rects = [node.sceneBoundingRect() for node in self._main_window.node_items.values()]
+            self._overview_lines = [QLineF(conn.start_pos, conn.end_pos) for conn in self._main_window.connection_items.values()]
+            self._overview_dirty = False
+        painter.save()
+        painter.setPen(QPen(QColor(50, 50, 200), 0))
+        painter.drawLines(self._overview_lines)
+        painter.setPen(QPen(Qt.black, 0))
+        painter.setBrush(QBrush(QColor(220, 220, 235)))
+        painter.drawRects(self._overview_rects)
+        painter.restore()
 
     def mousePressEvent(self, event):
         scene_pos = self.mapToScene(event.pos())
-        item = self.itemAt(event.pos())
-        if event.button() == Qt.LeftButton and isinstance(item, NodeItem):
-            # Verifica se clicou em pino de output
-            node_pos = item.mapFromScene(scene_pos)
-            out_idx = item.hit_test_pin(node_pos, "output")
-            if out_idx is not None:
+        if event.button() == Qt.LeftButton:
+            # Verifica se clicou em pino de output (pelo índice, não pelo item do topo)
+            hit = self._scene_ref.pin_index.nearest(scene_pos, "output", self.PIN_HIT_RADIUS)
+            if hit is not None:
                 # Inicia arraste de conexão
-                pin_pos = item.get_output_pin_scene_pos(out_idx)
+                item, out_idx = hit
                 self._dragging_connection = ConnectionItem(item, out_idx)
                 self._scene_ref.addItem(self._dragging_connection)
                 item.add_output_connection(self._dragging_connection)
@@ -59,38 +235,47 @@ class WorkspaceView(QGraphicsView):
             self._pan_start = event.pos()
             self.setCursor(Qt.ClosedHandCursor)
         super().mousePressEvent(event)
+        if event.button() == Qt.LeftButton:
+            self._press_positions = {
+                item: item.pos() for item in self._scene_ref.selectedItems() if isinstance(item, NodeItem)
+            }
 
     def mouseMoveEvent(self, event):
         if self._pan:
+            self._begin_interaction()
             delta = event.pos() - self._pan_start
             self._pan_start = event.pos()
             self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - delta.x())
             self.verticalScrollBar().setValue(self.verticalScrollBar().value() - delta.y())
         elif self._dragging_connection:
             scene_pos = self.mapToScene(event.pos())
+            target = self._find_drop_target(scene_pos)
+            if target is not None:
+                # Atrai a ponta para o pino de input mais próximo
+                node, in_idx = target
+                scene_pos = node.get_input_pin_scene_pos(in_idx)
             self._dragging_connection.set_end_pos(scene_pos)
         else:
             super().mouseMoveEvent(event)
 
     def mouseReleaseEvent(self, event):
         scene_pos = self.mapToScene(event.pos())
-        item = self.itemAt(event.pos())
         if self._dragging_connection:
-            # Verifica se soltou sobre pino de input de outro node
-            if isinstance(item, NodeItem) and item != self._drag_start_node:
-                node_pos = item.mapFromScene(scene_pos)
-                in_idx = item.hit_test_pin(node_pos, "input")
-                if in_idx is not None:
-                    # Finaliza conexão
-                    end_pos = item.get_input_pin_scene_pos(in_idx)
-                    self._dragging_connection.set_target(item, in_idx)
-                    item.add_input_connection(self._dragging_connection)
-                    self._dragging_connection = None
-                    self._drag_start_node = None
-                    self._drag_start_idx = None
-                    super().mouseReleaseEvent(event)
-                    return
+            # Verifica se soltou perto de um pino de input de outro node
+            target = self._find_drop_target(scene_pos)
+            if target is not None:
+                # Finaliza conexão
+                item, in_idx = target
+                self._dragging_connection.set_target(item, in_idx)
+                item.add_input_connection(self._dragging_connection)
+                self._main_window.register_connection(self._dragging_connection)
+                self._dragging_connection = None
+                self._drag_start_node = None
+                self._drag_start_idx = None
+                super().mouseReleaseEvent(event)
+                return
             # Se não conectou, remove a conexão temporária
+            self._drag_start_node.remove_output_connection(self._dragging_connection)
             self._scene_ref.removeItem(self._dragging_connection)
             self._dragging_connection = None
             self._drag_start_node = None
@@ -101,6 +286,19 @@ class WorkspaceView(QGraphicsView):
             super().mouseReleaseEvent(event)
         else:
             super().mouseReleaseEvent(event)
+            if event.button() == Qt.LeftButton and self._press_positions:
+                # Um arraste inteiro vira uma única notificação por node
+                moves = [
+                    (node, old_pos, node.pos()) for node, old_pos in self._press_positions.items()
+                    if node.pos() != old_pos
+                ]
+                self._press_positions = None
+                if moves and self._main_window is not None:
+                    self._main_window.nodes_moved(moves)
+
+    def _find_drop_target(self, scene_pos):
+        radius = max(self.PIN_HIT_RADIUS, self.PIN_SNAP_RADIUS / self._zoom)
+        return self._scene_ref.pin_index.nearest(scene_pos, "input", radius, exclude=self._drag_start_node)
 
     def open_context_menu(self, pos):
         menu = QMenu()
@@ -114,24 +312,57 @@ class WorkspaceView(QGraphicsView):
             actions.append(act)
         menu.addSeparator()
         action_add_node = menu.addAction("Novo Node")
+        action_delete = menu.addAction("Excluir Seleção")
+        action_delete.setEnabled(bool(self._scene_ref.selectedItems()))
         action = menu.exec_(self.mapToGlobal(pos))
         if action in actions:
             self._main_window.current_mode = action.text()
         elif action == action_add_node:
             scene_pos = self.mapToScene(pos)
             self._main_window.create_node_by_mode(scene_pos)
+        elif action == action_delete:
+            self._main_window.delete_selection()
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # A partir de quantos itens uma remoção desliga o índice da cena
+    BULK_REMOVE = 500
+
+    def __init__(self, autosave_dir=None):
         super().__init__()
         self.MODES = ["Diagrama de Classes", "Fluxograma"]
         self.current_mode = self.MODES[0]
         self.setWindowTitle("Editor de Lógica Visual")
         self.setGeometry(100, 100, 1200, 800)
 
+        # Modelo do diagrama (sem Qt); os itens da cena são visões dele
+        self.model = GraphModel()
+        self.node_items = {}        # node_id -> NodeItem
+        self.connection_items = {}  # edge_id -> ConnectionItem
+        self.selected_node = None
+        self.selected_nodes = []  # seleção com mais de um node (edição em lote)
+        self._loader = None  # carga de projeto em andamento
+        self._saver = None   # gravação em segundo plano em andamento
+        # Edições desde o início; comparadas com as que o último arquivo salvo
+        # (ou carregado) contém para saber se há alterações não salvas
+        self.edit_count = 0
+        self._saved_edit_count = 0
+        # Autosave incremental; oferece recuperação se a sessão anterior caiu
+        self.autosave = AutoSaver(self, autosave_dir)
+        # Desfazer/refazer por deltas (ver history.UndoHistory)
+        self.history = UndoHistory()
+        QTimer.singleShot(0, self.offer_recovery)
+
         # Área de trabalho (WorkspaceView)
-        self.scene = QGraphicsScene()
+        self.scene = WorkspaceScene()
         self.view = WorkspaceView(self.scene, main_window=self)
+        # Desligado por padrão: todo node tem o seu NodeItem (ver virtual.py)
+        self.virtualizer = SceneVirtualizer(self)
+        # Layout automático em outro processo (ver autolayout.py)
+        self.layouter = AutoLayouter(self)
+        # Gerador de código da última pasta usada (guarda os hashes entre gerações)
+        self.codegen = None
+        # Índice de busca; construído na primeira busca e mantido a cada edição
+        self.search_index = SearchIndex()
 
         # Menu principal
         menubar = self.menuBar()
@@ -140,6 +371,50 @@ class MainWindow(QMainWindow):
         action_load = file_menu.addAction("Carregar Projeto")
         action_save.triggered.connect(self.save_project)
         action_load.triggered.connect(self.load_project)
+        file_menu.addSeparator()
+        action_codegen = file_menu.addAction("Gerar Código Python...")
+        action_codegen.triggered.connect(self.generate_code)
+        edit_menu = menubar.addMenu("Editar")
+        action_undo = edit_menu.addAction("Desfazer")
+        action_undo.setShortcut(QKeySequence.Undo)
+        action_undo.triggered.connect(self.undo)
+        action_redo = edit_menu.addAction("Refazer")
+        action_redo.setShortcut(QKeySequence.Redo)
+        action_redo.triggered.connect(self.redo)
+        edit_menu.addSeparator()
+        action_delete = edit_menu.addAction("Excluir Seleção")
+        action_delete.setShortcut(QKeySequence.Delete)
+        action_delete.triggered.connect(self.delete_selection)
+        action_find = edit_menu.addAction("Buscar")
+        action_find.setShortcut(QKeySequence.Find)
+        view_menu = menubar.addMenu("Exibir")
+        action_virtual = view_menu.addAction("Cena Virtualizada")
+        action_virtual.setCheckable(True)
+        action_virtual.toggled.connect(self.virtualizer.set_enabled)
+        perf_menu = view_menu.addMenu("Desempenho")
+        perf_group = QActionGroup(self)
+        for name in PRESETS:
+            action = perf_menu.addAction(name)
+            action.setCheckable(True)
+            action.setChecked(name == "Padrão")
+            action.triggered.connect(lambda checked, name=name: self.apply_view_preset(name))
+            perf_group.addAction(action)
+        perf_menu.addSeparator()
+        action_metrics = perf_menu.addAction("Métricas por Frame")
+        action_metrics.setCheckable(True)
+        action_metrics.toggled.connect(self.view.set_profiling)
+        action_export_metrics = perf_menu.addAction("Exportar Métricas...")
+        action_export_metrics.triggered.connect(self.export_metrics)
+        view_menu.addSeparator()
+        action_compare = view_menu.addAction("Comparar com Projeto...")
+        action_compare.triggered.connect(self.compare_with_project)
+        action_clear_compare = view_menu.addAction("Limpar Comparação")
+        action_clear_compare.triggered.connect(lambda: self.set_diff_marks({}))
+        layout_menu = menubar.addMenu("Layout")
+        action_layered = layout_menu.addAction("Organizar Hierarquia (herda)")
+        action_layered.triggered.connect(lambda: self.auto_layout("layered"))
+        action_force = layout_menu.addAction("Organizar por Forças")
+        action_force.triggered.connect(lambda: self.auto_layout("force"))
 
         # Layout central
         central_widget = QWidget()
@@ -151,12 +426,20 @@ class MainWindow(QMainWindow):
         self.dock = QDockWidget("Propriedades do Node", self)
         self.dock.setAllowedAreas(Qt.RightDockWidgetArea | Qt.LeftDockWidgetArea)
         self.prop_widget = QWidget()
-        # Campos de edição
+        # Campos de edição. As listas são views sobre as listas do node
+        # selecionado (panel.StringListModel), sem itens próprios
+        self.list_models = {field: StringListModel(self) for field in LIST_FIELDS}
         self.title_edit = QLineEdit()
-        self.inputs_list = QListWidget()
-        self.inputs_list.setEditTriggers(QListWidget.DoubleClicked | QListWidget.SelectedClicked | QListWidget.EditKeyPressed)
-        self.outputs_list = QListWidget()
-        self.outputs_list.setEditTriggers(QListWidget.DoubleClicked | QListWidget.SelectedClicked | QListWidget.EditKeyPressed)
+        self.inputs_list = QListView()
+        self.inputs_list.setModel(self.list_models["inputs"])
+        self.inputs_list.setUniformItemSizes(True)
+        self.inputs_list.setLayoutMode(QListView.Batched)
+        self.inputs_list.setEditTriggers(QListView.DoubleClicked | QListView.SelectedClicked | QListView.EditKeyPressed)
+        self.outputs_list = QListView()
+        self.outputs_list.setModel(self.list_models["outputs"])
+        self.outputs_list.setUniformItemSizes(True)
+        self.outputs_list.setLayoutMode(QListView.Batched)
+        self.outputs_list.setEditTriggers(QListView.DoubleClicked | QListView.SelectedClicked | QListView.EditKeyPressed)
         self.desc_edit = QTextEdit()
         self.inputs_add_btn = QPushButton("Adicionar Entrada")
         self.inputs_del_btn = QPushButton("Remover Entrada")
@@ -164,13 +447,19 @@ class MainWindow(QMainWindow):
         self.outputs_del_btn = QPushButton("Remover Saída")
 
         # Novos widgets para propriedades e métodos
-        self.properties_list = QListWidget()
-        self.properties_list.setEditTriggers(QListWidget.DoubleClicked | QListWidget.SelectedClicked | QListWidget.EditKeyPressed)
+        self.properties_list = QListView()
+        self.properties_list.setModel(self.list_models["properties"])
+        self.properties_list.setUniformItemSizes(True)
+        self.properties_list.setLayoutMode(QListView.Batched)
+        self.properties_list.setEditTriggers(QListView.DoubleClicked | QListView.SelectedClicked | QListView.EditKeyPressed)
         self.properties_add_btn = QPushButton("Adicionar Propriedade")
         self.properties_del_btn = QPushButton("Remover Propriedade")
 
-        self.methods_list = QListWidget()
-        self.methods_list.setEditTriggers(QListWidget.DoubleClicked | QListWidget.SelectedClicked | QListWidget.EditKeyPressed)
+        self.methods_list = QListView()
+        self.methods_list.setModel(self.list_models["methods"])
+        self.methods_list.setUniformItemSizes(True)
+        self.methods_list.setLayoutMode(QListView.Batched)
+        self.methods_list.setEditTriggers(QListView.DoubleClicked | QListView.SelectedClicked | QListView.EditKeyPressed)
         self.methods_add_btn = QPushButton("Adicionar Método")
         self.methods_del_btn = QPushButton("Remover Método")
 
@@ -208,6 +497,10 @@ class MainWindow(QMainWindow):
         self.panel_stack = QStackedWidget()
         self.panel_stack.addWidget(self.prop_widget)         # index 0: painel de edição
         self.panel_stack.addWidget(self.no_selection_label)  # index 1: mensagem padrão
+        self.batch_panel = BatchEditPanel()
+        self.batch_panel.title_requested.connect(self.batch_set_title)
+        self.batch_panel.item_requested.connect(self.batch_edit_items)
+        self.panel_stack.addWidget(self.batch_panel)         # index 2: vários nodes
 
         self.scroll_area = QScrollArea()
         self.scroll_area.setWidgetResizable(True)
@@ -224,11 +517,25 @@ class MainWindow(QMainWindow):
         self.dock.setWidget(self.scroll_area)
         self.addDockWidget(Qt.RightDockWidgetArea, self.dock)
         self.dock.show()
+        # Busca (dock à esquerda)
+        self.search_panel = SearchPanel()
+        self.search_dock = QDockWidget("Buscar", self)
+        self.search_dock.setWidget(self.search_panel)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.search_dock)
+        self.search_panel.query_changed.connect(self.run_search)
+        self.search_panel.node_activated.connect(self.jump_to_node)
+        action_find.triggered.connect(self.show_search)
         self.scene.selectionChanged.connect(self.on_selection_changed)
-        self.inputs_list.itemChanged.connect(self.input_name_changed)
-        self.outputs_list.itemChanged.connect(self.output_name_changed)
+        self.list_models["inputs"].edited.connect(self.input_name_changed)
+        self.list_models["outputs"].edited.connect(self.output_name_changed)
 
-        # Conectar sinais dos campos
+        # Conectar sinais dos campos. Textos são aplicados ao node no máximo
+        # uma vez por frame (ver flush_text_edits)
+        self._pending_text = {}  # campo -> node_id com edição pendente
+        self._text_timer = QTimer(self)
+        self._text_timer.setSingleShot(True)
+        self._text_timer.setInterval(16)
+        self._text_timer.timeout.connect(self.flush_text_edits)
         self.title_edit.textChanged.connect(self.update_node_title)
         self.desc_edit.textChanged.connect(self.update_node_desc)
         self.inputs_add_btn.clicked.connect(self.add_input)
@@ -241,21 +548,22 @@ class MainWindow(QMainWindow):
         self.methods_add_btn.clicked.connect(self.add_method)
         self.methods_del_btn.clicked.connect(self.del_method)
         # Conectar edição de itens das listas
-        self.properties_list.itemChanged.connect(self.property_name_changed)
-        self.methods_list.itemChanged.connect(self.method_name_changed)
-    def input_name_changed(self, item):
+        self.list_models["properties"].edited.connect(self.property_name_changed)
+        self.list_models["methods"].edited.connect(self.method_name_changed)
+
+    def input_name_changed(self, row, text):
         if self.selected_node:
-            row = self.inputs_list.row(item)
-            self.selected_node.inputs[row] = item.text()
-            self.selected_node.update()
+            self.edit("set_item", id=self.selected_node.node_id, field="inputs", index=row, value=text)
 
-    def output_name_changed(self, item):
+    def output_name_changed(self, row, text):
         if self.selected_node:
-            row = self.outputs_list.row(item)
-            self.selected_node.outputs[row] = item.text()
-            self.selected_node.update()
+            self.edit("set_item", id=self.selected_node.node_id, field="outputs", index=row, value=text)
 
     def on_selection_changed(self):
+        with profiler.section("selection"):
+            self._apply_selection()
+
+    def _apply_selection(self):
         # Protege contra acesso à cena destruída
         try:
             if not hasattr(self, "scene") or self.scene is None:
@@ -265,231 +573,643 @@ class MainWindow(QMainWindow):
             # Cena já foi destruída
             return
 
-        if items and isinstance(items[0], NodeItem):
-            self.selected_node = items[0]
+        self.flush_text_edits()
+        self.history.seal()
+        nodes = [item for item in items if isinstance(item, NodeItem)]
+        if len(nodes) > 1:
+            self.selected_node = None
+            self.selected_nodes = nodes
+            self.batch_panel.set_count(len(nodes))
+            self.panel_stack.setCurrentIndex(2)  # Mostra painel de edição em lote
+        elif nodes:
+            self.selected_node = nodes[0]
+            self.selected_nodes = []
             self.fill_properties_panel(self.selected_node)
             self.panel_stack.setCurrentIndex(0)  # Mostra painel de edição
         else:
             self.selected_node = None
+            self.selected_nodes = []
             self.panel_stack.setCurrentIndex(1)  # Mostra mensagem padrão
         # Garante que o painel nunca seja ocultado
         self.dock.show()
 
     def fill_properties_panel(self, node):
+        # Nada é recriado: as listas só passam a apontar para as do node
         self.title_edit.blockSignals(True)
         self.desc_edit.blockSignals(True)
         self.title_edit.setText(node.title)
-        self.inputs_list.clear()
-        for inp in node.inputs:
-            item = QListWidgetItem(inp)
-            item.setFlags(item.flags() | Qt.ItemIsEditable)
-            self.inputs_list.addItem(item)
-        self.outputs_list.clear()
-        for out in node.outputs:
-            item = QListWidgetItem(out)
-            item.setFlags(item.flags() | Qt.ItemIsEditable)
-            self.outputs_list.addItem(item)
-        # Preencher propriedades
-        self.properties_list.blockSignals(True)
-        self.properties_list.clear()
-        for prop in getattr(node, "properties", []):
-            item = QListWidgetItem(prop)
-            item.setFlags(item.flags() | Qt.ItemIsEditable)
-            self.properties_list.addItem(item)
-        self.properties_list.blockSignals(False)
-        # Preencher métodos
-        self.methods_list.blockSignals(True)
-        self.methods_list.clear()
-        for method in getattr(node, "methods", []):
-            item = QListWidgetItem(method)
-            item.setFlags(item.flags() | Qt.ItemIsEditable)
-            self.methods_list.addItem(item)
-        self.methods_list.blockSignals(False)
+        for field, list_model in self.list_models.items():
+            list_model.set_values(getattr(node, field))
+        self.desc_edit.setPlainText(node.description)
+        self.title_edit.blockSignals(False)
+        self.desc_edit.blockSignals(False)
+
     def update_node_title(self, text):
         if self.selected_node:
-            self.selected_node.title = text
-            self.selected_node.update()
+            self._pending_text["title"] = self.selected_node.node_id
+            self._text_timer.start()
 
     def update_node_desc(self):
         if self.selected_node:
-            self.selected_node.description = self.desc_edit.toPlainText()
-            self.selected_node.update()
+            # toPlainText() só é chamado no flush, não a cada tecla
+            self._pending_text["description"] = self.selected_node.node_id
+            self._text_timer.start()
+
+    def flush_text_edits(self):
+        # Aplica de uma vez o que foi digitado no título/descrição desde o
+        # último frame; chamado também antes de qualquer outra edição
+        if not self._pending_text:
+            return
+        self._text_timer.stop()
+        pending = self._pending_text
+        self._pending_text = {}
+        for field, node_id in pending.items():
+            node = self.model.nodes.get(node_id)
+            if node is None:
+                continue
+            value = self.title_edit.text() if field == "title" else self.desc_edit.toPlainText()
+            if value != getattr(node, field):
+                self.edit("set", merge=True, id=node_id, field=field, value=value)
 
     def add_input(self):
         if self.selected_node:
             new_input = f"in{len(self.selected_node.inputs)+1}"
-            self.selected_node.inputs.append(new_input)
-            self.inputs_list.addItem(new_input)
-            self.selected_node.update()
+            self.edit("insert_item", id=self.selected_node.node_id, field="inputs",
+                      index=len(self.selected_node.inputs), value=new_input)
 
     def del_input(self):
         if self.selected_node:
-            row = self.inputs_list.currentRow()
+            row = self.inputs_list.currentIndex().row()
             if row >= 0:
-                self.selected_node.inputs.pop(row)
-                self.inputs_list.takeItem(row)
-                self.selected_node.update()
+                self.edit("remove_item", id=self.selected_node.node_id, field="inputs", index=row)
 
     def add_output(self):
         if self.selected_node:
             new_output = f"out{len(self.selected_node.outputs)+1}"
-            self.selected_node.outputs.append(new_output)
-            self.outputs_list.addItem(new_output)
-            self.selected_node.update()
+            self.edit("insert_item", id=self.selected_node.node_id, field="outputs",
+                      index=len(self.selected_node.outputs), value=new_output)
 
     def del_output(self):
         if self.selected_node:
-            row = self.outputs_list.currentRow()
+            row = self.outputs_list.currentIndex().row()
             if row >= 0:
-                self.selected_node.outputs.pop(row)
-                self.outputs_list.takeItem(row)
-                self.selected_node.update()
-        self.inputs_list.addItems(node.inputs)
-        self.outputs_list.clear()
-        self.outputs_list.addItems(node.outputs)
-        self.desc_edit.setPlainText(node.description)
-        self.title_edit.blockSignals(False)
-        self.desc_edit.blockSignals(False)
+                self.edit("remove_item", id=self.selected_node.node_id, field="outputs", index=row)
 
     def add_property(self):
         if self.selected_node:
             new_prop = f"propriedade{len(self.selected_node.properties)+1}"
-            self.selected_node.properties.append(new_prop)
-            item = QListWidgetItem(new_prop)
-            item.setFlags(item.flags() | Qt.ItemIsEditable)
-            self.properties_list.addItem(item)
-            self.selected_node.update()
+            self.edit("insert_item", id=self.selected_node.node_id, field="properties",
+                      index=len(self.selected_node.properties), value=new_prop)
 
     def del_property(self):
         if self.selected_node:
-            row = self.properties_list.currentRow()
+            row = self.properties_list.currentIndex().row()
             if row >= 0:
-                self.selected_node.properties.pop(row)
-                self.properties_list.takeItem(row)
-                self.selected_node.update()
+                self.edit("remove_item", id=self.selected_node.node_id, field="properties", index=row)
 
     def add_method(self):
         if self.selected_node:
             new_method = f"metodo{len(self.selected_node.methods)+1}"
-            self.selected_node.methods.append(new_method)
-            item = QListWidgetItem(new_method)
-            item.setFlags(item.flags() | Qt.ItemIsEditable)
-            self.methods_list.addItem(item)
-            self.selected_node.update()
+            self.edit("insert_item", id=self.selected_node.node_id, field="methods",
+                      index=len(self.selected_node.methods), value=new_method)
 
     def del_method(self):
         if self.selected_node:
-            row = self.methods_list.currentRow()
+            row = self.methods_list.currentIndex().row()
             if row >= 0:
-                self.selected_node.methods.pop(row)
-                self.methods_list.takeItem(row)
-                self.selected_node.update()
+                self.edit("remove_item", id=self.selected_node.node_id, field="methods", index=row)
 
-    def property_name_changed(self, item):
+    def property_name_changed(self, row, text):
         if self.selected_node:
-            row = self.properties_list.row(item)
-            self.selected_node.properties[row] = item.text()
-            self.selected_node.update()
+            self.edit("set_item", id=self.selected_node.node_id, field="properties", index=row, value=text)
 
-    def method_name_changed(self, item):
+    def method_name_changed(self, row, text):
         if self.selected_node:
-            row = self.methods_list.row(item)
-            self.selected_node.methods[row] = item.text()
-            self.selected_node.update()
+            self.edit("set_item", id=self.selected_node.node_id, field="methods", index=row, value=text)
+
+    def apply_view_preset(self, name):
+        apply_view_settings(self.view, PRESETS[name])
+
+    def add_node_item(self, node_data):
+        if self.virtualizer.enabled:
+            # O item só é criado se (e quando) o node estiver na área visível
+            self.virtualizer.node_added(node_data)
+            return self.node_items.get(node_data.id)
+        node = NodeItem(node_data=node_data)
+        self.view.apply_level_of_detail(node)
+        self.scene.addItem(node)
+        self.node_items[node_data.id] = node
+        return node
+
+    def add_connection_item(self, edge):
+        if self.virtualizer.enabled:
+            self.virtualizer.schedule()
+            return self.connection_items.get(edge.id)
+        node_from = self.node_items[edge.from_node]
+        node_to = self.node_items[edge.to_node]
+        connection = ConnectionItem(node_from, edge.from_idx, node_to, edge.to_idx)
+        connection.edge = edge
+        self.view.apply_level_of_detail(connection)
+        self.scene.addItem(connection)
+        node_from.add_output_connection(connection)
+        node_to.add_input_connection(connection)
+        self.connection_items[edge.id] = connection
+        return connection
+
+    def register_connection(self, connection):
+        # Conexão criada por arraste na view: registra no modelo
+        edge = self.model.add_edge(
+            connection.node_from.node_id, connection.idx_from,
+            connection.node_to.node_id, connection.idx_to
+        )
+        connection.edge = edge
+        self.view.apply_level_of_detail(connection)
+        self.connection_items[edge.id] = connection
+        self.commit([{"op": "add_edge", "edge": edge_to_dict(edge)}], [{"op": "remove_edge", "id": edge.id}])
+
+    def nodes_moved(self, moves):
+        # Chamado pela view ao fim de um arraste: [(node, pos_antiga, pos_nova)];
+        # o arraste inteiro vira uma única entrada no histórico
+        ops = [{"op": "move", "id": node.node_id, "pos": [new_pos.x(), new_pos.y()]} for node, _, new_pos in moves]
+        undo_ops = [{"op": "move", "id": node.node_id, "pos": [old_pos.x(), old_pos.y()]} for node, old_pos, _ in moves]
+        if self.virtualizer.enabled:
+            for node, _, _ in moves:
+                self.virtualizer.node_moved(node.node_data)
+        self.commit(ops, undo_ops)
+
+    def auto_layout(self, algorithm):
+        # Com vários nodes selecionados só eles são reorganizados; os demais
+        # ficam fixos
+        node_ids = [node.node_id for node in self.selected_nodes] or None
+        self.layouter.start(algorithm, node_ids)
+
+    def apply_layout(self, positions):
+        # {node_id: (x, y)} calculado pelo AutoLayouter; uma entrada no histórico
+        if not positions:
+            return
+        ops = [{"op": "move", "id": node_id, "pos": [x, y]} for node_id, (x, y) in positions.items()]
+        bulk = len(ops) >= self.BULK_REMOVE
+        if bulk:
+            # Reindexar a BSP a cada setPos custa mais que reconstruí-la no fim
+            index_method = self.scene.itemIndexMethod()
+            self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        try:
+            self.edit_ops(ops)
+        finally:
+            if bulk:
+                self.scene.setItemIndexMethod(index_method)
+
+    def remove_connection_item(self, connection):
+        # Tira a conexão da cena e dos pinos (O(1)); a aresta do modelo é
+        # removida por quem chama
+        connection.node_from.remove_output_connection(connection)
+        if connection.node_to is not None:
+            connection.node_to.remove_input_connection(connection)
+        path_updates.discard(connection)
+        if connection.edge is not None:
+            self.connection_items.pop(connection.edge.id, None)
+        self.scene.removeItem(connection)
+
+    def remove_pin(self, node, pin_type, idx):
+        # Remove o pino no modelo (com suas arestas) e renumera as conexões
+        # dos pinos seguintes
+        removed = self.model.remove_pin(node.node_id, pin_type + "s", idx)
+        for edge in removed:
+            connection = self.connection_items.get(edge.id)
+            if connection is not None:
+                self.remove_connection_item(connection)
+        node.shift_pin_connections(pin_type, idx + 1, -1)
+
+    def delete_selection(self):
+        # Só nodes são selecionáveis; as conexões deles saem junto
+        node_ids = [item.node_id for item in self.scene.selectedItems() if isinstance(item, NodeItem)]
+        if node_ids:
+            self.edit("delete", nodes=node_ids, edges=[])
+
+    def remove_items(self, node_ids, edge_ids):
+        # Exclusão em lote: o modelo é atualizado primeiro (cada aresta sai
+        # uma única vez) e a cena depois; em lotes grandes com o índice
+        # desligado, para não rebalancear a BSP a cada item
+        doomed = set(node_ids)
+        removed = [self.model.remove_edge(edge_id) for edge_id in edge_ids]
+        for node_id in node_ids:
+            removed.extend(self.model.remove_node(node_id)[1])
+        # Na cena virtualizada nem todo node/aresta tem item
+        nodes = [self.node_items.pop(node_id) for node_id in node_ids if node_id in self.node_items]
+        if self.virtualizer.enabled:
+            for node_id in node_ids:
+                self.virtualizer.node_removed(node_id)
+        if any(node.isSelected() for node in nodes):
+            # Um único selectionChanged (e não um por item removido)
+            self.scene.clearSelection()
+        bulk = len(nodes) + len(removed) >= self.BULK_REMOVE
+        if bulk:
+            index_method = self.scene.itemIndexMethod()
+            self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        viewport = self.view.viewport()
+        viewport.setUpdatesEnabled(False)
+        try:
+            for edge in removed:
+                connection = self.connection_items.pop(edge.id, None)
+                if connection is None:
+                    continue
+                # Só os nodes que ficam precisam largar a conexão
+                if edge.from_node not in doomed:
+                    connection.node_from.remove_output_connection(connection)
+                if edge.to_node not in doomed:
+                    connection.node_to.remove_input_connection(connection)
+                path_updates.discard(connection)
+                self.scene.removeItem(connection)
+            for node in nodes:
+                self.scene.removeItem(node)
+        finally:
+            if bulk:
+                self.scene.setItemIndexMethod(index_method)
+            viewport.setUpdatesEnabled(True)
+
+    def apply_op(self, op):
+        # Aplica uma operação do journal ao modelo e sincroniza só os itens
+        # afetados (edições, desfazer e refazer passam por aqui)
+        kind = op["op"]
+        if kind == "remove_node":
+            self.remove_items([op["id"]], [])
+        elif kind == "remove_edge":
+            self.remove_items([], [op["id"]])
+        elif kind == "delete":
+            self.remove_items(op["nodes"], op["edges"])
+        elif kind in ("insert_item", "remove_item") and op["field"] in PIN_FIELDS:
+            node = self.node_items.get(op["id"])
+            pin_type = op["field"][:-1]
+            if node is None:
+                # Node sem item (cena virtualizada): só o modelo muda, e as
+                # conexões presas à âncora dele são refeitas
+                apply_op(self.model, op)
+                if self.virtualizer.enabled:
+                    self.virtualizer.pins_changed(op["id"])
+            elif kind == "insert_item":
+                self.model.insert_pin(op["id"], op["field"], op["index"], op["value"])
+                node.shift_pin_connections(pin_type, op["index"], 1)
+                node.invalidate()
+            else:
+                self.remove_pin(node, pin_type, op["index"])
+                node.invalidate()
+        else:
+            apply_op(self.model, op)
+            if kind == "add_node":
+                self.add_node_item(self.model.nodes[op["node"]["id"]])
+            elif kind == "add_edge":
+                self.add_connection_item(self.model.edges[op["edge"]["id"]])
+            elif kind == "insert":
+                for node in op["nodes"]:
+                    self.add_node_item(self.model.nodes[node["id"]])
+                for edge in op["edges"]:
+                    self.add_connection_item(self.model.edges[edge["id"]])
+            elif kind == "move":
+                if op["id"] in self.node_items:
+                    self.node_items[op["id"]].setPos(*op["pos"])
+                if self.virtualizer.enabled:
+                    self.virtualizer.node_moved(self.model.nodes[op["id"]])
+            elif op["id"] in self.node_items:
+                self.node_items[op["id"]].invalidate()
+        if kind in ("insert_item", "remove_item", "set_item"):
+            self._sync_panel(op)
+
+    def _sync_panel(self, op):
+        # Lista do node exibido mudou: só a linha editada é repintada, ou a
+        # lista é reiniciada (custo das linhas visíveis) se mudou de tamanho
+        if self.selected_node is None or op["id"] != self.selected_node.node_id:
+            return
+        list_model = self.list_models[op["field"]]
+        if op["op"] == "set_item":
+            list_model.row_changed(op["index"])
+        else:
+            list_model.refresh()
+
+    def edit(self, op, merge=False, **fields):
+        # Aplica uma edição com desfazer. merge=True junta edições seguidas do
+        # mesmo campo (ex.: cada tecla digitada no título) numa só entrada
+        fields["op"] = op
+        merge_key = (op, fields.get("id"), fields.get("field"), fields.get("index")) if merge else None
+        self.edit_ops([fields], merge_key)
+
+    def edit_ops(self, ops, merge_key=None):
+        # Várias operações como uma única entrada do histórico; a cena é
+        # repintada uma vez só, no fim
+        self.flush_text_edits()
+        undo_chunks = []
+        viewport = self.view.viewport()
+        viewport.setUpdatesEnabled(False)
+        try:
+            for op in ops:
+                undo_chunks.append(inverse_ops(self.model, op))
+                self.apply_op(op)
+        finally:
+            viewport.setUpdatesEnabled(True)
+        undo_ops = [undo for chunk in reversed(undo_chunks) for undo in chunk]
+        self.commit(ops, undo_ops, merge_key)
+
+    def batch_set_title(self, pattern):
+        # {title}: título atual; {n}: posição do node na seleção
+        ops = []
+        for n, node in enumerate(sorted(self.selected_nodes, key=lambda node: node.node_id), 1):
+            title = pattern.replace("{title}", node.title).replace("{n}", str(n))
+            if title != node.title:
+                ops.append({"op": "set", "id": node.node_id, "field": "title", "value": title})
+        if ops:
+            self.edit_ops(ops)
+
+    def batch_edit_items(self, action, field, name):
+        ops = []
+        for node in self.selected_nodes:
+            values = getattr(node, field)
+            if action == "insert":
+                ops.append({"op": "insert_item", "id": node.node_id, "field": field, "index": len(values), "value": name})
+            else:
+                # Do fim para o começo, para os índices seguintes não mudarem
+                for index in range(len(values) - 1, -1, -1):
+                    if values[index] == name:
+                        ops.append({"op": "remove_item", "id": node.node_id, "field": field, "index": index})
+        if ops:
+            self.edit_ops(ops)
+
+    def commit(self, ops, undo_ops, merge_key=None):
+        # Registra edições já aplicadas: journal do autosave e histórico
+        self.flush_text_edits()
+        for op in ops:
+            self.autosave.record(op)
+        self.edit_count += 1
+        self.history.push(ops, undo_ops, merge_key)
+        self._index_ops(ops)
+
+    def undo(self):
+        self.flush_text_edits()
+        if self._loader is None:
+            self._replay(self.history.undo())
+
+    def redo(self):
+        self.flush_text_edits()
+        if self._loader is None:
+            self._replay(self.history.redo())
+
+    def _replay(self, ops):
+        if ops is None:
+            return
+        for op in ops:
+            self.apply_op(op)
+            self.autosave.record(op)
+        self.edit_count += 1
+        self._index_ops(ops)
+        if self.selected_node is not None:
+            self.fill_properties_panel(self.selected_node)
+
+    def rebuild_scene(self):
+        self.search_index.invalidate()
+        self.scene.clear()
+        self.scene.pin_index.clear()
+        self.node_items.clear()
+        self.connection_items.clear()
+        if self.virtualizer.enabled:
+            self.virtualizer.reset()
+            return
+        for node_data in self.model.nodes.values():
+            self.add_node_item(node_data)
+        for edge in self.model.edges.values():
+            self.add_connection_item(edge)
 
     def save_project(self):
-        import json
         from PyQt5.QtWidgets import QFileDialog
-        nodes = []
-        node_list = []
-        node_index_map = {}
-        for item in self.scene.items():
-            if isinstance(item, NodeItem):
-                node_list.append(item)
-        # Garante ordem estável
-        node_list = list(reversed(node_list))
-        for idx, node in enumerate(node_list):
-            node_index_map[node] = idx
-            nodes.append({
-                "title": node.title,
-                "inputs": node.inputs,
-                "outputs": node.outputs,
-                "description": node.description,
-                "properties": getattr(node, "properties", []),
-                "methods": getattr(node, "methods", []),
-                "pos": [node.pos().x(), node.pos().y()]
-            })
-        # Serializar conexões
-        connections = []
-        for item in self.scene.items():
-            from src.connection import ConnectionItem
-            if isinstance(item, ConnectionItem):
-                if item.node_from in node_index_map and item.node_to in node_index_map:
-                    connections.append({
-                        "from_node": node_index_map[item.node_from],
-                        "from_idx": item.idx_from,
-                        "to_node": node_index_map[item.node_to],
-                        "to_idx": item.idx_to
-                    })
-        data = {"nodes": nodes, "connections": connections}
-        path, _ = QFileDialog.getSaveFileName(self, "Salvar Projeto", "", "JSON (*.json)")
+        path, _ = QFileDialog.getSaveFileName(self, "Salvar Projeto", "", PROJECT_FILE_FILTER)
+        if path:
+            self.start_saving(path)
+
+    def start_saving(self, path):
+        # Snapshot do modelo gravado em outra thread (ver saver.ProjectSaver)
+        self.flush_text_edits()
+        if self._saver is not None:
+            self._saver.wait()
+        self._saver = ProjectSaver(self, path)
+        self._saver.start()
+
+    def on_save_finished(self, saver):
+        if saver.succeeded:
+            self._saved_edit_count = saver.edit_count
+        if self._saver is saver:
+            self._saver = None
+        saver.deleteLater()
+
+    def _index_ops(self, ops):
+        # Mantém o índice de busca em dia com as edições (já aplicadas ao modelo)
+        index = self.search_index
+        if index.stale:
+            return
+        nodes = self.model.nodes
+        for op in ops:
+            kind = op["op"]
+            if kind == "add_node":
+                index.update_node(nodes[op["node"]["id"]])
+            elif kind == "insert":
+                for node in op["nodes"]:
+                    index.update_node(nodes[node["id"]])
+            elif kind == "remove_node":
+                index.remove_node(op["id"])
+            elif kind == "delete":
+                for node_id in op["nodes"]:
+                    index.remove_node(node_id)
+            elif kind in ("set", "set_item", "insert_item", "remove_item") and op["id"] in nodes:
+                index.update_node(nodes[op["id"]])
+
+    def show_search(self):
+        self.search_dock.show()
+        self.search_dock.raise_()
+        self.search_panel.focus_query()
+
+    def run_search(self, query):
+        start = time.perf_counter()
+        if self.search_index.stale:
+            self.flush_text_edits()
+            self.search_index.rebuild(self.model)
+        results = self.search_index.search(query)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.search_panel.set_results(query, [(node_id, self.search_index.title(node_id)) for node_id, _ in results], elapsed)
+        # Destaque: só os itens que mudaram de estado são repintados
+        old = NodeItem.highlighted
+        NodeItem.highlighted = {node_id for node_id, _ in results}
+        for node_id in old ^ NodeItem.highlighted:
+            item = self.node_items.get(node_id)
+            if item is not None:
+                item.update()
+
+    def jump_to_node(self, node_id):
+        node = self.model.nodes.get(node_id)
+        if node is None:
+            return
+        self.view.centerOn(node.x + NodeItem.WIDTH / 2, node.y + NodeItem.HEIGHT / 2)
+        if self.virtualizer.enabled:
+            self.virtualizer.refresh()  # materializa a área antes de selecionar
+        item = self.node_items.get(node_id)
+        if item is not None:
+            self.scene.clearSelection()
+            item.setSelected(True)
+
+    def generate_code(self):
+        from PyQt5.QtWidgets import QFileDialog
+        start_dir = self.codegen.out_dir if self.codegen is not None else ""
+        path = QFileDialog.getExistingDirectory(self, "Pasta do Código Gerado", start_dir)
+        if not path:
+            return
+        if self.codegen is None or self.codegen.out_dir != path:
+            self.codegen = CodeGenerator(path)
+        self.flush_text_edits()
+        try:
+            report = self.codegen.generate(self.model)
+        except (OSError, SyntaxError, ValueError) as e:
+            # SyntaxError/ValueError: verificação de compile() em
+            # codegen._write_chunk; não pode escapar do slot
+            QMessageBox.warning(self, "Gerar Código", f"Erro ao gerar código: {e}")
+            return
+        self.statusBar().showMessage(
+            f"{len(report.written)} arquivos gerados, {len(report.removed)} removidos, "
+            f"{report.unchanged} inalterados ({report.seconds * 1000:.0f} ms)", 5000
+        )
+
+    def export_metrics(self):
+        # Últimos frames medidos (Exibir > Desempenho > Métricas por Frame)
+        from PyQt5.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar Métricas", "", "JSON (*.json)")
         if path:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            profiler.export(path)
+
+    def compare_with_project(self):
+        # Destaca os nodes que mudaram no diagrama aberto em relação a outra
+        # versão salva (ver diff.py); nodes removidos só aparecem na contagem
+        from PyQt5.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getOpenFileName(self, "Comparar com Projeto", "", PROJECT_FILE_FILTER)
+        if not path:
+            return
+        self.flush_text_edits()
+        try:
+            diff = diff_projects(read_project(path)[0], self.model.to_dict())
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Comparar com Projeto", f"Erro ao ler o projeto: {e}")
+            return
+        marks = diff.node_marks()
+        self.set_diff_marks(marks)
+        kinds = list(marks.values())
+        self.statusBar().showMessage(
+            f"Comparação: {kinds.count('added')} nodes novos, {kinds.count('changed')} alterados, "
+            f"{kinds.count('moved')} movidos, {diff.summary().get('remove_node', 0)} removidos"
+        )
+
+    def set_diff_marks(self, marks):
+        # Só os itens que mudaram de estado são repintados
+        old = NodeItem.diff_marks
+        NodeItem.diff_marks = marks
+        for node_id in old.keys() | marks.keys():
+            if old.get(node_id) != marks.get(node_id):
+                item = self.node_items.get(node_id)
+                if item is not None:
+                    item.update()
 
     def load_project(self):
-        import json
         from PyQt5.QtWidgets import QFileDialog
-        path, _ = QFileDialog.getOpenFileName(self, "Carregar Projeto", "", "JSON (*.json)")
+        path, _ = QFileDialog.getOpenFileName(self, "Carregar Projeto", "", PROJECT_FILE_FILTER)
         if path:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self.scene.clear()
-            node_objs = []
-            for node_data in data.get("nodes", []):
-                node = NodeItem(
-                    title=node_data.get("title", "Node"),
-                    inputs=node_data.get("inputs", []),
-                    outputs=node_data.get("outputs", []),
-                    description=node_data.get("description", ""),
-                    properties=node_data.get("properties", []),
-                    methods=node_data.get("methods", [])
-                )
-                node.setPos(*node_data.get("pos", [0, 0]))
-                self.scene.addItem(node)
-                node_objs.append(node)
-            # Forçar atualização dos nodes para garantir que os pinos existam
-            for node in node_objs:
-                node.update()
-            # Reconstruir conexões
-            from src.connection import ConnectionItem
-            for conn in data.get("connections", []):
-                node_from = node_objs[conn["from_node"]]
-                idx_from = conn["from_idx"]
-                node_to = node_objs[conn["to_node"]]
-                idx_to = conn["to_idx"]
-                connection = ConnectionItem(node_from, idx_from, node_to, idx_to)
-                self.scene.addItem(connection)
-                node_from.add_output_connection(connection)
-                node_to.add_input_connection(connection)
+            self.start_loading(path)
+
+    def start_loading(self, path):
+        # Carga incremental em segundo plano (ver loader.ProjectLoader)
+        if self._loader is not None:
+            self._loader.supersede()
+        NodeItem.diff_marks = {}  # comparação era do diagrama anterior
+        self._loader = ProjectLoader(self, path)
+        self._loader.start()
+
+    def on_load_finished(self, loader):
+        if self._loader is loader:
+            self._loader = None
+            self.history.clear()
+            self.autosave.reset()
+            self.search_index.invalidate()
+            self._saved_edit_count = self.edit_count
+        loader.deleteLater()
+
+    def offer_recovery(self):
+        if not self.autosave.has_recovery():
+            return
+        answer = QMessageBox.question(
+            self, "Recuperar Projeto",
+            "A sessão anterior não foi encerrada normalmente. Recuperar as alterações do autosave?"
+        )
+        if answer == QMessageBox.Yes:
+            self.model = self.autosave.recover()
+            self.rebuild_scene()
+            self.history.clear()
+            self.autosave.reset()
+            self.edit_count += 1  # o estado recuperado não está em nenhum arquivo
+        else:
+            self.autosave.discard_recovery()
+
+    def has_unsaved_changes(self):
+        return self.edit_count != self._saved_edit_count
+
+    def _save_before_close(self):
+        # Gravação síncrona: a janela vai fechar logo em seguida
+        from PyQt5.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getSaveFileName(self, "Salvar Projeto", "", PROJECT_FILE_FILTER)
+        if not path:
+            return False
+        try:
+            save_snapshot(self.model.snapshot(), path)
+        except Exception as e:
+            # Mesmo critério do ProjectSaveWorker: nada escapa do evento
+            QMessageBox.warning(self, "Salvar Projeto", f"Erro ao salvar {path}: {str(e) or type(e).__name__}")
+            return False
+        self._saved_edit_count = self.edit_count
+        return True
+
+    def closeEvent(self, event):
+        self.flush_text_edits()
+        if self._saver is not None:
+            self._saver.wait()
+            if self._saver.succeeded:
+                self._saved_edit_count = self._saver.edit_count
+        if self.has_unsaved_changes():
+            answer = QMessageBox.question(
+                self, "Sair", "Salvar as alterações antes de sair?",
+                QMessageBox.Save | QMessageBox.Discard | QMessageBox.Cancel, QMessageBox.Save
+            )
+            # Cancelado ou gravação sem sucesso: a janela continua aberta e o
+            # journal do autosave continua valendo
+            if answer == QMessageBox.Cancel or answer == QMessageBox.Save and not self._save_before_close():
+                event.ignore()
+                return
+        self.layouter.shutdown()
+        self.autosave.stop()
+        # Alterações salvas ou descartadas explicitamente: não há o que recuperar
+        self.autosave.discard()
+        super().closeEvent(event)
 
     def create_node_by_mode(self, scene_pos):
         if self.current_mode == "Diagrama de Classes":
-            node = NodeItem(
+            node_data = self.model.add_node(
                 title="Classe",
                 inputs=["herda", "agrega"],
                 outputs=["herda", "agrega"],
-                description="Classe com atributos e métodos"
+                description="Classe com atributos e métodos",
+                x=scene_pos.x(),
+                y=scene_pos.y()
             )
         else:
-            node = NodeItem(
+            node_data = self.model.add_node(
                 title="Ação",
                 inputs=["entrada"],
                 outputs=["saída"],
-                description="Bloco de lógica"
+                description="Bloco de lógica",
+                x=scene_pos.x(),
+                y=scene_pos.y()
             )
-        node.setPos(scene_pos)
-        self.scene.addItem(node)
+        self.add_node_item(node_data)
+        self.commit([{"op": "add_node", "node": node_data.to_dict()}], [{"op": "remove_node", "id": node_data.id}])
 
     def contextMenuEvent(self, event):
         # Menu para alternar modo
@@ -509,103 +1229,7 @@ class MainWindow(QMainWindow):
         elif action == action_add_node:
             scene_pos = self.view.mapToScene(self.view.mapFromGlobal(event.globalPos()))
             self.create_node_by_mode(scene_pos)
-        self.outputs_list = QListWidget()
-        self.desc_edit = QTextEdit()
-        self.inputs_add_btn = QPushButton("Adicionar Entrada")
-        self.outputs_add_btn = QPushButton("Adicionar Saída")
-        self.inputs_del_btn = QPushButton("Remover Entrada")
-        self.outputs_del_btn = QPushButton("Remover Saída")
-
-        prop_layout.addWidget(QLabel("Título:"))
-        prop_layout.addWidget(self.title_edit)
-        prop_layout.addWidget(QLabel("Entradas:"))
-        prop_layout.addWidget(self.inputs_list)
-        prop_layout.addWidget(self.inputs_add_btn)
-        prop_layout.addWidget(self.inputs_del_btn)
-        prop_layout.addWidget(QLabel("Saídas:"))
-        prop_layout.addWidget(self.outputs_list)
-        prop_layout.addWidget(self.outputs_add_btn)
-        prop_layout.addWidget(self.outputs_del_btn)
-        prop_layout.addWidget(QLabel("Descrição:"))
-        prop_layout.addWidget(self.desc_edit)
-        self.prop_widget.setLayout(prop_layout)
-        self.dock.setWidget(self.prop_widget)
-        self.addDockWidget(Qt.RightDockWidgetArea, self.dock)
-        self.dock.hide()
 
-        # Node selecionado
-        self.selected_node = None
-
-        # Conexões dos campos
-        self.title_edit.textChanged.connect(self.update_node_title)
-        self.desc_edit.textChanged.connect(self.update_node_desc)
-        self.inputs_add_btn.clicked.connect(self.add_input)
-        self.outputs_add_btn.clicked.connect(self.add_output)
-        self.inputs_del_btn.clicked.connect(self.del_input)
-        self.outputs_del_btn.clicked.connect(self.del_output)
-
-        # Detectar seleção de node
-        self.scene.selectionChanged.connect(self.on_selection_changed)
-
-    def on_selection_changed(self):
-        items = self.scene.selectedItems()
-        if items and isinstance(items[0], NodeItem):
-            self.selected_node = items[0]
-            self.fill_properties_panel(self.selected_node)
-            self.dock.show()
-        else:
-            self.selected_node = None
-            self.dock.hide()
-
-    def fill_properties_panel(self, node):
-        self.title_edit.blockSignals(True)
-        self.desc_edit.blockSignals(True)
-        self.title_edit.setText(node.title)
-        self.inputs_list.clear()
-        self.inputs_list.addItems(node.inputs)
-        self.outputs_list.clear()
-        self.outputs_list.addItems(node.outputs)
-        self.desc_edit.setPlainText(node.description)
-        self.title_edit.blockSignals(False)
-        self.desc_edit.blockSignals(False)
-
-    def update_node_title(self, text):
-        if self.selected_node:
-            self.selected_node.title = text
-            self.selected_node.update()
-
-    def update_node_desc(self):
-        if self.selected_node:
-            self.selected_node.description = self.desc_edit.toPlainText()
-            self.selected_node.update()
-
-    def add_input(self):
-        if self.selected_node:
-            self.selected_node.inputs.append(f"in{len(self.selected_node.inputs)+1}")
-            self.inputs_list.addItem(self.selected_node.inputs[-1])
-            self.selected_node.update()
-
-    def add_output(self):
-        if self.selected_node:
-            self.selected_node.outputs.append(f"out{len(self.selected_node.outputs)+1}")
-            self.outputs_list.addItem(self.selected_node.outputs[-1])
-            self.selected_node.update()
-
-    def del_input(self):
-        if self.selected_node:
-            row = self.inputs_list.currentRow()
-            if row >= 0:
-                self.selected_node.inputs.pop(row)
-                self.inputs_list.takeItem(row)
-                self.selected_node.update()
-
-    def del_output(self):
-        if self.selected_node:
-            row = self.outputs_list.currentRow()
-            if row >= 0:
-                self.selected_node.outputs.pop(row)
-                self.outputs_list.takeItem(row)
-                self.selected_node.update()
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()
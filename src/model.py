@@ -0,0 +1,335 @@
+# Modelo de grafo puro-Python (sem Qt).
+# NodeItem/ConnectionItem são apenas visões destes dados, então projetos podem
+# ser carregados, consultados e salvos sem criar nenhum QGraphicsItem.
+import functools
+import gc
+import json
+import os
+
+# Campos de NodeData que são listas de strings
+LIST_FIELDS = ("inputs", "outputs", "properties", "methods")
+
+
+def discard_pin(pins, index, key):
+    # Remove key do conjunto do pino index, apagando conjuntos vazios.
+    # Usado pela adjacência do modelo e pelas conexões de NodeItem
+    if pins is None:
+        return
+    bucket = pins.get(index)
+    if bucket is not None:
+        bucket.pop(key, None)
+        if not bucket:
+            del pins[index]
+
+
+def without_gc(function):
+    # Construção em lote: centenas de milhares de objetos novos disparariam
+    # o GC cíclico repetidamente sem encontrar nada para coletar
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if gc_enabled:
+                gc.enable()
+    return wrapper
+
+
+def write_file_atomic(path, data):
+    # Grava em path + ".tmp" e só então troca pelo destino: um erro no meio
+    # nunca deixa o arquivo existente truncado
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class NodeData:
+    __slots__ = ("id", "title", "inputs", "outputs", "description", "properties", "methods", "x", "y")
+
+    def __init__(self, node_id=None, title="Node", inputs=None, outputs=None, description="",
+                 properties=None, methods=None, x=0.0, y=0.0):
+        self.id = node_id
+        self.title = title
+        self.inputs = inputs if inputs is not None else []
+        self.outputs = outputs if outputs is not None else []
+        self.description = description
+        self.properties = properties if properties is not None else []
+        self.methods = methods if methods is not None else []
+        self.x = float(x)
+        self.y = float(y)
+
+    def copy(self):
+        return NodeData(self.id, self.title, list(self.inputs), list(self.outputs), self.description,
+                        list(self.properties), list(self.methods), self.x, self.y)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "inputs": list(self.inputs),
+            "outputs": list(self.outputs),
+            "description": self.description,
+            "properties": list(self.properties),
+            "methods": list(self.methods),
+            "pos": [self.x, self.y]
+        }
+
+
+class EdgeData:
+    __slots__ = ("id", "from_node", "from_idx", "to_node", "to_idx")
+
+    def __init__(self, edge_id, from_node, from_idx, to_node, to_idx):
+        self.id = edge_id
+        self.from_node = from_node
+        self.from_idx = from_idx
+        self.to_node = to_node
+        self.to_idx = to_idx
+
+
+class GraphModel:
+    def __init__(self):
+        # Tabelas indexadas por id (dict preserva a ordem de inserção)
+        self.nodes = {}
+        self.edges = {}
+        # Adjacência por pino: node_id -> {índice do pino: {edge_id: None}}
+        # (conjuntos ordenados), para achar/remover arestas de um pino em O(1).
+        # None enquanto não foi montada (ver from_tables e _ensure_adjacency)
+        self._adjacency = ({}, {})
+        self._next_node_id = 0
+        self._next_edge_id = 0
+
+    @property
+    def _out(self):
+        return (self._adjacency or self._ensure_adjacency())[0]
+
+    @property
+    def _in(self):
+        return (self._adjacency or self._ensure_adjacency())[1]
+
+    @without_gc
+    def _ensure_adjacency(self):
+        # Montada na primeira consulta: uma carga que só converte ou salva
+        # (cli convert, snapshot do autosave/saver) nunca paga por ela
+        out = {node_id: {} for node_id in self.nodes}
+        into = {node_id: {} for node_id in self.nodes}
+        for edge_id, edge in self.edges.items():
+            pins = out[edge.from_node]
+            bucket = pins.get(edge.from_idx)
+            if bucket is None:
+                bucket = pins[edge.from_idx] = {}
+            bucket[edge_id] = None
+            pins = into[edge.to_node]
+            bucket = pins.get(edge.to_idx)
+            if bucket is None:
+                bucket = pins[edge.to_idx] = {}
+            bucket[edge_id] = None
+        self._adjacency = (out, into)
+        return self._adjacency
+
+    def clear(self):
+        self.nodes.clear()
+        self.edges.clear()
+        self._adjacency = ({}, {})
+        self._next_node_id = 0
+        self._next_edge_id = 0
+
+    def add_node(self, title="Node", inputs=None, outputs=None, description="",
+                 properties=None, methods=None, x=0.0, y=0.0, node_id=None):
+        if node_id is None:
+            node_id = self._next_node_id
+        elif node_id in self.nodes:
+            raise ValueError(f"Node {node_id} já existe")
+        self._next_node_id = max(self._next_node_id, node_id + 1)
+        node = NodeData(node_id, title, inputs, outputs, description, properties, methods, x, y)
+        self.nodes[node_id] = node
+        self._out[node_id] = {}
+        self._in[node_id] = {}
+        return node
+
+    def remove_node(self, node_id):
+        # Remove o node e todas as arestas ligadas a ele; retorna as arestas removidas
+        removed = self.out_edges(node_id) + self.in_edges(node_id)
+        for edge in removed:
+            self.remove_edge(edge.id)
+        del self._out[node_id]
+        del self._in[node_id]
+        return self.nodes.pop(node_id), removed
+
+    def add_edge(self, from_node, from_idx, to_node, to_idx, edge_id=None):
+        if from_node not in self.nodes or to_node not in self.nodes:
+            raise KeyError(f"Conexão {from_node} -> {to_node} referencia node inexistente")
+        if edge_id is None:
+            edge_id = self._next_edge_id
+        elif edge_id in self.edges:
+            raise ValueError(f"Conexão {edge_id} já existe")
+        self._next_edge_id = max(self._next_edge_id, edge_id + 1)
+        edge = EdgeData(edge_id, from_node, from_idx, to_node, to_idx)
+        self.edges[edge_id] = edge
+        self._out[from_node].setdefault(from_idx, {})[edge_id] = None
+        self._in[to_node].setdefault(to_idx, {})[edge_id] = None
+        return edge
+
+    def remove_edge(self, edge_id):
+        edge = self.edges.pop(edge_id)
+        # Um node pode já ter sido removido em operações em lote
+        discard_pin(self._out.get(edge.from_node), edge.from_idx, edge_id)
+        discard_pin(self._in.get(edge.to_node), edge.to_idx, edge_id)
+        return edge
+
+    def out_edges(self, node_id):
+        return [self.edges[e] for pin in self._out[node_id].values() for e in pin]
+
+    def in_edges(self, node_id):
+        return [self.edges[e] for pin in self._in[node_id].values() for e in pin]
+
+    def pin_edges(self, node_id, field, index):
+        # Arestas ligadas a um pino; field é "inputs" ou "outputs"
+        adjacency = self._in if field == "inputs" else self._out
+        return [self.edges[e] for e in adjacency[node_id].get(index, ())]
+
+    def successors(self, node_id):
+        return [edge.to_node for edge in self.out_edges(node_id)]
+
+    def predecessors(self, node_id):
+        return [edge.from_node for edge in self.in_edges(node_id)]
+
+    def insert_pin(self, node_id, field, index, name):
+        # Insere um pino e desloca as arestas dos pinos seguintes
+        getattr(self.nodes[node_id], field).insert(index, name)
+        pins = (self._in if field == "inputs" else self._out)[node_id]
+        for idx in sorted((i for i in pins if i >= index), reverse=True):
+            self._move_pin(pins, field, idx, idx + 1)
+
+    def remove_pin(self, node_id, field, index):
+        # Remove um pino com as arestas ligadas a ele e renumera as arestas
+        # dos pinos seguintes; retorna as arestas removidas
+        removed = self.pin_edges(node_id, field, index)
+        for edge in removed:
+            self.remove_edge(edge.id)
+        getattr(self.nodes[node_id], field).pop(index)
+        pins = (self._in if field == "inputs" else self._out)[node_id]
+        for idx in sorted(i for i in pins if i > index):
+            self._move_pin(pins, field, idx, idx - 1)
+        return removed
+
+    def _move_pin(self, pins, field, old_idx, new_idx):
+        bucket = pins.pop(old_idx)
+        pins[new_idx] = bucket
+        for edge_id in bucket:
+            if field == "inputs":
+                self.edges[edge_id].to_idx = new_idx
+            else:
+                self.edges[edge_id].from_idx = new_idx
+
+    def snapshot(self):
+        # Cópia independente (listas inclusive) para salvar em outra thread
+        # enquanto a edição continua no modelo original
+        nodes = [node.copy() for node in self.nodes.values()]
+        edges = [(e.id, e.from_node, e.from_idx, e.to_node, e.to_idx) for e in self.edges.values()]
+        copy = GraphModel.from_tables(nodes, edges)
+        copy.reserve_ids(self.next_ids())
+        return copy
+
+    # Próximos ids livres. São salvos junto com o projeto: ids de nodes e
+    # conexões apagados nunca voltam a ser usados, e o id continua sendo uma
+    # identidade estável entre versões do arquivo (ver diff.py)
+    def next_ids(self):
+        return {"node": self._next_node_id, "edge": self._next_edge_id}
+
+    def reserve_ids(self, next_ids):
+        if next_ids:
+            self._next_node_id = max(self._next_node_id, next_ids.get("node", 0))
+            self._next_edge_id = max(self._next_edge_id, next_ids.get("edge", 0))
+
+    # Serialização no esquema JSON de MainWindow.save_project. Nodes e conexões
+    # levam "id" estável; from_node/to_node continuam sendo posições na lista.
+    def to_dict(self):
+        index_map = {}
+        nodes = []
+        for idx, node in enumerate(self.nodes.values()):
+            index_map[node.id] = idx
+            nodes.append(node.to_dict())
+        connections = []
+        for edge in self.edges.values():
+            connections.append({
+                "id": edge.id,
+                "from_node": index_map[edge.from_node],
+                "from_idx": edge.from_idx,
+                "to_node": index_map[edge.to_node],
+                "to_idx": edge.to_idx
+            })
+        return {"nodes": nodes, "connections": connections, "next_ids": self.next_ids()}
+
+    def add_node_from_dict(self, node_data):
+        pos = node_data.get("pos", [0, 0])
+        return self.add_node(
+            title=node_data.get("title", "Node"),
+            inputs=node_data.get("inputs", []),
+            outputs=node_data.get("outputs", []),
+            description=node_data.get("description", ""),
+            properties=node_data.get("properties", []),
+            methods=node_data.get("methods", []),
+            x=pos[0],
+            y=pos[1],
+            node_id=node_data.get("id")
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        model = cls()
+        ids = []
+        for node_data in data.get("nodes", []):
+            ids.append(model.add_node_from_dict(node_data).id)
+        for conn in data.get("connections", []):
+            model.add_edge(ids[conn["from_node"]], conn["from_idx"], ids[conn["to_node"]], conn["to_idx"], conn.get("id"))
+        model.reserve_ids(data.get("next_ids"))
+        return model
+
+    @classmethod
+    def from_tables(cls, nodes, edges):
+        # Carga em lote: nodes são NodeData com ids únicos; arestas são tuplas
+        # (edge_id, from_node, from_idx, to_node, to_idx) usando esses ids
+        model = cls()
+        model.nodes = {node.id: node for node in nodes}
+        if len(model.nodes) != len(nodes):
+            raise ValueError("Ids de node repetidos")
+        model.edges = {edge[0]: EdgeData(*edge) for edge in edges}
+        if len(model.edges) != len(edges):
+            raise ValueError("Ids de conexão repetidos")
+        # A adjacência fica para a primeira consulta; as pontas são
+        # conferidas já, para um arquivo corrompido falhar na carga
+        ends = {edge.from_node for edge in model.edges.values()}
+        ends.update(edge.to_node for edge in model.edges.values())
+        if not ends <= model.nodes.keys():
+            raise KeyError(f"Conexão referencia node inexistente: {min(ends - model.nodes.keys())}")
+        model._adjacency = None
+        model._next_node_id = max(model.nodes, default=-1) + 1
+        model._next_edge_id = max(model.edges, default=-1) + 1
+        return model
+
+    # Arquivos .llb usam o formato binário (binformat); o resto é JSON
+    @classmethod
+    def load(cls, path):
+        from . import binformat
+        if path.endswith(binformat.EXTENSION):
+            return binformat.load_model(path)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path, compress=False):
+        from . import binformat
+        if path.endswith(binformat.EXTENSION):
+            binformat.save_model(self, path, compress)
+            return
+        # Serializado antes de abrir o arquivo (ver write_file_atomic)
+        write_file_atomic(path, json.dumps(self.to_dict(), indent=2).encode("utf-8"))
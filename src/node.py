@@ -1,103 +1,349 @@
 from PyQt5.QtWidgets import QGraphicsItem
-from PyQt5.QtGui import QBrush, QPen, QColor, QFont
+from PyQt5.QtGui import QBrush, QPen, QColor, QFont, QFontMetricsF, QStaticText, QTransform
 from PyQt5.QtCore import QRectF, Qt, QPointF
+from .model import NodeData, discard_pin
+from .lod import LOD, FULL
+from .connection import path_updates
+from .profiler import profiler
+from .scene import WorkspaceScene
+
+class NodeStyle:
+    # Objetos de estilo compartilhados por todos os nodes. Criados na primeira
+    # pintura, pois QFont/QFontMetrics exigem uma QApplication.
+    _instance = None
+
+    def __init__(self):
+        self.body_brush = QBrush(QColor(220, 220, 235))
+        self.body_pen = QPen(Qt.black, 2)
+        self.simple_pen = QPen(Qt.black, 0)  # cosmética: 1px em qualquer zoom
+        self.text_pen = QPen(Qt.black)
+        self.input_brush = QBrush(QColor(30, 100, 180))
+        self.input_pen = QPen(QColor(30, 100, 180))
+        self.output_brush = QBrush(QColor(180, 100, 30))
+        self.output_pen = QPen(QColor(180, 100, 30))
+        self.desc_pen = QPen(Qt.darkGray)
+        self.highlight_pen = QPen(QColor(230, 140, 0), 4)
+        # Comparação com outra versão do projeto (ver diff.py)
+        self.diff_pens = {
+            "added": QPen(QColor(40, 160, 60), 4),
+            "changed": QPen(QColor(40, 100, 220), 4),
+            "moved": QPen(QColor(150, 150, 150), 3, Qt.DashLine),
+        }
+        self.title_font = QFont("Arial", 12, QFont.Bold)
+        self.pin_font = QFont("Arial", 9)
+        self.desc_font = QFont("Arial", 8)
+        # drawStaticText posiciona pelo topo; o layout original usa a linha de base
+        self.title_ascent = QFontMetricsF(self.title_font).ascent()
+        self.pin_ascent = QFontMetricsF(self.pin_font).ascent()
+        self.desc_metrics = QFontMetricsF(self.desc_font)
+
+    @classmethod
+    def get(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
 
 class NodeItem(QGraphicsItem):
     WIDTH = 180
     HEIGHT = 100
+    # Cache de pixmap em coordenadas de dispositivo (desative para depurar pintura)
+    DEVICE_CACHE = True
+    # Ids dos nodes destacados (resultados da busca)
+    highlighted = set()
+    # node_id -> "added" | "changed" | "moved" (comparação com outro projeto)
+    diff_marks = {}
+    # Geometria dos pinos: centro do pino i em (PIN_MARGIN, PIN_TOP + i*PIN_SPACING)
+    PIN_MARGIN = 8
+    PIN_TOP = 41
+    PIN_SPACING = 18
 
-    def __init__(self, title="Node", inputs=None, outputs=None, description="", properties=None, methods=None):
+    def __init__(self, title="Node", inputs=None, outputs=None, description="", properties=None, methods=None, node_data=None):
         super().__init__()
-        self.title = title
-        self.inputs = inputs if inputs is not None else []
-        self.outputs = outputs if outputs is not None else []
-        self.description = description
-        self.properties = properties if properties is not None else []
-        self.methods = methods if methods is not None else []
+        # O NodeItem é apenas uma visão do NodeData (modelo sem Qt)
+        if node_data is None:
+            node_data = NodeData(None, title, inputs, outputs, description, properties, methods)
+        self.node_data = node_data
+        self.setPos(node_data.x, node_data.y)
         self.setFlags(
             QGraphicsItem.ItemIsMovable |
             QGraphicsItem.ItemIsSelectable |
             QGraphicsItem.ItemSendsGeometryChanges
         )
-        self.input_pins = []
-        self.output_pins = []
-        self.output_connections = []
-        self.input_connections = []
+        # Pinos calculados a partir do modelo (não dependem de paint)
+        self._input_pins = []
+        self._output_pins = []
+        self._pin_counts = None
+        # Conexões por pino: índice -> {conexão: None} (conjunto ordenado)
+        self._output_conns = {}
+        self._input_conns = {}
+        # Layout em cache (textos elididos e pinos), refeito só após edições
+        self._layout_valid = False
+        self.set_device_cache(NodeItem.DEVICE_CACHE)
+
+    def bind(self, node_data):
+        # Reaproveita o item (fora da cena) para outro node; usado pelo pool
+        # da cena virtualizada
+        self.node_data = node_data
+        self._pin_counts = None
+        self._output_conns = {}
+        self._input_conns = {}
+        self._layout_valid = False
+        self.set_device_cache(NodeItem.DEVICE_CACHE)
+        self.setPos(node_data.x, node_data.y)
+        self.update()
+
+    @classmethod
+    def data_pin_pos(cls, node_data, pin_type, idx):
+        # Posição de cena de um pino calculada só pelos dados, sem item
+        count = len(node_data.inputs if pin_type == "input" else node_data.outputs)
+        if not 0 <= idx < count:
+            return QPointF(node_data.x + cls.WIDTH/2, node_data.y + cls.HEIGHT/2)
+        x = cls.PIN_MARGIN if pin_type == "input" else cls.WIDTH - cls.PIN_MARGIN
+        return QPointF(node_data.x + x, node_data.y + cls.PIN_TOP + idx*cls.PIN_SPACING)
+
+    @property
+    def node_id(self):
+        return self.node_data.id
+
+    @property
+    def title(self):
+        return self.node_data.title
+
+    @title.setter
+    def title(self, value):
+        self.node_data.title = value
+        self._layout_valid = False
+
+    @property
+    def inputs(self):
+        return self.node_data.inputs
+
+    @inputs.setter
+    def inputs(self, value):
+        self.node_data.inputs = value
+        self._layout_valid = False
+
+    @property
+    def outputs(self):
+        return self.node_data.outputs
+
+    @outputs.setter
+    def outputs(self, value):
+        self.node_data.outputs = value
+        self._layout_valid = False
+
+    @property
+    def description(self):
+        return self.node_data.description
+
+    @description.setter
+    def description(self, value):
+        self.node_data.description = value
+        self._layout_valid = False
+
+    @property
+    def properties(self):
+        return self.node_data.properties
+
+    @properties.setter
+    def properties(self, value):
+        self.node_data.properties = value
+
+    @property
+    def methods(self):
+        return self.node_data.methods
+
+    @methods.setter
+    def methods(self, value):
+        self.node_data.methods = value
+
+    @property
+    def input_pins(self):
+        self._ensure_pins()
+        return self._input_pins
+
+    @property
+    def output_pins(self):
+        self._ensure_pins()
+        return self._output_pins
+
+    def _ensure_pins(self):
+        # A posição dos pinos depende só da quantidade de entradas/saídas,
+        # então o cache se valida sozinho mesmo após edições no lugar
+        counts = (len(self.inputs), len(self.outputs))
+        if counts == self._pin_counts:
+            return
+        self._input_pins = [QPointF(self.PIN_MARGIN, self.PIN_TOP + i*self.PIN_SPACING) for i in range(counts[0])]
+        self._output_pins = [QPointF(self.WIDTH - self.PIN_MARGIN, self.PIN_TOP + i*self.PIN_SPACING) for i in range(counts[1])]
+        self._pin_counts = counts
 
     def boundingRect(self):
         return QRectF(0, 0, self.WIDTH, self.HEIGHT)
 
+    def invalidate(self):
+        # Descarta os textos em cache; chamar após editar o node no lugar
+        # (ex.: inputs.append) antes de repintar
+        self._layout_valid = False
+        if self._pin_counts != (len(self.inputs), len(self.outputs)):
+            # Quantidade de pinos mudou: refaz a geometria das conexões do node
+            for pins in (self._output_conns, self._input_conns):
+                for bucket in pins.values():
+                    for conn in bucket:
+                        conn.update_path()
+            self._update_pin_index()
+        self.update()
+
+    def set_device_cache(self, enabled):
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache if enabled else QGraphicsItem.NoCache)
+
+    def _ensure_layout(self):
+        if self._layout_valid:
+            return
+        style = NodeStyle.get()
+        self._title_text = QStaticText(self.title)
+        self._title_text.prepare(QTransform(), style.title_font)
+
+        # Nomes dos pinos: linha de base 4px abaixo do centro do pino
+        self._input_labels = []
+        for inp, pin_center in zip(self.inputs, self.input_pins):
+            text = QStaticText(inp)
+            text.prepare(QTransform(), style.pin_font)
+            self._input_labels.append((QPointF(20, pin_center.y() + 4 - style.pin_ascent), text))
+
+        self._output_labels = []
+        for out, pin_center in zip(self.outputs, self.output_pins):
+            text = QStaticText(out)
+            text.prepare(QTransform(), style.pin_font)
+            self._output_labels.append((QPointF(self.WIDTH - 70, pin_center.y() + 4 - style.pin_ascent), text))
+
+        self._desc_text = None
+        if self.description:
+            desc_rect = QRectF(10, self.HEIGHT - 25, self.WIDTH - 20, 18)
+            elided_desc = style.desc_metrics.elidedText(self.description, Qt.ElideRight, int(desc_rect.width()))
+            self._desc_text = QStaticText(elided_desc)
+            self._desc_text.prepare(QTransform(), style.desc_font)
+            self._desc_pos = QPointF(desc_rect.left(), desc_rect.center().y() - style.desc_metrics.height() / 2)
+        self._layout_valid = True
+
+    def _outline_pen(self, style, default):
+        # Resultado de busca tem prioridade sobre a marca da comparação
+        node_id = self.node_data.id
+        if node_id in NodeItem.highlighted:
+            return style.highlight_pen
+        mark = NodeItem.diff_marks.get(node_id)
+        return style.diff_pens[mark] if mark is not None else default
+
     def paint(self, painter, option, widget):
+        if profiler.enabled:
+            profiler.node_paints += 1
+        style = NodeStyle.get()
+        # Com zoom baixo o node vira só um retângulo, sem texto nem pinos
+        if LOD.level(option.levelOfDetailFromTransform(painter.worldTransform())) != FULL:
+            painter.setBrush(style.body_brush)
+            painter.setPen(self._outline_pen(style, style.simple_pen))
+            painter.drawRoundedRect(self.boundingRect(), 8, 8)
+            return
+        self._ensure_layout()
+
         # Corpo do node
-        rect = self.boundingRect()
-        painter.setBrush(QBrush(QColor(220, 220, 235)))
-        painter.setPen(QPen(Qt.black, 2))
-        painter.drawRoundedRect(rect, 8, 8)
+        painter.setBrush(style.body_brush)
+        painter.setPen(self._outline_pen(style, style.body_pen))
+        painter.drawRoundedRect(self.boundingRect(), 8, 8)
 
         # Título
-        painter.setFont(QFont("Arial", 12, QFont.Bold))
-        painter.setPen(Qt.black)
-        painter.drawText(10, 25, self.title)
-
-        # Inputs (círculos à esquerda)
-        self.input_pins = []
-        painter.setFont(QFont("Arial", 9))
-        for i, inp in enumerate(self.inputs):
-            y = 45 + i*18
-            pin_center = QPointF(8, y - 4)
-            self.input_pins.append(pin_center)
-            # Círculo azul
-            painter.setBrush(QColor(30, 100, 180))
-            painter.setPen(Qt.black)
+        painter.setFont(style.title_font)
+        painter.setPen(style.text_pen)
+        painter.drawStaticText(QPointF(10, 25 - style.title_ascent), self._title_text)
+
+        # Inputs (círculos azuis à esquerda) e outputs (laranjas à direita)
+        painter.setPen(style.text_pen)
+        painter.setBrush(style.input_brush)
+        for pin_center in self.input_pins:
             painter.drawEllipse(pin_center, 6, 6)
-            # Nome
-            painter.setPen(QColor(30, 100, 180))
-            painter.setBrush(Qt.NoBrush)
-            painter.drawText(20, y, inp)
-
-        # Outputs (círculos à direita)
-        self.output_pins = []
-        for i, out in enumerate(self.outputs):
-            y = 45 + i*18
-            pin_center = QPointF(self.WIDTH - 8, y - 4)
-            self.output_pins.append(pin_center)
-            # Círculo laranja
-            painter.setBrush(QColor(180, 100, 30))
-            painter.setPen(Qt.black)
+        painter.setBrush(style.output_brush)
+        for pin_center in self.output_pins:
             painter.drawEllipse(pin_center, 6, 6)
-            # Nome
-            painter.setPen(QColor(180, 100, 30))
-            painter.setBrush(Qt.NoBrush)
-            painter.drawText(self.WIDTH - 70, y, out)
+
+        # Nomes dos pinos
+        painter.setFont(style.pin_font)
+        painter.setPen(style.input_pen)
+        for pos, text in self._input_labels:
+            painter.drawStaticText(pos, text)
+        painter.setPen(style.output_pen)
+        for pos, text in self._output_labels:
+            painter.drawStaticText(pos, text)
 
         # Descrição (opcional, pequena)
-        if self.description:
-            painter.setPen(Qt.darkGray)
-            painter.setFont(QFont("Arial", 8))
-            desc_rect = QRectF(10, self.HEIGHT - 25, self.WIDTH - 20, 18)
-            metrics = painter.fontMetrics()
-            elided_desc = metrics.elidedText(self.description, Qt.ElideRight, int(desc_rect.width()))
-            painter.drawText(desc_rect, Qt.AlignLeft | Qt.AlignVCenter, elided_desc)
+        if self._desc_text is not None:
+            painter.setFont(style.desc_font)
+            painter.setPen(style.desc_pen)
+            painter.drawStaticText(self._desc_pos, self._desc_text)
+
+    @property
+    def output_connections(self):
+        return [conn for bucket in self._output_conns.values() for conn in bucket]
+
+    @property
+    def input_connections(self):
+        return [conn for bucket in self._input_conns.values() for conn in bucket]
+
+    def pin_connections(self, pin_type, idx):
+        pins = self._input_conns if pin_type == "input" else self._output_conns
+        return list(pins.get(idx, ()))
+
     def add_output_connection(self, conn):
-        self.output_connections.append(conn)
+        self._output_conns.setdefault(conn.idx_from, {})[conn] = None
 
     def add_input_connection(self, conn):
-        self.input_connections.append(conn)
+        self._input_conns.setdefault(conn.idx_to, {})[conn] = None
 
     def remove_output_connection(self, conn):
-        if conn in self.output_connections:
-            self.output_connections.remove(conn)
+        discard_pin(self._output_conns, conn.idx_from, conn)
 
     def remove_input_connection(self, conn):
-        if conn in self.input_connections:
-            self.input_connections.remove(conn)
+        discard_pin(self._input_conns, conn.idx_to, conn)
+
+    def shift_pin_connections(self, pin_type, idx, delta):
+        # Renumera as conexões dos pinos a partir de idx (após inserir/remover
+        # um pino); as conexões do pino removido já devem ter sido retiradas
+        pins = self._input_conns if pin_type == "input" else self._output_conns
+        moved = sorted((i for i in pins if i >= idx), reverse=delta > 0)
+        for old_idx in moved:
+            bucket = pins.pop(old_idx)
+            pins[old_idx + delta] = bucket
+            for conn in bucket:
+                if pin_type == "input":
+                    conn.idx_to = old_idx + delta
+                else:
+                    conn.idx_from = old_idx + delta
 
     def itemChange(self, change, value):
-        if change == QGraphicsItem.ItemPositionChange:
-            for conn in self.output_connections + self.input_connections:
-                conn.update_path()
+        if change == QGraphicsItem.ItemPositionHasChanged:
+            # Mantém o modelo sincronizado com a posição na cena
+            self.node_data.x = value.x()
+            self.node_data.y = value.y()
+            if profiler.enabled:
+                profiler.item_moved(self)
+            # Caminhos das conexões são refeitos em lote, uma vez por frame
+            for bucket in self._output_conns.values():
+                path_updates.mark_dirty(bucket)
+            for bucket in self._input_conns.values():
+                path_updates.mark_dirty(bucket)
+            self._update_pin_index()
+        elif change == QGraphicsItem.ItemSceneChange:
+            old_scene = self.scene()
+            if isinstance(old_scene, WorkspaceScene):
+                old_scene.pin_index.remove_node(self)
+        elif change == QGraphicsItem.ItemSceneHasChanged:
+            self._update_pin_index()
         return super().itemChange(change, value)
 
+    def _update_pin_index(self):
+        scene = self.scene()
+        if isinstance(scene, WorkspaceScene):
+            scene.pin_index.update_node(self)
+
     def get_input_pin_scene_pos(self, idx):
         if 0 <= idx < len(self.input_pins):
             return self.mapToScene(self.input_pins[idx])
@@ -117,4 +363,4 @@ class NodeItem(QGraphicsItem):
             # Aumenta o raio de detecção para facilitar o clique
             if (pin_center - pos).manhattanLength() <= 16:
                 return idx
-        return None
\ No newline at end of file
+        return None
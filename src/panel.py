@@ -0,0 +1,149 @@
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, pyqtSignal
+from PyQt5.QtWidgets import (
+    QAbstractItemView, QComboBox, QHBoxLayout, QLabel, QLineEdit, QListView, QPushButton, QVBoxLayout, QWidget
+)
+
+
+class StringListModel(QAbstractListModel):
+    # Visão de uma lista de strings do NodeData, sem cópia: a view só consulta
+    # as linhas visíveis, então trocar de node é um reset barato. Edições não
+    # alteram a lista aqui; saem pelo sinal edited para passar pelo histórico.
+    edited = pyqtSignal(int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._values = []
+
+    def set_values(self, values):
+        self.beginResetModel()
+        self._values = values
+        self.endResetModel()
+
+    def refresh(self):
+        # A lista mudou de tamanho (item inserido/removido)
+        self.set_values(self._values)
+
+    def row_changed(self, row):
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._values)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.EditRole):
+            return self._values[index.row()]
+        return None
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        if value != self._values[index.row()]:
+            self.edited.emit(index.row(), value)
+        return True
+
+
+class BatchEditPanel(QWidget):
+    # Painel para vários nodes selecionados: cada ação vale para todos eles
+    # e vira uma única entrada no histórico (ver MainWindow.edit_ops)
+    title_requested = pyqtSignal(str)
+    item_requested = pyqtSignal(str, str, str)  # ("insert"/"remove", campo, nome)
+
+    FIELDS = [("Entradas", "inputs"), ("Saídas", "outputs"), ("Propriedades", "properties"), ("Métodos", "methods")]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.count_label = QLabel()
+        self.title_pattern = QLineEdit("{title}")
+        self.title_pattern.setToolTip("{title}: título atual; {n}: posição na seleção (1, 2, ...)")
+        self.title_btn = QPushButton("Aplicar Título")
+        self.field_combo = QComboBox()
+        for label, field in self.FIELDS:
+            self.field_combo.addItem(label, field)
+        self.name_edit = QLineEdit()
+        self.name_edit.setPlaceholderText("Nome")
+        self.add_btn = QPushButton("Adicionar a Todos")
+        self.del_btn = QPushButton("Remover de Todos")
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.count_label)
+        layout.addWidget(QLabel("Título:"))
+        layout.addWidget(self.title_pattern)
+        layout.addWidget(self.title_btn)
+        layout.addWidget(QLabel("Itens:"))
+        layout.addWidget(self.field_combo)
+        layout.addWidget(self.name_edit)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.add_btn)
+        buttons.addWidget(self.del_btn)
+        layout.addLayout(buttons)
+        layout.addStretch()
+
+        self.title_btn.clicked.connect(lambda: self.title_requested.emit(self.title_pattern.text()))
+        self.add_btn.clicked.connect(lambda: self._request_item("insert"))
+        self.del_btn.clicked.connect(lambda: self._request_item("remove"))
+
+    def set_count(self, count):
+        self.count_label.setText(f"{count} nodes selecionados")
+
+    def _request_item(self, action):
+        name = self.name_edit.text()
+        if name:
+            self.item_requested.emit(action, self.field_combo.currentData(), name)
+
+
+class SearchPanel(QWidget):
+    # Campo de busca e lista de resultados; quem busca é a MainWindow (ver
+    # search.SearchIndex). node_activated leva o id do node escolhido.
+    query_changed = pyqtSignal(str)
+    node_activated = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("Título, pino, propriedade, método...")
+        self.query_edit.setClearButtonEnabled(True)
+        self.status_label = QLabel()
+        self.results_model = StringListModel(self)
+        self.results_view = QListView()
+        self.results_view.setModel(self.results_model)
+        self.results_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.results_view.setUniformItemSizes(True)
+        self._node_ids = []
+        # Busca ao parar de digitar (não a cada tecla)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(120)
+        self._timer.timeout.connect(lambda: self.query_changed.emit(self.query_edit.text()))
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.query_edit)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.results_view)
+
+        self.query_edit.textChanged.connect(self._timer.start)
+        self.query_edit.returnPressed.connect(self._activate_first)
+        self.results_view.activated.connect(lambda index: self.node_activated.emit(self._node_ids[index.row()]))
+        self.results_view.clicked.connect(lambda index: self.node_activated.emit(self._node_ids[index.row()]))
+
+    def set_results(self, query, results, elapsed_ms):
+        # results: [(node_id, título)]
+        self._node_ids = [node_id for node_id, _ in results]
+        self.results_model.set_values([f"{title}  (#{node_id})" for node_id, title in results])
+        if query.strip():
+            self.status_label.setText(f"{len(results)} resultados ({elapsed_ms:.1f} ms)")
+        else:
+            self.status_label.clear()
+
+    def focus_query(self):
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+
+    def _activate_first(self):
+        self._timer.stop()
+        self.query_changed.emit(self.query_edit.text())
+        if self._node_ids:
+            self.node_activated.emit(self._node_ids[0])
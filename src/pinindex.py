@@ -0,0 +1,64 @@
+# Índice espacial (grade uniforme) dos centros de pinos em coordenadas de cena.
+# Responde "pino compatível mais próximo dentro de um raio" olhando apenas as
+# células vizinhas, independente da ordem de empilhamento dos itens.
+import math
+
+
+class PinIndex:
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self._cells = {}    # (cx, cy) -> {entrada: None}
+        self._entries = {}  # node -> [(célula, entrada)]
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def clear(self):
+        self._cells.clear()
+        self._entries.clear()
+
+    def update_node(self, node):
+        # Reinsere todos os pinos do node (chamado quando ele move ou muda de pinos)
+        self.remove_node(node)
+        origin = node.scenePos()
+        ox, oy = origin.x(), origin.y()
+        placed = []
+        for pin_type, pins in (("input", node.input_pins), ("output", node.output_pins)):
+            for idx, pin in enumerate(pins):
+                x = ox + pin.x()
+                y = oy + pin.y()
+                entry = (x, y, node, pin_type, idx)
+                cell = self._cell(x, y)
+                self._cells.setdefault(cell, {})[entry] = None
+                placed.append((cell, entry))
+        self._entries[node] = placed
+
+    def remove_node(self, node):
+        for cell, entry in self._entries.pop(node, ()):
+            bucket = self._cells[cell]
+            del bucket[entry]
+            if not bucket:
+                del self._cells[cell]
+
+    def nearest(self, pos, pin_type, radius, exclude=None):
+        # Retorna (node, idx) do pino mais próximo de pos, ou None
+        x, y = pos.x(), pos.y()
+        cx0, cy0 = self._cell(x - radius, y - radius)
+        cx1, cy1 = self._cell(x + radius, y + radius)
+        best = None
+        best_d2 = radius * radius
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self._cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for entry in bucket:
+                    if entry[3] != pin_type or entry[2] is exclude:
+                        continue
+                    d2 = (entry[0] - x) ** 2 + (entry[1] - y) ** 2
+                    if d2 <= best_d2:
+                        best = entry
+                        best_d2 = d2
+        if best is None:
+            return None
+        return best[2], best[4]
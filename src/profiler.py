@@ -0,0 +1,111 @@
+# Instrumentação por frame da WorkspaceView.
+#
+# Desligada, cada ponto instrumentado custa só um `if profiler.enabled`, então
+# pode ficar sempre no código. Ligada, os contadores acumulam entre dois
+# paintEvent da view e cada frame vira um registro num histórico circular
+# (exportável em JSON).
+import json
+import time
+from collections import deque
+from PyQt5.QtWidgets import QGraphicsScene
+
+
+class _NullSection:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Section:
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        profiler = self._profiler
+        calls, ms = profiler.sections.get(self._name, (0, 0.0))
+        profiler.sections[self._name] = (calls + 1, ms + (time.perf_counter() - self._start) * 1000)
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class FrameProfiler:
+    # Contadores por frame (atributos simples: são incrementados nos caminhos quentes)
+    COUNTERS = ("node_paints", "path_rebuilds", "index_updates")
+
+    def __init__(self, history=900):
+        self.enabled = False
+        self.frames = deque(maxlen=history)
+        self._reset_counters()
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self.frames.clear()
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.node_paints = 0
+        self.path_rebuilds = 0
+        self.index_updates = 0
+        self.sections = {}  # nome -> (chamadas, ms), ex.: "selection"
+
+    def section(self, name):
+        # with profiler.section("selection"): ...
+        if not self.enabled:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def item_moved(self, item):
+        # Item com geometria nova numa cena com BSP = uma atualização do índice
+        scene = item.scene()
+        if scene is not None and scene.itemIndexMethod() == QGraphicsScene.BspTreeIndex:
+            self.index_updates += 1
+
+    def path_rebuilt(self, connection):
+        self.path_rebuilds += 1
+        self.item_moved(connection)
+
+    def end_frame(self, paint_ms):
+        frame = {"time": time.time(), "paint_ms": paint_ms}
+        for name in self.COUNTERS:
+            frame[name] = getattr(self, name)
+        for name, (calls, ms) in self.sections.items():
+            frame[name] = calls
+            frame[name + "_ms"] = ms
+        self.frames.append(frame)
+        self._reset_counters()
+
+    def summary(self, seconds=1.0):
+        # Médias dos frames do último segundo (para o overlay)
+        if not self.frames:
+            return None
+        now = time.time()
+        recent = [f for f in self.frames if now - f["time"] <= seconds] or [self.frames[-1]]
+        count = len(recent)
+        result = {
+            "frames": count,
+            "paint_ms": sum(f["paint_ms"] for f in recent) / count,
+            "paint_max_ms": max(f["paint_ms"] for f in recent),
+        }
+        for name in self.COUNTERS:
+            result[name] = sum(f[name] for f in recent) / count
+        result["selection"] = sum(f.get("selection", 0) for f in recent)
+        result["selection_ms"] = sum(f.get("selection_ms", 0.0) for f in recent)
+        return result
+
+    def export(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"frames": list(self.frames)}, f, indent=1)
+
+
+profiler = FrameProfiler()
@@ -0,0 +1,70 @@
+from PyQt5.QtCore import QObject, QThread, Qt, pyqtSignal
+
+
+def save_snapshot(snapshot, path):
+    # GraphModel.save já grava num temporário e troca pelo destino no fim
+    snapshot.save(path)
+
+
+class ProjectSaveWorker(QObject):
+    # Roda numa QThread (ver save_snapshot). O erro fica também no próprio
+    # worker, legível logo após QThread.wait() sem esperar sinais enfileirados
+    failed = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, snapshot, path):
+        super().__init__()
+        self.snapshot = snapshot
+        self.path = path
+        self.error = None
+        self.saved = False  # só vira True se save_snapshot terminou sem erro
+
+    def run(self):
+        try:
+            save_snapshot(self.snapshot, self.path)
+            self.saved = True
+        except Exception as e:
+            # Qualquer exceção (disco, título inválido, id fora do u32...):
+            # uma que escapasse do slot abortaria o app no PyQt5
+            self.error = str(e) or type(e).__name__
+            self.failed.emit(self.error)
+        finally:
+            self.finished.emit()
+
+
+class ProjectSaver(QObject):
+    # Salva uma cópia do modelo em segundo plano; a edição continua no modelo
+    # original enquanto o arquivo é escrito. edit_count: contador de edições
+    # da janela no momento da cópia (o que o arquivo salvo contém)
+    def __init__(self, main_window, path):
+        super().__init__(main_window)
+        self._window = main_window
+        self._path = path
+        self.edit_count = main_window.edit_count
+        self._thread = QThread(self)
+        self._worker = ProjectSaveWorker(main_window.model.snapshot(), path)
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        # A thread encerra pelo lado do worker (conexão direta): wait() na
+        # thread da interface não pode depender de um slot enfileirado nela
+        self._worker.finished.connect(self._thread.quit, Qt.DirectConnection)
+        self._worker.finished.connect(self._on_finished)
+
+    @property
+    def succeeded(self):
+        # Válido depois de wait() ou de on_save_finished
+        return self._thread.isFinished() and self._worker.saved
+
+    def start(self):
+        self._thread.start()
+
+    def wait(self):
+        self._thread.wait()
+
+    def _on_finished(self):
+        self._thread.wait()
+        if not self._worker.saved:
+            self._window.statusBar().showMessage(f"Erro ao salvar {self._path}: {self._worker.error}")
+        else:
+            self._window.statusBar().showMessage(f"Projeto salvo em {self._path}", 5000)
+        self._window.on_save_finished(self)
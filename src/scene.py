@@ -0,0 +1,8 @@
+from PyQt5.QtWidgets import QGraphicsScene
+from .pinindex import PinIndex
+
+class WorkspaceScene(QGraphicsScene):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Mantido pelos próprios NodeItems (ver NodeItem.itemChange)
+        self.pin_index = PinIndex()
@@ -0,0 +1,207 @@
+# Índice invertido para busca de nodes (sem Qt).
+#
+# Cada node é quebrado em tokens (minúsculas, sem acentos, letras e dígitos
+# separados: "Classe12" -> "classe", "12") por campo. A consulta exige todos
+# os seus tokens (E lógico); cada token casa de forma exata, por prefixo
+# (vocabulário ordenado + bisect) ou, se nada casar, aproximada (uma edição,
+# via índice de deleções construído sob demanda). Nada percorre os nodes.
+import bisect
+import heapq
+import re
+from functools import lru_cache
+import unicodedata
+
+# Campos indexados e o peso de cada um no ranking
+FIELDS = ("title", "inputs", "outputs", "properties", "methods", "description")
+FIELD_BITS = {field: 1 << i for i, field in enumerate(FIELDS)}
+TITLE_BIT = FIELD_BITS["title"]
+
+_WORD = re.compile(r"[^\W\d_]+|\d+")
+_CAMEL = re.compile(r"[A-Z]?[^\W\d_A-Z]+|[A-Z]+(?![^\W\d_A-Z])")
+
+
+def _fold(text):
+    folded = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in folded if not unicodedata.combining(ch))
+
+
+@lru_cache(maxsize=65536)
+def tokenize(text):
+    # "calcularJuros2" -> "calcularjuros", "calcular", "juros", "2"
+    # (em cache: nomes de pinos e descrições se repetem muito)
+    tokens = []
+    for word in _WORD.findall(_fold(text)):
+        lower = word.lower()
+        tokens.append(lower)
+        parts = _CAMEL.findall(word)
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts)
+    return tuple(tokens)
+
+
+def query_tokens(text):
+    # Na consulta as partes camelCase não são separadas ("ContaBanc" é um prefixo)
+    return [word.lower() for word in _WORD.findall(_fold(text))]
+
+
+def _deletes(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class SearchIndex:
+    # Mínimo de letras para tentar casamento aproximado
+    FUZZY_MIN = 4
+
+    def __init__(self):
+        self._postings = {}   # token -> {node_id: bits dos campos}
+        self._in_title = {}   # token -> {node_id: None} dos nodes com o token no título
+        self._node_tokens = {}  # node_id -> {token: bits}
+        self._vocabulary = []   # tokens ordenados (busca por prefixo)
+        self._fuzzy = None      # deleção -> {token: None}; criado na 1ª busca aproximada
+        self._titles = {}       # node_id -> título (para exibir resultados)
+        self.stale = True       # precisa de rebuild antes da próxima busca
+
+    def invalidate(self):
+        # Modelo trocado inteiro (carga, recuperação): reconstrói na próxima busca
+        self.stale = True
+
+    def rebuild(self, model):
+        self._postings = {}
+        self._in_title = {}
+        self._node_tokens = {}
+        self._vocabulary = []
+        self._fuzzy = None
+        self._titles = {}
+        for node in model.nodes.values():
+            self._add(node)
+        self._vocabulary = sorted(self._postings)
+        self.stale = False
+
+    def _node_terms(self, node):
+        terms = {}
+        for field in FIELDS:
+            bit = FIELD_BITS[field]
+            values = getattr(node, field)
+            for value in ([values] if isinstance(values, str) else values):
+                for token in tokenize(value):
+                    terms[token] = terms.get(token, 0) | bit
+        return terms
+
+    def _add(self, node, sorted_insert=False):
+        terms = self._node_terms(node)
+        self._node_tokens[node.id] = terms
+        self._titles[node.id] = node.title
+        for token, bits in terms.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                if sorted_insert:
+                    self._add_token(token)
+            posting[node.id] = bits
+            if bits & TITLE_BIT:
+                self._in_title.setdefault(token, {})[node.id] = None
+
+    def _add_token(self, token):
+        bisect.insort(self._vocabulary, token)
+        if self._fuzzy is not None and not token.isdigit():
+            for variant in _deletes(token):
+                self._fuzzy.setdefault(variant, {})[token] = None
+
+    def _drop_token(self, token):
+        del self._postings[token]
+        del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+        if self._fuzzy is not None and not token.isdigit():
+            for variant in _deletes(token):
+                bucket = self._fuzzy.get(variant)
+                if bucket is not None:
+                    bucket.pop(token, None)
+                    if not bucket:
+                        del self._fuzzy[variant]
+
+    def update_node(self, node):
+        if self.stale:
+            return
+        self.remove_node(node.id)
+        self._add(node, sorted_insert=True)
+
+    def remove_node(self, node_id):
+        if self.stale:
+            return
+        terms = self._node_tokens.pop(node_id, None)
+        self._titles.pop(node_id, None)
+        if terms is None:
+            return
+        for token, bits in terms.items():
+            if bits & TITLE_BIT:
+                titled = self._in_title[token]
+                del titled[node_id]
+                if not titled:
+                    del self._in_title[token]
+            posting = self._postings[token]
+            del posting[node_id]
+            if not posting:
+                self._drop_token(token)
+
+    def _prefix_tokens(self, prefix):
+        vocabulary = self._vocabulary
+        start = bisect.bisect_left(vocabulary, prefix)
+        end = bisect.bisect_left(vocabulary, prefix + "\uffff", start)
+        return vocabulary[start:end]
+
+    def _fuzzy_tokens(self, token):
+        # Tokens a uma edição (inserção, remoção ou troca) de distância
+        if self._fuzzy is None:
+            self._fuzzy = {}
+            for known in self._postings:
+                if not known.isdigit():
+                    for variant in _deletes(known):
+                        self._fuzzy.setdefault(variant, {})[known] = None
+        found = dict(self._fuzzy.get(token, {}))
+        for variant in _deletes(token):
+            if variant in self._postings:
+                found[variant] = None
+            found.update(self._fuzzy.get(variant, {}))
+        found.pop(token, None)
+        return list(found)
+
+    def _matches(self, token):
+        # node_id -> pontuação do token (exato 4, prefixo 2, aproximado 1;
+        # +1 se o token está no título)
+        candidates = [(t, 4 if t == token else 2) for t in self._prefix_tokens(token)]
+        if not candidates and len(token) >= self.FUZZY_MIN and not token.isdigit():
+            candidates = [(t, 1) for t in self._fuzzy_tokens(token)]
+        groups = []
+        for candidate, score in candidates:
+            groups.append((score, self._postings[candidate]))
+            titled = self._in_title.get(candidate)
+            if titled:
+                groups.append((score + 1, titled))
+        # Em ordem crescente, cada node fica com a maior pontuação (o laço
+        # por node roda em C, dentro de dict.fromkeys/update)
+        groups.sort(key=lambda group: group[0])
+        scores = {}
+        for score, nodes in groups:
+            if len(nodes) > 64:
+                scores.update(dict.fromkeys(nodes, score))
+            else:
+                for node_id in nodes:
+                    scores[node_id] = score
+        return scores
+
+    def search(self, query, limit=200):
+        # [(node_id, pontuação)] do mais relevante para o menos
+        tokens = query_tokens(query)
+        if not tokens:
+            return []
+        # Tokens mais raros primeiro: a interseção já começa pequena
+        per_token = sorted((self._matches(token) for token in dict.fromkeys(tokens)), key=len)
+        total = per_token[0]
+        for scores in per_token[1:]:
+            total = {node_id: value + scores[node_id] for node_id, value in total.items() if node_id in scores}
+            if not total:
+                return []
+        best = heapq.nlargest(limit, total, key=total.__getitem__)
+        return [(node_id, total[node_id]) for node_id in best]
+
+    def title(self, node_id):
+        return self._titles.get(node_id, "")
@@ -0,0 +1,80 @@
+# Ajustes de desempenho da cena/view, aplicáveis com o editor aberto.
+from PyQt5.QtWidgets import QGraphicsScene, QGraphicsView
+from .node import NodeItem
+
+INDEX_METHODS = {
+    "bsp": QGraphicsScene.BspTreeIndex,
+    "none": QGraphicsScene.NoIndex,
+}
+UPDATE_MODES = {
+    "full": QGraphicsView.FullViewportUpdate,
+    "minimal": QGraphicsView.MinimalViewportUpdate,
+    "smart": QGraphicsView.SmartViewportUpdate,
+    "bounding": QGraphicsView.BoundingRectViewportUpdate,
+}
+
+
+class ViewSettings:
+    # index_method: "bsp" ou "none"; bsp_depth 0 = automático (Qt)
+    # viewport_update: chave de UPDATE_MODES
+    # antialias_idle_only: sem antialiasing durante pan/zoom, religado ao parar
+    # device_cache: DeviceCoordinateCache nos nodes (ver NodeItem.DEVICE_CACHE)
+    FIELDS = ("index_method", "bsp_depth", "viewport_update", "dont_save_painter_state",
+              "dont_adjust_for_antialiasing", "cache_background", "antialias_idle_only", "device_cache")
+
+    def __init__(self, index_method="bsp", bsp_depth=0, viewport_update="minimal",
+                 dont_save_painter_state=False, dont_adjust_for_antialiasing=False,
+                 cache_background=False, antialias_idle_only=False, device_cache=True):
+        if index_method not in INDEX_METHODS:
+            raise ValueError(f"Índice de cena inválido: {index_method}")
+        if viewport_update not in UPDATE_MODES:
+            raise ValueError(f"Modo de atualização inválido: {viewport_update}")
+        self.index_method = index_method
+        self.bsp_depth = bsp_depth
+        self.viewport_update = viewport_update
+        self.dont_save_painter_state = dont_save_painter_state
+        self.dont_adjust_for_antialiasing = dont_adjust_for_antialiasing
+        self.cache_background = cache_background
+        self.antialias_idle_only = antialias_idle_only
+        self.device_cache = device_cache
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+PRESETS = {
+    # Comportamento padrão do Qt (o que o editor sempre usou)
+    "Padrão": ViewSettings(),
+    # Muitos nodes parados, navegação frequente: BSP acelera a busca dos
+    # itens expostos e o antialiasing só volta quando a view para
+    "Diagrama grande estático": ViewSettings(
+        index_method="bsp", viewport_update="minimal", dont_save_painter_state=True,
+        dont_adjust_for_antialiasing=True, cache_background=True, antialias_idle_only=True
+    ),
+    # Muitas conexões mudando de geometria a cada arraste: sem índice não há
+    # BSP para refazer, e a região suja vira um único retângulo por frame
+    "Edição intensa": ViewSettings(
+        index_method="none", viewport_update="bounding", dont_save_painter_state=True,
+        cache_background=True
+    ),
+}
+
+
+def apply_view_settings(view, settings):
+    scene = view.scene()
+    scene.setItemIndexMethod(INDEX_METHODS[settings.index_method])
+    if settings.index_method == "bsp":
+        scene.setBspTreeDepth(settings.bsp_depth)
+    view.setViewportUpdateMode(UPDATE_MODES[settings.viewport_update])
+    view.setOptimizationFlag(QGraphicsView.DontSavePainterState, settings.dont_save_painter_state)
+    view.setOptimizationFlag(QGraphicsView.DontAdjustForAntialiasing, settings.dont_adjust_for_antialiasing)
+    view.setCacheMode(QGraphicsView.CacheBackground if settings.cache_background else QGraphicsView.CacheNone)
+    view.resetCachedContent()
+    view.set_antialias_idle_only(settings.antialias_idle_only)
+    if NodeItem.DEVICE_CACHE != settings.device_cache:
+        NodeItem.DEVICE_CACHE = settings.device_cache
+        for item in scene.items():
+            if isinstance(item, NodeItem):
+                item.set_device_cache(settings.device_cache)
+    view.view_settings = settings
+    view.viewport().update()
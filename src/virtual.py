@@ -0,0 +1,330 @@
+# Cena virtualizada: o diagrama completo fica só no GraphModel e apenas os
+# nodes próximos da área visível viram NodeItem/ConnectionItem. Itens que
+# saem da área voltam para um pool e são reaproveitados para outros nodes.
+# A ponta de uma conexão que cai fora da área é uma NodeAnchor (só dados).
+from PyQt5.QtCore import QObject, QRectF, QTimer, QLineF
+from PyQt5.QtWidgets import QGraphicsItem
+from .connection import ConnectionItem, path_updates
+from .lod import OVERVIEW
+from .node import NodeItem
+
+
+class NodeGrid:
+    # Hash espacial de nodes pelo canto superior esquerdo (todos os nodes têm
+    # o tamanho de NodeItem, então a consulta só precisa expandir a área)
+    def __init__(self, cell_size=1024):
+        self.cell_size = cell_size
+        self._cells = {}   # (cx, cy) -> {node_id: None}
+        self._where = {}   # node_id -> (cx, cy)
+        self.bounds = None  # [x0, y0, x1, y1] de tudo que já foi inserido
+
+    def clear(self):
+        self._cells.clear()
+        self._where.clear()
+        self.bounds = None
+
+    def _cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, node_id, x, y):
+        cell = self._cell(x, y)
+        self._cells.setdefault(cell, {})[node_id] = None
+        self._where[node_id] = cell
+        right, bottom = x + NodeItem.WIDTH, y + NodeItem.HEIGHT
+        if self.bounds is None:
+            self.bounds = [x, y, right, bottom]
+        else:
+            bounds = self.bounds
+            bounds[0] = min(bounds[0], x)
+            bounds[1] = min(bounds[1], y)
+            bounds[2] = max(bounds[2], right)
+            bounds[3] = max(bounds[3], bottom)
+
+    def remove(self, node_id):
+        cell = self._where.pop(node_id, None)
+        if cell is None:
+            return
+        bucket = self._cells[cell]
+        del bucket[node_id]
+        if not bucket:
+            del self._cells[cell]
+
+    def move(self, node_id, x, y):
+        if self._where.get(node_id) != self._cell(x, y):
+            self.remove(node_id)
+        self.insert(node_id, x, y)
+
+    def query(self, x0, y0, x1, y1):
+        # Ids dos nodes cujo retângulo pode cruzar a área
+        cx0, cy0 = self._cell(x0 - NodeItem.WIDTH, y0 - NodeItem.HEIGHT)
+        cx1, cy1 = self._cell(x1, y1)
+        cells = self._cells
+        found = []
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            # Área maior que o diagrama: percorre só as células ocupadas
+            for (cx, cy), bucket in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found.extend(bucket)
+            return found
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+
+class NodeAnchor:
+    # Ponta de conexão num node sem item: as posições dos pinos vêm direto
+    # do NodeData e as conexões ligadas a ela ficam num conjunto ordenado,
+    # com a mesma interface de pinos do NodeItem usada pelas conexões
+    __slots__ = ("node_data", "connections")
+
+    def __init__(self, node_data):
+        self.node_data = node_data
+        self.connections = {}
+
+    @property
+    def node_id(self):
+        return self.node_data.id
+
+    def get_input_pin_scene_pos(self, idx):
+        return NodeItem.data_pin_pos(self.node_data, "input", idx)
+
+    def get_output_pin_scene_pos(self, idx):
+        return NodeItem.data_pin_pos(self.node_data, "output", idx)
+
+    def add_output_connection(self, conn):
+        self.connections[conn] = None
+
+    add_input_connection = add_output_connection
+
+    def remove_output_connection(self, conn):
+        self.connections.pop(conn, None)
+
+    remove_input_connection = remove_output_connection
+
+
+class SceneVirtualizer(QObject):
+    # Materializa os nodes que cruzam a área visível (mais margin, em pixels
+    # de tela) e as conexões ligadas a eles; a outra ponta de uma conexão só
+    # vira NodeItem se também estiver na área, senão é uma NodeAnchor. Nodes
+    # selecionados nunca são liberados. Na visão geral (LOD) nada é
+    # materializado: a view desenha retângulos e linhas direto do modelo.
+    def __init__(self, window, margin=200, pool_size=4096):
+        super().__init__(window)
+        self._window = window
+        self.margin = margin
+        self.pool_size = pool_size
+        self.enabled = False
+        self.grid = NodeGrid()
+        self._node_pool = []
+        self._conn_pool = []
+        self._anchors = {}  # node_id -> NodeAnchor com ao menos uma conexão
+        self._scheduled = False
+        self.overview_rects = []
+        self.overview_lines = []
+        view = window.view
+        view.horizontalScrollBar().valueChanged.connect(self.schedule)
+        view.verticalScrollBar().valueChanged.connect(self.schedule)
+
+    def set_enabled(self, enabled):
+        window = self._window
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        if not enabled:
+            self.grid.clear()
+            self._node_pool = []
+            self._conn_pool = []
+            self._anchors = {}
+            window.scene.setSceneRect(QRectF())  # volta ao retângulo automático
+        window.rebuild_scene()
+
+    def reset(self):
+        # Modelo novo ou recarregado: reindexa tudo (só dados, sem itens)
+        self.grid.clear()
+        self._anchors = {}  # os itens já saíram da cena
+        for node in self._window.model.nodes.values():
+            self.grid.insert(node.id, node.x, node.y)
+        self._update_scene_rect()
+        self.refresh()
+
+    def schedule(self, *args):
+        if self.enabled and not self._scheduled:
+            self._scheduled = True
+            QTimer.singleShot(0, self.refresh)
+
+    def node_added(self, node):
+        self.grid.insert(node.id, node.x, node.y)
+        self._update_scene_rect()
+        self.schedule()
+
+    def node_moved(self, node):
+        self.grid.move(node.id, node.x, node.y)
+        anchor = self._anchors.get(node.id)
+        if anchor is not None:
+            path_updates.mark_dirty(anchor.connections)
+        self._update_scene_rect()
+        self.schedule()
+
+    def node_removed(self, node_id):
+        self.grid.remove(node_id)
+        # As conexões do node saem junto (MainWindow.remove_items)
+        self._anchors.pop(node_id, None)
+        self.schedule()
+
+    def pins_changed(self, node_id):
+        # Pinos de um node sem item mudaram: as conexões presas à âncora
+        # dele têm índices velhos e são refeitas no próximo refresh
+        anchor = self._anchors.get(node_id)
+        if anchor is not None:
+            connection_items = self._window.connection_items
+            for connection in list(anchor.connections):
+                self._release_connection(connection_items.pop(connection.edge.id))
+            self.schedule()
+
+    def _update_scene_rect(self):
+        # Sem itens fora da tela, a cena não sabe o tamanho do diagrama; sem
+        # isso as barras de rolagem não chegariam às áreas não materializadas
+        bounds = self.grid.bounds
+        if bounds is None:
+            return
+        rect = QRectF(bounds[0], bounds[1], bounds[2] - bounds[0], bounds[3] - bounds[1]).adjusted(-500, -500, 500, 500)
+        scene = self._window.scene
+        if not scene.sceneRect().contains(rect):
+            scene.setSceneRect(scene.sceneRect().united(rect))
+
+    def visible_area(self):
+        view = self._window.view
+        area = view.mapToScene(view.viewport().rect()).boundingRect()
+        margin = self.margin / max(view.transform().m11(), 1e-6)
+        return area.adjusted(-margin, -margin, margin, margin)
+
+    def refresh(self):
+        self._scheduled = False
+        if not self.enabled:
+            return
+        window = self._window
+        model = window.model
+        area = self.visible_area()
+        visible = self.grid.query(area.left(), area.top(), area.right(), area.bottom())
+        if window.view.level_of_detail() == OVERVIEW:
+            self._build_overview(visible)
+            visible = []
+        else:
+            self.overview_rects = []
+            self.overview_lines = []
+
+        needed_edges = {}
+        for node_id in visible:
+            for edge in model.out_edges(node_id):
+                needed_edges[edge.id] = edge
+            for edge in model.in_edges(node_id):
+                needed_edges[edge.id] = edge
+        needed_nodes = set(visible)
+        for node_id, node in window.node_items.items():
+            if node.isSelected():
+                needed_nodes.add(node_id)
+
+        # Libera primeiro as conexões, depois os nodes. Uma conexão que fica
+        # é refeita se uma ponta trocou entre âncora e NodeItem
+        stale = []
+        for edge_id, connection in window.connection_items.items():
+            edge = needed_edges.get(edge_id)
+            if (edge is None
+                    or isinstance(connection.node_from, NodeAnchor) == (edge.from_node in needed_nodes)
+                    or isinstance(connection.node_to, NodeAnchor) == (edge.to_node in needed_nodes)):
+                stale.append(edge_id)
+        for edge_id in stale:
+            self._release_connection(window.connection_items.pop(edge_id))
+        # Âncoras esvaziadas por MainWindow.remove_items
+        self._anchors = {node_id: anchor for node_id, anchor in self._anchors.items() if anchor.connections}
+        for node_id in [n for n in window.node_items if n not in needed_nodes]:
+            self._release_node(window.node_items.pop(node_id))
+        for node_id in needed_nodes:
+            if node_id not in window.node_items:
+                self._acquire_node(model.nodes[node_id])
+        for edge_id, edge in needed_edges.items():
+            if edge_id not in window.connection_items:
+                self._acquire_connection(edge)
+
+    def _acquire_node(self, node_data):
+        window = self._window
+        if self._node_pool:
+            node = self._node_pool.pop()
+            node.setFlag(QGraphicsItem.ItemHasNoContents, False)
+            node.bind(node_data)
+        else:
+            node = NodeItem(node_data=node_data)
+        window.view.apply_level_of_detail(node)
+        window.scene.addItem(node)
+        window.node_items[node_data.id] = node
+        return node
+
+    def _endpoint(self, node_id):
+        node = self._window.node_items.get(node_id)
+        if node is None:
+            node = self._anchors.get(node_id)
+            if node is None:
+                node = self._anchors[node_id] = NodeAnchor(self._window.model.nodes[node_id])
+        return node
+
+    def _acquire_connection(self, edge):
+        window = self._window
+        node_from = self._endpoint(edge.from_node)
+        node_to = self._endpoint(edge.to_node)
+        if self._conn_pool:
+            connection = self._conn_pool.pop()
+            connection.setFlag(QGraphicsItem.ItemHasNoContents, False)
+            connection.bind(node_from, edge.from_idx, node_to, edge.to_idx)
+        else:
+            connection = ConnectionItem(node_from, edge.from_idx, node_to, edge.to_idx)
+        connection.edge = edge
+        window.view.apply_level_of_detail(connection)
+        window.scene.addItem(connection)
+        node_from.add_output_connection(connection)
+        node_to.add_input_connection(connection)
+        window.connection_items[edge.id] = connection
+        return connection
+
+    def _release_connection(self, connection):
+        # Os dois nodes ainda existem aqui (conexões saem antes dos nodes)
+        connection.node_from.remove_output_connection(connection)
+        connection.node_to.remove_input_connection(connection)
+        for node in (connection.node_from, connection.node_to):
+            if isinstance(node, NodeAnchor) and not node.connections:
+                self._anchors.pop(node.node_id, None)
+        path_updates.discard(connection)
+        self._window.scene.removeItem(connection)
+        connection.edge = None
+        if len(self._conn_pool) < self.pool_size:
+            self._conn_pool.append(connection)
+
+    def _release_node(self, node):
+        self._window.scene.removeItem(node)
+        if len(self._node_pool) < self.pool_size:
+            self._node_pool.append(node)
+
+    def _build_overview(self, visible):
+        # Geometria da visão geral direto dos dados (nenhum item criado)
+        model = self._window.model
+        rects = []
+        lines = []
+        visible_set = set(visible)
+        for node_id in visible:
+            node = model.nodes[node_id]
+            rects.append(QRectF(node.x, node.y, NodeItem.WIDTH, NodeItem.HEIGHT))
+            for edge in model.out_edges(node_id):
+                target = model.nodes[edge.to_node]
+                lines.append(QLineF(NodeItem.data_pin_pos(node, "output", edge.from_idx),
+                                    NodeItem.data_pin_pos(target, "input", edge.to_idx)))
+            for edge in model.in_edges(node_id):
+                if edge.from_node in visible_set:
+                    continue  # já desenhada a partir da outra ponta
+                source = model.nodes[edge.from_node]
+                lines.append(QLineF(NodeItem.data_pin_pos(source, "output", edge.from_idx),
+                                    NodeItem.data_pin_pos(node, "input", edge.to_idx)))
+        self.overview_rects = rects
+        self.overview_lines = lines
+        self._window.view.viewport().update()
@@ -0,0 +1,45 @@
+import json
+import os
+import pytest
+from src import cli
+
+
+def _project(tmp_path, node, name="projeto.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps({"nodes": [node], "connections": []}), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("node, message", [
+    ({"title": None}, "'title' deve ser um texto"),
+    ({"title": "A", "description": 3}, "'description' deve ser um texto"),
+    ({"id": "a", "title": "A"}, "'id' deve ser um inteiro não negativo"),
+    ({"id": -1, "title": "A"}, "'id' deve ser um inteiro não negativo"),
+    ({"id": [1], "title": "A"}, "'id' deve ser um inteiro não negativo"),
+])
+def test_validate_rejects_bad_node_fields(tmp_path, node, message):
+    result = cli.validate(_project(tmp_path, node))
+    assert not result["valid"]
+    assert result["errors"] == [f"node 0: {message}"]
+
+
+def test_validate_accepts_good_node(tmp_path):
+    assert cli.validate(_project(tmp_path, {"id": 0, "title": "A", "description": ""}))["valid"]
+
+
+@pytest.mark.parametrize("node", [{"title": None}, {"id": -1, "title": "A"}, {"id": "a", "title": "A"}])
+def test_convert_refuses_invalid_node(tmp_path, node):
+    path = _project(tmp_path, node)
+    result = cli.convert(path, "llb")
+    assert not result["ok"]
+    assert "validação" in result["error"]
+    assert not os.path.exists(os.path.splitext(path)[0] + ".llb")
+
+
+def test_run_one_reports_unexpected_errors(tmp_path, monkeypatch):
+    def broken(path):
+        raise AttributeError("falhou")
+    monkeypatch.setattr(cli, "validate", broken)
+    result = cli._run_one("validate", _project(tmp_path, {"title": "A"}), {})
+    assert not result["valid"]
+    assert result["errors"] == ["falhou"]